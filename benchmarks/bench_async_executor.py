@@ -0,0 +1,136 @@
+"""Throughput and p99 latency of the pooled async executor (SQLite fallback).
+
+    python benchmarks/bench_async_executor.py --requests 5000 --users 200
+
+Each request is a small dashboard: the Q13 orders/customers join, the Q17
+aggregates and a Q19-style monthly revenue query for one customer. Three
+ways of serving it are compared:
+
+- a new connection per request (what the reporting service does today);
+- the pooled executor, one ``fetch`` per query;
+- the pooled executor, all three queries in one ``fetch_many`` call.
+
+SQLite connections are far cheaper to open than PostgreSQL ones (no
+network, authentication or backend process), so the per-request-connection
+numbers here understate what the pool saves against a real server.
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from odoo_pysql.async_executor import AsyncQueryExecutor
+
+JOIN = ("SELECT o.order_id, o.amount, c.customer_name FROM orders o"
+        " JOIN customers c ON o.customer_id = c.customer_id WHERE o.customer_id = ?")
+AGGREGATES = "SELECT AVG(amount), MAX(amount), MIN(amount) FROM orders WHERE customer_id = ?"
+REVENUE = ("SELECT strftime('%m', order_date) AS month, SUM(amount) FROM orders"
+           " WHERE customer_id = ? AND order_date >= ? AND order_date < ? GROUP BY 1")
+
+
+def build(path, customers, orders):
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, customer_name TEXT)")
+    con.execute("CREATE TABLE orders (order_id INTEGER PRIMARY KEY, customer_id INTEGER,"
+                " order_date TEXT, amount REAL)")
+    rng = random.Random(0)
+    con.executemany("INSERT INTO customers VALUES (?, ?)",
+                    ((i, "customer %d" % i) for i in range(1, customers + 1)))
+    start = datetime.date(2023, 1, 1)
+    con.executemany("INSERT INTO orders VALUES (?, ?, ?, ?)", (
+        (i, rng.randint(1, customers), (start + datetime.timedelta(days=rng.randint(0, 364))).isoformat(),
+         round(rng.random() * 500, 2)) for i in range(1, orders + 1)))
+    con.execute("CREATE INDEX orders_customer_date_idx ON orders (customer_id, order_date)")
+    con.commit()
+    con.close()
+
+
+def dashboard(customer_id):
+    return [(JOIN, (customer_id,)), (AGGREGATES, (customer_id,)),
+            (REVENUE, (customer_id, "2023-01-01", "2024-01-01"))]
+
+
+async def run(handler, requests, users):
+    latencies = []
+    pending = list(reversed(requests))
+
+    async def user():
+        while pending:
+            customer_id = pending.pop()
+            start = time.perf_counter()
+            await handler(customer_id)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    return time.perf_counter() - start, latencies
+
+
+def report(label, elapsed, latencies):
+    latencies.sort()
+    p99 = latencies[int(0.99 * (len(latencies) - 1))]
+    print("%-28s %8.0f req/s   p50 %6.1f ms   p99 %6.1f ms"
+          % (label, len(latencies) / elapsed, 1e3 * statistics.median(latencies), 1e3 * p99))
+
+
+async def main_async(args, path):
+    rng = random.Random(1)
+    requests = [rng.randint(1, args.customers) for _ in range(args.requests)]
+
+    def per_request(customer_id):
+        con = sqlite3.connect(path)
+        try:
+            return [con.execute(sql, params).fetchall() for sql, params in dashboard(customer_id)]
+        finally:
+            con.close()
+
+    async def new_connection(customer_id):
+        return await asyncio.to_thread(per_request, customer_id)
+
+    report("connection per request", *await run(new_connection, requests, args.users))
+
+    async with AsyncQueryExecutor(path, dialect="sqlite", pool_size=args.pool_size) as executor:
+        async def one_by_one(customer_id):
+            return [await executor.fetch(sql, params) for sql, params in dashboard(customer_id)]
+
+        report("pool, fetch per query", *await run(one_by_one, requests, args.users))
+
+    async with AsyncQueryExecutor(path, dialect="sqlite", pool_size=args.pool_size) as executor:
+        async def pipelined(customer_id):
+            return await executor.fetch_many(dashboard(customer_id))
+
+        report("pool, fetch_many", *await run(pipelined, requests, args.users))
+        stats = executor.stats
+        print("\nconnections opened: %d, statement cache hits/misses: %d/%d"
+              % (stats["connections_opened"], stats["statement_hits"], stats["statement_misses"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--orders", type=int, default=200_000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_async_executor_")
+    path = os.path.join(workdir, "orders.db")
+    try:
+        build(path, args.customers, args.orders)
+        asyncio.run(main_async(args, path))
+    finally:
+        for name in os.listdir(workdir):
+            os.remove(os.path.join(workdir, name))
+        os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Bulk customer loading vs one ``InsertCustomer`` call per record (SQLite).
+
+    python benchmarks/bench_bulk_loader.py --rows 1000000 --loop-rows 20000
+
+Uses a file-backed SQLite database as a local stand-in for PostgreSQL. The
+procedure loop is emulated with one INSERT and one commit per record, which
+is what ``CALL InsertCustomer(...)`` costs in autocommit mode (minus the
+network round trip, so the real gap is larger). A fraction of the records
+have a NULL name to exercise per-batch error isolation.
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from odoo_pysql.bulk_loader import BulkLoader
+
+SCHEMA = (
+    "CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, customer_name TEXT NOT NULL,"
+    " contact_email TEXT UNIQUE, country TEXT)"
+)
+COUNTRIES = ["BE", "EG", "FR", "IN", "MA", "NL", "PE", "TN"]
+
+
+def records(n, bad_rate, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        name = None if rng.random() < bad_rate else "customer %d" % i
+        yield (name, "c%d@example.com" % rng.randint(0, n), rng.choice(COUNTRIES))
+
+
+def connect(path):
+    if os.path.exists(path):
+        os.remove(path)
+    con = sqlite3.connect(path)
+    con.execute(SCHEMA)
+    con.commit()
+    return con
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--loop-rows", type=int, default=20_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--bad-rate", type=float, default=0.00001)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_bulk_loader_")
+    path = os.path.join(workdir, "customers.db")
+
+    con = connect(path)
+    insert = "INSERT INTO customers (customer_name, contact_email, country) VALUES (?, ?, ?)"
+    loaded = failed = 0
+    start = time.perf_counter()
+    for record in records(args.loop_rows, args.bad_rate):
+        try:
+            con.execute(insert + " ON CONFLICT (contact_email) DO UPDATE SET"
+                        " customer_name = excluded.customer_name, country = excluded.country", record)
+            con.commit()
+            loaded += 1
+        except sqlite3.IntegrityError:
+            con.rollback()
+            failed += 1
+    loop = time.perf_counter() - start
+    con.close()
+    print("per-record calls: %d rows in %.2fs -> %.0f rows/s (%d rejected)"
+          % (args.loop_rows, loop, args.loop_rows / loop, failed))
+
+    con = connect(path)
+    loader = BulkLoader(dialect="sqlite", batch_size=args.batch_size)
+    start = time.perf_counter()
+    report = loader.load(con, records(args.rows, args.bad_rate))
+    bulk = time.perf_counter() - start
+    print("bulk loader:      %d rows in %.2fs -> %.0f rows/s (%d batches, %d failed, %d rejected)"
+          % (args.rows, bulk, args.rows / bulk, len(report.batches), len(report.failed_batches),
+             len(report.rejected)))
+    print("speed-up: %.0fx" % ((args.rows / bulk) / (args.loop_rows / loop)))
+    stored = con.execute("SELECT count(*) FROM customers").fetchone()[0]
+    print("customers stored: %d (duplicates by email merged)" % stored)
+    con.close()
+    os.remove(path)
+    os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
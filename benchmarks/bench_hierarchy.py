@@ -0,0 +1,96 @@
+"""Ancestor/descendant lookups: recursive CTE vs parent_path vs in-memory cache (SQLite).
+
+    python benchmarks/bench_hierarchy.py --nodes 1000000 --lookups 2000
+
+Builds a random org chart (each employee reports to a random earlier one,
+so depth grows like ln(n)) in an in-memory SQLite database as a local
+stand-in for PostgreSQL, then times per-lookup latency of each approach and
+the cost of re-parenting subtrees.
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+
+from odoo_pysql.hierarchy import HierarchyIndex
+
+DESCENDANTS_CTE = (
+    "WITH RECURSIVE below AS ("
+    " SELECT employee_id FROM employees WHERE manager_id = ?"
+    " UNION ALL"
+    " SELECT e.employee_id FROM employees e JOIN below b ON e.manager_id = b.employee_id"
+    ") SELECT employee_id FROM below"
+)
+
+
+def per_call(fn, args):
+    start = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - start) / len(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--moves", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE employees (employee_id INTEGER PRIMARY KEY, manager_id INTEGER)")
+    con.executemany(
+        "INSERT INTO employees VALUES (?, ?)",
+        ((i, None if i == 1 else rng.randint(1, i - 1)) for i in range(1, args.nodes + 1)),
+    )
+    con.execute("CREATE INDEX employees_manager_idx ON employees (manager_id)")
+    con.commit()
+
+    index = HierarchyIndex(dialect="sqlite")
+    start = time.perf_counter()
+    index.install(con)
+    print("install + rebuild of %d paths: %.2fs" % (args.nodes, time.perf_counter() - start))
+    depths = [len(index.cache.chain(n)) for n in range(1, args.nodes + 1, max(1, args.nodes // 10_000))]
+    print("sampled depth: mean %.1f, max %d" % (statistics.mean(depths), max(depths)))
+
+    cte = index.recursive_ancestors_sql()
+    uncached = HierarchyIndex(dialect="sqlite", cache=False)
+    nodes = [rng.randint(1, args.nodes) for _ in range(args.lookups)]
+
+    print("\nancestors (per lookup)")
+    print("  recursive CTE    %8.1f us" % (1e6 * per_call(lambda n: con.execute(cte, (n,)).fetchall(), nodes)))
+    print("  parent_path      %8.1f us" % (1e6 * per_call(lambda n: uncached.ancestors(con, n), nodes)))
+    index.cache._chains.clear()
+    print("  cache (cold)     %8.1f us" % (1e6 * per_call(lambda n: index.ancestors(con, n), nodes)))
+    print("  cache (warm)     %8.1f us" % (1e6 * per_call(lambda n: index.ancestors(con, n), nodes)))
+
+    # Mid-level managers: big enough subtrees to matter, small enough to repeat.
+    managers = [rng.randint(100, 1000) for _ in range(max(1, args.lookups // 10))]
+    print("\ndescendants (per lookup, mean subtree %.0f nodes)"
+          % statistics.mean(len(uncached.descendants(con, m)) for m in managers[:50]))
+    print("  recursive CTE    %8.1f us"
+          % (1e6 * per_call(lambda n: con.execute(DESCENDANTS_CTE, (n,)).fetchall(), managers)))
+    print("  parent_path      %8.1f us" % (1e6 * per_call(lambda n: uncached.descendants(con, n), managers)))
+
+    moves = []
+    while len(moves) < args.moves:
+        node, parent = rng.randint(1000, args.nodes), rng.randint(1, 999)
+        moves.append((node, parent))
+    start = time.perf_counter()
+    index.move_many(con, moves)
+    print("\nre-parent %d subtrees (paths + cache): %.2f ms each"
+          % (len(moves), 1e3 * (time.perf_counter() - start) / len(moves)))
+
+    check = [rng.randint(1, args.nodes) for _ in range(200)]
+    for n in check:
+        expected = sorted(r[0] for r in con.execute(cte, (n,)) if r[0] != n)
+        assert sorted(index.ancestors(con, n)) == expected
+        assert sorted(uncached.ancestors(con, n)) == expected
+    print("ancestor chains match the recursive CTE after the moves")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Overhead and accuracy of the instrumentation hooks (Q5, Q6).
+
+    python benchmarks/bench_instrumentation.py --calls 1000000
+
+Times a trivial function and a ``MyClass.original_method`` call plain and
+patched by :class:`Patcher` (counting only, sampling every 100th call,
+timing every call), a ``with timed(...)`` block, and raw histogram
+recording, then compares :class:`LatencyHistogram` quantiles with exact
+``numpy.quantile`` on lognormal latencies.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from odoo_pysql.instrumentation import LatencyHistogram, MetricsRegistry, Patcher, timed
+
+
+def noop(x):
+    return x
+
+
+class MyClass:
+    def original_method(self):
+        return "Original behavior"
+
+
+def per_call(fn, calls, repeat=5):
+    """Median nanoseconds per ``fn()`` over ``calls`` calls."""
+    loop = range(calls)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in loop:
+            fn()
+        times.append(time.perf_counter_ns() - start)
+    return statistics.median(times) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    args = parser.parse_args()
+    obj = MyClass()
+    registry = MetricsRegistry()
+
+    # noop is looked up as a module global on each call, so patching the
+    # module attribute is seen by the lambda.
+    targets = (("noop(1)", lambda: noop(1), (sys.modules[__name__], "noop")),
+               ("obj.original_method()", lambda: obj.original_method(), (MyClass, "original_method")))
+    print("per-call cost, %d calls" % args.calls)
+    for label, call, (owner, attribute) in targets:
+        base = per_call(call, args.calls)
+        print("  %-24s plain            %6.0f ns" % (label, base))
+        for every, mode in ((0, "counting only"), (100, "1 in 100 timed"), (1, "every call timed")):
+            with Patcher(registry, sample_every=every) as patcher:
+                patcher.patch((owner, attribute), name="%s/%d" % (label, every))
+                cost = per_call(call, args.calls)
+            print("  %-24s %-16s %6.0f ns  (+%.0f ns)" % ("", mode, cost, cost - base))
+
+    stage = timed("stage", registry)
+
+    def reused():
+        with stage:
+            pass
+
+    def fresh():
+        with timed("stage", registry):
+            pass
+
+    print("  %-24s %-16s %6.0f ns" % ("with timed(...)", "reused instance", per_call(reused, args.calls)))
+    print("  %-24s %-16s %6.0f ns" % ("", "new each time", per_call(fresh, args.calls)))
+    histogram = LatencyHistogram()
+    print("  %-24s %-16s %6.0f ns" % ("LatencyHistogram", "record()", per_call(lambda: histogram.record(12345),
+                                                                             args.calls)))
+
+    rng = np.random.default_rng(0)
+    latencies = rng.lognormal(np.log(200_000), 1.2, args.samples).astype(np.int64)
+    histogram = LatencyHistogram()
+    start = time.perf_counter()
+    histogram.record_many(latencies)
+    elapsed = time.perf_counter() - start
+    print("\n%d lognormal latencies: record_many %.1f ns each, %d buckets (%.1f KiB of counts)"
+          % (args.samples, 1e9 * elapsed / args.samples, len(histogram.counts),
+             8 * len(histogram.counts) / 1024))
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = np.quantile(latencies, q)
+        print("  p%-5s exact %10.0f ns   histogram %10.0f ns   error %+.3f%%"
+              % (q * 100, exact, histogram.quantile(q), 100 * (histogram.quantile(q) - exact) / exact))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Repeated merges against one dimension table: pd.merge vs JoinIndex.
+
+    python benchmarks/bench_join_index.py --rows 10000000 --batches 10
+
+Integer keys (partner/customer IDs) hit JoinIndex's direct-address table
+and are where the index pays off. With --string-keys both sides spend most
+of their time hashing the probe strings, so expect parity rather than a win.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from odoo_pysql.join_index import JoinIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000, help="total order rows over all batches")
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--customers", type=int, default=1_000_000)
+    parser.add_argument("--how", default="inner", choices=("inner", "left", "outer"))
+    parser.add_argument("--string-keys", action="store_true", help="join on 'C000123'-style text keys")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    customers = pd.DataFrame({
+        "customer_id": rng.permutation(args.customers) + 1,
+        "country": rng.choice(["BE", "FR", "EG", "US"], args.customers),
+    })
+    batch_rows = args.rows // args.batches
+    if args.string_keys:
+        customers["customer_id"] = "C" + customers["customer_id"].astype(str)
+    batches = [
+        pd.DataFrame({
+            "order_id": np.arange(i * batch_rows, (i + 1) * batch_rows),
+            "customer_id": rng.integers(1, int(args.customers * 1.05), batch_rows),
+            "amount": rng.random(batch_rows) * 100,
+        })
+        for i in range(args.batches)
+    ]
+    if args.string_keys:
+        for b in batches:
+            b["customer_id"] = "C" + b["customer_id"].astype(str)
+
+    start = time.perf_counter()
+    expected_rows = [len(pd.merge(b, customers, on="customer_id", how=args.how)) for b in batches]
+    merge_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = JoinIndex(customers, "customer_id")
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    rows = [len(index.merge(b, how=args.how)) for b in batches]
+    index_time = time.perf_counter() - start
+    assert rows == expected_rows
+
+    print("%d batches x %d rows against %d customers (%s)" % (args.batches, batch_rows, args.customers, args.how))
+    print("pd.merge each batch:   %8.3f s" % merge_time)
+    print("JoinIndex build:       %8.3f s" % build_time)
+    print("JoinIndex merges:      %8.3f s" % index_time)
+    print("speedup (incl. build): %8.2fx" % (merge_time / (build_time + index_time)))
+
+
+if __name__ == "__main__":
+    main()
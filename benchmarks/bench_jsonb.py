@@ -0,0 +1,100 @@
+"""JSON key extraction and filter latency before/after promotion (SQLite).
+
+    python benchmarks/bench_jsonb.py --rows 1000000
+
+Uses an in-memory SQLite database as a local stand-in for PostgreSQL.
+SQLite can only add VIRTUAL generated columns, so the "after" extraction
+numbers still parse the document; on PostgreSQL the promoted columns are
+STORED and that cost goes away as well. Filter latency (index vs full
+scan) and Python decoding (typed arrays vs dicts) carry over directly.
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import time
+
+from odoo_pysql.jsonb import JsonbColumn, JsonRecordDecoder
+
+CITIES = ["Brussels", "Cairo", "Lima", "Oslo", "Pune", "Quito", "Riga", "Tunis"]
+
+
+def timed(fn, repeat=3):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--decode-rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE person_table (id INTEGER PRIMARY KEY, data TEXT NOT NULL)")
+
+    def document(i):
+        doc = {"name": "person %d" % i, "age": rng.randint(18, 90), "city": rng.choice(CITIES),
+               "active": rng.random() < 0.7, "tags": ["t%d" % rng.randint(0, 50) for _ in range(3)]}
+        if rng.random() < 0.05:
+            doc["nickname"] = "nick %d" % i
+        return json.dumps(doc)
+
+    con.executemany("INSERT INTO person_table (data) VALUES (?)",
+                    ((document(i),) for i in range(args.rows)))
+    con.commit()
+
+    column = JsonbColumn(dialect="sqlite")
+    elapsed, profile = timed(lambda: column.profile(con, sample=1), repeat=1)
+    print("profile (1%% sample): %.2fs" % elapsed)
+    for p in profile:
+        print("  %-10s %-8s %6.1f%%" % (p.key, p.json_type, 100 * p.fraction))
+
+    filters = {"age": 42, "city": "Oslo"}
+    keys = ["name", "age", "city"]
+    queries = {
+        "filter age=42 AND city='Oslo'": column.select_query(keys, filters),
+        "filter name = 'person 12345'": column.select_query(keys, {"name": "person 12345"}),
+    }
+    before = {label: timed(lambda q=q: con.execute(*q).fetchall()) for label, q in queries.items()}
+    extract_sql, extract_params = column.select_query(["name", "age", "active"], limit=args.decode_rows)
+    before_extract = timed(lambda: con.execute(extract_sql, extract_params).fetchall())[0]
+
+    elapsed = timed(lambda: column.promote(con, min_fraction=0.5, sample=1), repeat=1)[0]
+    print("\npromoted %s in %.2fs" % (", ".join(sorted(column.promoted)), elapsed))
+    con.execute("ANALYZE")
+
+    after_queries = {
+        "filter age=42 AND city='Oslo'": column.select_query(keys, filters),
+        "filter name = 'person 12345'": column.select_query(keys, {"name": "person 12345"}),
+    }
+    print("\n%-32s %12s %12s" % ("", "before", "after"))
+    for label, query in after_queries.items():
+        after = timed(lambda q=query: con.execute(*q).fetchall())
+        assert sorted(after[1]) == sorted(before[label][1])
+        print("%-32s %10.2fms %10.2fms" % (label, 1e3 * before[label][0], 1e3 * after[0]))
+    extract_sql, extract_params = column.select_query(["name", "age", "active"], limit=args.decode_rows)
+    after_extract = timed(lambda: con.execute(extract_sql, extract_params).fetchall())[0]
+    print("%-32s %10.2fms %10.2fms" % ("extract %d rows" % args.decode_rows,
+                                       1e3 * before_extract, 1e3 * after_extract))
+
+    decoder = JsonRecordDecoder({"name": str, "age": int, "city": str, "active": bool}, name="Person")
+    raw = [r[0] for r in con.execute("SELECT data FROM person_table LIMIT ?", (args.decode_rows,))]
+    rows = con.execute(*column.select_query(["name", "age", "city", "active"],
+                                            limit=args.decode_rows)).fetchall()
+    print("\nPython decoding of %d rows" % args.decode_rows)
+    print("  json.loads -> dicts        %8.1f ms" % (1e3 * timed(lambda: [json.loads(d) for d in raw])[0]))
+    print("  decoder.records (slots)    %8.1f ms" % (1e3 * timed(lambda: decoder.records(raw))[0]))
+    print("  decoder.arrays             %8.1f ms" % (1e3 * timed(lambda: decoder.arrays(raw))[0]))
+    print("  promoted rows -> arrays    %8.1f ms" % (1e3 * timed(lambda: decoder.rows_to_arrays(rows))[0]))
+
+
+if __name__ == "__main__":
+    main()
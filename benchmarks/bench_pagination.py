@@ -0,0 +1,84 @@
+"""Per-page latency of OFFSET, ROW_NUMBER() and keyset pagination (SQLite).
+
+    python benchmarks/bench_pagination.py --rows 1000000 --page-size 50
+
+Uses an in-memory SQLite database as a local stand-in for PostgreSQL; the
+shape of the results (OFFSET/ROW_NUMBER growing linearly with page depth,
+keyset staying flat) is the same on both.
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+
+from odoo_pysql.pagination import KeysetPaginator
+
+CHECKPOINTS = (1, 10, 100, 1000, 10000)
+
+
+def timed(fn, repeat=3):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE orders (order_id INTEGER PRIMARY KEY, customer_id INTEGER, amount REAL NOT NULL)")
+    rng = random.Random(0)
+    con.executemany(
+        "INSERT INTO orders VALUES (?, ?, ?)",
+        ((i, rng.randint(1, 10_000), round(rng.random() * 10_000, 2)) for i in range(1, args.rows + 1)),
+    )
+    paginator = KeysetPaginator("orders", columns=("order_id", "customer_id", "amount"),
+                                page_size=args.page_size, paramstyle="qmark")
+    paginator.ensure_index(con)
+    con.execute("ANALYZE")
+
+    checkpoints = [p for p in CHECKPOINTS if (p - 1) * args.page_size < args.rows]
+    order = "ORDER BY amount DESC, order_id DESC"
+    offset_sql = "SELECT order_id, customer_id, amount FROM orders %s LIMIT ? OFFSET ?" % order
+    row_number_sql = (
+        "SELECT order_id, customer_id, amount FROM ("
+        " SELECT order_id, customer_id, amount, ROW_NUMBER() OVER (%s) AS row_num FROM orders"
+        ") WHERE row_num BETWEEN ? AND ?" % order
+    )
+
+    keyset = {}
+    cursor = None
+    for page in range(1, checkpoints[-1] + 1):
+        start = time.perf_counter()
+        rows, next_cursor = paginator.fetch_page(con, cursor)
+        elapsed = time.perf_counter() - start
+        if page in checkpoints:
+            # Re-run the same page a couple of times for a steadier number.
+            keyset[page] = statistics.median(
+                [elapsed] + [timed(lambda c=cursor: paginator.fetch_page(con, c), repeat=1) for _ in range(2)]
+            )
+            expected = con.execute(offset_sql, (args.page_size, (page - 1) * args.page_size)).fetchall()
+            assert rows == expected, "keyset page %d differs from OFFSET page" % page
+        cursor = next_cursor
+
+    print("%d rows, page size %d; latency per page in ms" % (args.rows, args.page_size))
+    print("%8s %12s %12s %12s" % ("page", "OFFSET", "ROW_NUMBER", "keyset"))
+    for page in checkpoints:
+        first = (page - 1) * args.page_size
+        offset_time = timed(lambda: con.execute(offset_sql, (args.page_size, first)).fetchall())
+        row_number_time = timed(
+            lambda: con.execute(row_number_sql, (first + 1, first + args.page_size)).fetchall(), repeat=1
+        )
+        print("%8d %12.3f %12.3f %12.3f" % (page, offset_time * 1e3, row_number_time * 1e3, keyset[page] * 1e3))
+
+
+if __name__ == "__main__":
+    main()
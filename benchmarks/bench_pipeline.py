@@ -0,0 +1,129 @@
+"""Fused lazy pipelines vs eager comprehensions: throughput and peak memory (Q7).
+
+    python benchmarks/bench_pipeline.py --rows 10000000 --records 1000000 --workers 4
+
+Three workloads:
+
+- the notes' ``x**2 for x in range(n) if x % 2 == 0`` over ``--rows``
+  integers (vectorized, per item, and summed lazily);
+- a three-step transform of ``--records`` order lines, written as one
+  comprehension per step (as copied around) and as one :class:`Pipeline`;
+- a CPU-bound stage on the process pool (``--workers``, default: CPU count).
+
+Each variant is timed once, then run again under ``tracemalloc`` for its
+peak memory (NumPy reports its buffers there too), excluding the input.
+"""
+
+import argparse
+import os
+import random
+import time
+import tracemalloc
+
+from odoo_pysql.pipeline import Pipeline
+
+
+def measure(fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def report(label, items, elapsed, peak):
+    print("  %-38s %7.3fs  %7.1f M items/s  peak %8.1f MiB"
+          % (label, elapsed, items / elapsed / 1e6, peak / 2 ** 20))
+
+
+def is_even(x):
+    return x % 2 == 0
+
+
+def square(x):
+    return x ** 2
+
+
+def line_total(line):
+    order_id, quantity, unit_price, discount = line
+    return order_id, quantity * unit_price * (1 - discount)
+
+
+def is_large(pair):
+    return pair[1] > 100
+
+
+def rounded(pair):
+    return pair[0], round(pair[1], 2)
+
+
+def collatz_steps(x):
+    steps = 0
+    x += 1
+    while x != 1:
+        x = x // 2 if x % 2 == 0 else 3 * x + 1
+        steps += 1
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--pool-rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    n = args.rows
+    print("even squares of range(%d)" % n)
+    elapsed, peak, eager = measure(lambda: [x ** 2 for x in range(n) if x % 2 == 0])
+    report("eager list comprehension", n, elapsed, peak)
+    pipeline = Pipeline(range(n), vectorize=True).filter(is_even).map(square)
+    elapsed, peak, result = measure(pipeline.to_list)
+    assert result == eager
+    del eager, result
+    report("Pipeline.to_list (vectorized)", n, elapsed, peak)
+    elapsed, peak, _ = measure(pipeline.to_array)
+    report("Pipeline.to_array (vectorized)", n, elapsed, peak)
+    elapsed, peak, _ = measure(Pipeline(range(n), vectorize=False).filter(is_even).map(square).to_list)
+    report("Pipeline.to_list (per item, fused)", n, elapsed, peak)
+    elapsed, peak, expected = measure(lambda: sum([x ** 2 for x in range(n) if x % 2 == 0]))
+    report("sum(eager list)", n, elapsed, peak)
+    elapsed, peak, total = measure(lambda: sum(pipeline))
+    assert total == expected
+    report("sum(Pipeline) (lazy)", n, elapsed, peak)
+
+    rng = random.Random(0)
+    records = [(i, rng.randint(1, 20), round(rng.uniform(1, 50), 2), rng.choice((0, 0, 0.05, 0.1)))
+               for i in range(args.records)]
+    print("\norder lines -> {order_id: total} for totals above 100, %d records" % args.records)
+
+    def staged():
+        totals = [line_total(line) for line in records]
+        large = [pair for pair in totals if is_large(pair)]
+        return dict([rounded(pair) for pair in large])
+
+    elapsed, peak, eager = measure(staged)
+    report("one comprehension per step", args.records, elapsed, peak)
+    elapsed, peak, result = measure(Pipeline(records).map(line_total).filter(is_large).map(rounded).to_dict)
+    assert result == eager
+    report("Pipeline.to_dict (fused)", args.records, elapsed, peak)
+    elapsed, peak, _ = measure(
+        lambda: dict(rounded(p) for p in (line_total(r) for r in records) if is_large(p)))
+    report("chained generator expressions", args.records, elapsed, peak)
+
+    print("\nCPU-bound stage (Collatz steps) over %d items" % args.pool_rows)
+    elapsed, peak, eager = measure(lambda: [collatz_steps(x) for x in range(args.pool_rows)])
+    report("eager list comprehension", args.pool_rows, elapsed, peak)
+    pipeline = Pipeline(range(args.pool_rows), vectorize=False).map(collatz_steps)
+    elapsed, peak, result = measure(lambda: pipeline.to_list(workers=args.workers))
+    assert result == eager
+    report("Pipeline.to_list(workers=%d)" % args.workers, args.pool_rows, elapsed, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Memory per record and attribute access: dict-backed classes vs slots vs a columnar table (Q6, Q9).
+
+    python benchmarks/bench_records.py --rows 1000000
+
+Loads ``--rows`` ``(name, age)`` rows from an SQLite ``employees`` table
+into the notes' ``Person`` class, a :func:`record_class` slotted class and a
+:class:`PersonTable`, measuring memory still held afterwards with
+``tracemalloc`` (names included, as each row brings its own string), then
+times reading ``age`` and ``name`` from every record. The Q6 ``MyClass``
+is measured the same way with a single attribute.
+"""
+
+import argparse
+import gc
+import sqlite3
+import statistics
+import time
+import tracemalloc
+
+import pandas as pd
+
+from odoo_pysql.records import PersonTable, record_class
+
+
+class Person:
+    def __init__(self, name, age):
+        self.name = name
+        self.age = age
+
+
+class MyClass:
+    def __init__(self, value):
+        self.value = value
+
+    def original_method(self):
+        return "Original behavior"
+
+
+SlottedPerson = record_class("Person", [("name", str), ("age", int)])
+SlottedMyClass = record_class("MyClass", [("value", int)],
+                              namespace={"original_method": MyClass.original_method})
+
+
+def timed(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def retained(build):
+    """(seconds, bytes still allocated once ``build()`` returns, result).
+
+    Timed without tracing, then built again under ``tracemalloc``.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, current, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE employees (employee_id INTEGER PRIMARY KEY, name TEXT, age INTEGER)")
+    con.executemany("INSERT INTO employees VALUES (?, ?, ?)",
+                    ((i, "employee %d" % i, 18 + i % 50) for i in range(args.rows)))
+    query = "SELECT name, age FROM employees"
+
+    print("%d persons loaded from a cursor" % args.rows)
+    results = {}
+    for label, build in (
+        ("Person (__dict__)", lambda: [Person(name, age) for name, age in con.execute(query)]),
+        ("record_class (__slots__)", lambda: [SlottedPerson(name, age) for name, age in con.execute(query)]),
+        ("PersonTable", lambda: PersonTable.from_cursor(con.execute(query))),
+    ):
+        elapsed, size, people = retained(build)
+        results[label] = people
+        print("  %-26s load %6.2fs   %6.1f bytes/record   %7.1f MiB"
+              % (label, elapsed, size / args.rows, size / 2 ** 20))
+
+    frame = pd.read_sql_query(query, con)
+    elapsed, _ = timed(lambda: PersonTable.from_frame(frame))
+    print("  PersonTable.from_frame     load %6.2fs" % elapsed)
+
+    print("\nsum of ages / total name length over every record")
+    for label, people in results.items():
+        age_time, ages = timed(lambda: sum(p.age for p in people))
+        name_time, _ = timed(lambda: sum(len(p.name) for p in people))
+        print("  %-26s age %6.3fs   name %6.3fs   (%.0f ns per age read)"
+              % (label, age_time, name_time, 1e9 * age_time / args.rows))
+    table = results["PersonTable"]
+    age_time, _ = timed(lambda: sum(age for _, age in table.itertuples()))
+    name_time, _ = timed(lambda: sum(len(name) for name, _ in table.itertuples()))
+    print("  %-26s age %6.3fs   name %6.3fs" % ("PersonTable.itertuples()", age_time, name_time))
+    elapsed, total = timed(lambda: int(table.column("age").sum(dtype="int64")))
+    assert total == ages
+    print("  %-26s age %6.3fs" % ("PersonTable.column('age')", elapsed))
+
+    print("\nQ6 MyClass, %d instances with one int attribute" % args.rows)
+    for label, cls in (("MyClass (__dict__)", MyClass), ("record_class (__slots__)", SlottedMyClass)):
+        elapsed, size, objects = retained(lambda: [cls(i) for i in range(args.rows)])
+        call_time, _ = timed(lambda: [o.original_method() for o in objects])
+        print("  %-26s build %5.2fs   %6.1f bytes/instance   method calls %6.3fs"
+              % (label, elapsed, size / args.rows, call_time))
+        del objects
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Dashboard refresh latency with and without the result cache (SQLite).
+
+    python benchmarks/bench_result_cache.py --rows 1000000 --refreshes 500 --write-every 50
+
+Each refresh runs the Q17 aggregates over ``order_details`` and the Q13
+orders/customers join for one of ``--customers-shown`` customers. Every
+``--write-every`` refreshes an order line is inserted; SQLite triggers
+(the local stand-in for LISTEN/NOTIFY) invalidate the dependent entries.
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+
+from odoo_pysql.result_cache import ResultCache
+
+AGGREGATES = ("SELECT AVG(amount) AS avg_amount, MAX(amount) AS max_amount, MIN(amount) AS min_amount"
+              " FROM order_details")
+JOIN = ("SELECT o.order_id, o.order_date, c.customer_name FROM orders o"
+        " JOIN customers c ON o.customer_id = c.customer_id WHERE c.customer_id = ?")
+
+
+def build(rows):
+    rng = random.Random(0)
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, customer_name TEXT)")
+    con.execute("CREATE TABLE orders (order_id INTEGER PRIMARY KEY, customer_id INTEGER, order_date TEXT)")
+    con.execute("CREATE TABLE order_details (order_id INTEGER, product_id INTEGER, amount REAL)")
+    con.executemany("INSERT INTO customers VALUES (?, ?)", ((i, "customer %d" % i) for i in range(1, 10_001)))
+    con.executemany("INSERT INTO orders VALUES (?, ?, ?)",
+                    ((i, rng.randint(1, 10_000), "2023-%02d-01" % rng.randint(1, 12)) for i in range(1, rows // 5 + 1)))
+    con.executemany("INSERT INTO order_details VALUES (?, ?, ?)",
+                    ((rng.randint(1, rows // 5), rng.randint(1, 500), round(rng.random() * 100, 2))
+                     for _ in range(rows)))
+    con.execute("CREATE INDEX orders_customer_idx ON orders (customer_id)")
+    con.commit()
+    return con
+
+
+def run(con, args, cache):
+    rng = random.Random(1)
+    latencies = []
+    for refresh in range(args.refreshes):
+        if refresh and refresh % args.write_every == 0:
+            con.execute("INSERT INTO order_details VALUES (?, ?, ?)", (1, 1, rng.random() * 100))
+            con.commit()
+        customer = rng.randint(1, args.customers_shown)
+        start = time.perf_counter()
+        if cache is None:
+            con.execute(AGGREGATES).fetchall()
+            con.execute(JOIN, (customer,)).fetchall()
+        else:
+            cache.fetch(con, AGGREGATES)
+            cache.fetch(con, JOIN, (customer,))
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return statistics.mean(latencies), latencies[int(0.99 * (len(latencies) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--refreshes", type=int, default=500)
+    parser.add_argument("--write-every", type=int, default=50)
+    parser.add_argument("--customers-shown", type=int, default=200)
+    parser.add_argument("--max-entries", type=int, default=256)
+    args = parser.parse_args()
+
+    con = build(args.rows)
+    mean, p99 = run(con, args, None)
+    print("no cache:    mean %7.3f ms   p99 %7.3f ms" % (1e3 * mean, 1e3 * p99))
+
+    cache = ResultCache(max_entries=args.max_entries)
+    cache.attach_sqlite(con, ["order_details", "orders", "customers"])
+    mean, p99 = run(con, args, cache)
+    print("with cache:  mean %7.3f ms   p99 %7.3f ms" % (1e3 * mean, 1e3 * p99))
+    stats = cache.stats
+    print("hits %d, misses %d (hit ratio %.1f%%), evictions %d, invalidations %d, %d entries / %.1f KiB"
+          % (stats["hits"], stats["misses"], 100 * cache.hit_ratio, stats["evictions"],
+             stats["invalidations"], len(cache), cache.nbytes / 1024))
+
+
+if __name__ == "__main__":
+    main()
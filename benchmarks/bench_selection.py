@@ -0,0 +1,91 @@
+"""Nth-highest distinct salary by selection vs a full sort (Q14).
+
+    python benchmarks/bench_selection.py --rows 10000000 --departments 100 --sql-rows 1000000
+
+Times :func:`nth_largest_distinct` (overall and per department) against
+``np.unique`` / pandas ``drop_duplicates().nlargest`` on ``--rows`` salaries,
+at half and full size to show the linear scaling, then compares the
+generated SQL forms with ``ORDER BY ... LIMIT 1 OFFSET n-1`` on an
+indexed SQLite table of ``--sql-rows`` employees.
+"""
+
+import argparse
+import sqlite3
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+from odoo_pysql.selection import index_sql, nth_highest_sql, nth_largest_distinct, nth_largest_distinct_by, top_k
+
+
+def timed(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def salaries(rows, departments, seed=0):
+    rng = np.random.default_rng(seed)
+    return (np.round(rng.lognormal(10.5, 0.4, rows), 2),
+            rng.integers(1, departments + 1, rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--departments", type=int, default=100)
+    parser.add_argument("--sql-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    salary, department = salaries(args.rows, args.departments)
+    for rows in (args.rows // 2, args.rows):
+        values = salary[:rows]
+        print("%d rows" % rows)
+        for n in (2, 10, 100):
+            sort_time, expected = timed(lambda: np.unique(values)[-n].item())
+            select_time, got = timed(lambda: nth_largest_distinct(values, n))
+            assert got == expected
+            print("  n=%-4d np.unique %7.3fs   nth_largest_distinct %7.3fs" % (n, sort_time, select_time))
+        sort_time, _ = timed(lambda: np.sort(values)[-100:][::-1])
+        select_time, _ = timed(lambda: top_k(values, 100))
+        print("  top 100  np.sort   %7.3fs   top_k                %7.3fs" % (sort_time, select_time))
+
+        frame = pd.DataFrame({"department_id": department[:rows], "salary": values})
+        for n in (2, 10):
+            pandas_time, expected = timed(lambda: frame.drop_duplicates().groupby("department_id")["salary"]
+                                          .nlargest(n).groupby(level=0).last())
+            select_time, got = timed(lambda: nth_largest_distinct_by(frame["salary"], frame["department_id"], n))
+            assert np.array_equal(got.to_numpy(), expected.to_numpy())
+            print("  per department, n=%-3d pandas %7.3fs   nth_largest_distinct_by %7.3fs"
+                  % (n, pandas_time, select_time))
+
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE employees (employee_id INTEGER PRIMARY KEY, department_id INTEGER, salary REAL)")
+    con.executemany("INSERT INTO employees VALUES (?, ?, ?)",
+                    zip(range(args.sql_rows), department[:args.sql_rows].tolist(),
+                        salary[:args.sql_rows].tolist()))
+    offset = "SELECT DISTINCT salary FROM employees ORDER BY salary DESC LIMIT 1 OFFSET ?"
+    print("\nSQLite, %d employees" % args.sql_rows)
+    elapsed, _ = timed(lambda: con.execute(offset, (1,)).fetchall())
+    print("  n=2    LIMIT/OFFSET without an index %8.3f ms" % (1e3 * elapsed))
+    con.execute(index_sql())
+    con.execute(index_sql(partition_by="department_id"))
+    for n in (2, 3, 10, 100):
+        offset_time, (expected,) = timed(lambda: con.execute(offset, (n - 1,)).fetchall())
+        sql, params = nth_highest_sql(n=n, dialect="sqlite")
+        select_time, (got,) = timed(lambda: con.execute(sql, params).fetchall())
+        assert got == expected
+        print("  n=%-4d LIMIT/OFFSET %8.3f ms   generated %8.3f ms" % (n, 1e3 * offset_time, 1e3 * select_time))
+    for style in ("max", "dense_rank"):
+        sql, params = nth_highest_sql(n=2, partition_by="department_id", style=style, dialect="sqlite")
+        elapsed, rows = timed(lambda: con.execute(sql, params).fetchall())
+        print("  per department, n=2, %-10s %8.3f ms (%d departments)" % (style, 1e3 * elapsed, len(rows)))
+
+
+if __name__ == "__main__":
+    main()
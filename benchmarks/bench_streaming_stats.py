@@ -0,0 +1,91 @@
+"""Streaming, mergeable order_details statistics vs an in-memory pandas groupby.
+
+    python benchmarks/bench_streaming_stats.py --rows 10000000 --customers 10000 --files 4
+
+Generates ``amount``/``customer_id`` chunks, aggregates them with
+:class:`StreamingAggregator` (one pass, O(customers) state), compares the
+result with ``DataFrame.groupby`` over the concatenated data, then writes
+the rows to ``--files`` CSV extracts and aggregates those on a process
+pool (``--workers``, default: CPU count), merging the per-file partial
+results.
+"""
+
+import argparse
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from odoo_pysql.streaming_stats import StreamingAggregator
+
+
+def chunks(rows, customers, chunk_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - start)
+        yield pd.DataFrame({
+            "customer_id": rng.integers(1, customers + 1, n),
+            "amount": np.round(rng.lognormal(3.0, 1.0, n), 2),
+        })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--customers", type=int, default=10_000)
+    parser.add_argument("--chunk-rows", type=int, default=500_000)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    for compression, label in ((None, "moments only"), (200, "moments + t-digest")):
+        aggregator = StreamingAggregator(by="customer_id", compression=compression)
+        start = time.perf_counter()
+        for chunk in chunks(args.rows, args.customers, args.chunk_rows):
+            aggregator.update_frame(chunk)
+        streaming = aggregator.result()
+        elapsed = time.perf_counter() - start
+        print("streaming, %-20s %6.2fs  state %.1f MiB" % (
+            label + ":", elapsed, len(pickle.dumps(aggregator)) / 2 ** 20))
+
+    start = time.perf_counter()
+    frame = pd.concat(chunks(args.rows, args.customers, args.chunk_rows), ignore_index=True)
+    grouped = frame.groupby("customer_id")["amount"]
+    reference = grouped.agg(["count", "mean", "var", "min", "max"])
+    reference["p50"] = grouped.median()
+    reference["p99"] = grouped.quantile(0.99)
+    elapsed = time.perf_counter() - start
+    print("pandas in memory:                %6.2fs  data %.1f MiB"
+          % (elapsed, frame.memory_usage(deep=True).sum() / 2 ** 20))
+
+    streaming = streaming.loc[reference.index]
+    for column in ("mean", "var", "min", "max"):
+        error = np.max(np.abs(streaming[column] - reference[column]) / np.abs(reference[column]))
+        print("  max relative difference in %-4s %.2e" % (column, error))
+    for column in ("p50", "p99"):
+        error = np.median(np.abs(streaming[column] - reference[column]) / reference[column])
+        print("  median relative error in %-4s   %.2e" % (column, error))
+
+    workdir = tempfile.mkdtemp(prefix="bench_streaming_stats_")
+    try:
+        paths = [os.path.join(workdir, "order_details_%d.csv" % i) for i in range(args.files)]
+        for i, chunk in enumerate(chunks(args.rows, args.customers, args.chunk_rows)):
+            path = paths[i % args.files]
+            chunk.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+        start = time.perf_counter()
+        merged = StreamingAggregator.from_files(paths, by="customer_id", workers=args.workers).result()
+        elapsed = time.perf_counter() - start
+        merged = merged.loc[reference.index]
+        print("\n%d CSV files on %d workers, merged: %.2fs (max count difference %d, max mean difference %.2e)"
+              % (args.files, args.workers, elapsed, (merged["count"] - reference["count"]).abs().max(),
+                 np.max(np.abs(merged["mean"] - reference["mean"]) / reference["mean"])))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Trailing zeroes of n! in many bases: per query vs count_trailing_zeroes_batch (Q11).
+
+    python benchmarks/bench_trailing_zeroes.py --queries 1000000 --max-n 1000000000
+
+Runs ``--queries`` ``(n, base)`` queries for three base mixes: one base
+(10), repeated bases (2..999, the grouped per-base path) and mostly
+distinct bases up to 1e6 and 1e9 (the ``factorize_batch`` path). The
+per-query loop over :func:`count_trailing_zeroes` is timed on a sample of
+``--loop-queries`` and extrapolated; its LRU cache only helps when bases
+repeat.
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from odoo_pysql import trailing_zeroes
+from odoo_pysql.trailing_zeroes import count_trailing_zeroes, count_trailing_zeroes_batch
+
+
+def timed(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=1_000_000)
+    parser.add_argument("--loop-queries", type=int, default=2_000)
+    parser.add_argument("--max-n", type=int, default=10 ** 9)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ns = rng.integers(0, args.max_n, args.queries)
+    print("%d queries, n below %d; seconds" % (args.queries, args.max_n))
+    print("  %-22s %10s %14s %12s %10s" % ("bases", "distinct", "per query*", "batch", "speed-up"))
+    for label, bases in (
+        ("10", np.full(args.queries, 10)),
+        ("2..999", rng.integers(2, 1000, args.queries)),
+        ("2..1e6", rng.integers(2, 10 ** 6, args.queries)),
+        ("2..1e9", rng.integers(2, 10 ** 9, args.queries)),
+    ):
+        trailing_zeroes.factorize.cache_clear()
+        sample = slice(0, args.loop_queries)
+        loop, expected = timed(lambda: [count_trailing_zeroes(n, b) for n, b in
+                                        zip(ns[sample].tolist(), bases[sample].tolist())], repeat=1)
+        loop *= args.queries / args.loop_queries
+        batch, result = timed(lambda: count_trailing_zeroes_batch(ns, bases))
+        assert result[sample].tolist() == expected
+        print("  %-22s %10d %13.2fs %11.3fs %9.0fx"
+              % (label, len(np.unique(bases)), loop, batch, loop / batch))
+    print("* extrapolated from %d queries" % args.loop_queries)
+
+
+if __name__ == "__main__":
+    main()
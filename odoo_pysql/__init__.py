@@ -0,0 +1,98 @@
+"""Helpers built out of the Python / PostgreSQL answers in ``python&SQL.py``."""
+
+from .async_executor import AsyncQueryExecutor
+from .batch_executor import BatchExecutor, Evaluation, Guard, missing, zero_divisor
+from .bulk_loader import BatchResult, BulkLoader, LoadReport
+from .frame_buffer import FrameBuffer
+from .hierarchy import AncestorCache, HierarchyError, HierarchyIndex
+from .instrumentation import LatencyHistogram, MetricsRegistry, Patcher, timed
+from .join_index import JoinIndex
+from .jsonb import JsonbColumn, JsonRecordDecoder, KeyProfile
+from .missing_numbers import (
+    MissingNumberAccumulator,
+    find_missing_bitmap,
+    find_missing_number,
+    find_missing_numbers,
+    parallel_find_missing_numbers,
+)
+from .missing_values import MissingValuePipeline
+from .pagination import InvalidCursor, KeysetPaginator
+from .perfect_square import is_perfect_square, is_perfect_square_batch
+from .pipeline import Pipeline
+from .records import PersonTable, RecordTable, record_class
+from .replace import ReplacementRules
+from .result_cache import ResultCache, normalize_sql, notify_trigger_sql, referenced_tables
+from .revenue_rollup import MonthlyRevenueRollup, month_bounds, revenue_range_query
+from .selection import (
+    index_sql,
+    nth_highest_sql,
+    nth_largest_distinct,
+    nth_largest_distinct_by,
+    top_k,
+)
+from .streaming_stats import StreamingAggregator, TDigest
+from .trailing_zeroes import (
+    count_trailing_zeroes,
+    count_trailing_zeroes_batch,
+    factorize,
+    factorize_batch,
+    legendre_exponent,
+)
+
+__all__ = [
+    "AncestorCache",
+    "AsyncQueryExecutor",
+    "BatchExecutor",
+    "BatchResult",
+    "BulkLoader",
+    "Evaluation",
+    "FrameBuffer",
+    "Guard",
+    "HierarchyError",
+    "HierarchyIndex",
+    "InvalidCursor",
+    "JoinIndex",
+    "JsonRecordDecoder",
+    "JsonbColumn",
+    "KeyProfile",
+    "KeysetPaginator",
+    "LatencyHistogram",
+    "LoadReport",
+    "MetricsRegistry",
+    "MissingNumberAccumulator",
+    "MissingValuePipeline",
+    "MonthlyRevenueRollup",
+    "Patcher",
+    "PersonTable",
+    "Pipeline",
+    "RecordTable",
+    "ReplacementRules",
+    "ResultCache",
+    "StreamingAggregator",
+    "TDigest",
+    "count_trailing_zeroes",
+    "count_trailing_zeroes_batch",
+    "factorize",
+    "factorize_batch",
+    "find_missing_bitmap",
+    "find_missing_number",
+    "find_missing_numbers",
+    "index_sql",
+    "is_perfect_square",
+    "is_perfect_square_batch",
+    "legendre_exponent",
+    "missing",
+    "month_bounds",
+    "normalize_sql",
+    "notify_trigger_sql",
+    "nth_highest_sql",
+    "nth_largest_distinct",
+    "nth_largest_distinct_by",
+    "parallel_find_missing_numbers",
+    "record_class",
+    "referenced_tables",
+    "revenue_range_query",
+    "timed",
+    "top_k",
+    "zero_divisor",
+]
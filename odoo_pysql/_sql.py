@@ -0,0 +1,31 @@
+"""Small SQL-building helpers shared by the query modules."""
+
+import re
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+
+# DB-API paramstyle -> placeholder: psycopg2 uses "format", sqlite3 "qmark".
+PLACEHOLDERS = {"format": "%s", "qmark": "?"}
+
+# Default paramstyle per dialect.
+DIALECT_PARAMSTYLES = {"postgresql": "format", "sqlite": "qmark"}
+
+
+def check_identifier(name):
+    """Return ``name`` if it is a plain (optionally schema-qualified) identifier."""
+    if not _IDENTIFIER.match(name):
+        raise ValueError("invalid SQL identifier: %r" % name)
+    return name
+
+
+def placeholder(paramstyle):
+    try:
+        return PLACEHOLDERS[paramstyle]
+    except KeyError:
+        raise ValueError("paramstyle must be one of %s" % ", ".join(PLACEHOLDERS)) from None
+
+
+def check_dialect(dialect):
+    if dialect not in DIALECT_PARAMSTYLES:
+        raise ValueError("dialect must be one of %s" % ", ".join(DIALECT_PARAMSTYLES))
+    return dialect
@@ -0,0 +1,234 @@
+"""Pooled asyncio executor for the reporting queries (Q13, Q17, Q19).
+
+Opening a connection per request costs a TCP/TLS handshake, authentication
+and a backend fork before the first byte of the query is sent, and every
+statement is parsed and planned again. :class:`AsyncQueryExecutor` keeps:
+
+- a bounded pool of connections, opened lazily and reused; callers wait
+  for a free one instead of piling more backends onto the server;
+- per-connection prepared statements keyed by SQL text (LRU, at most
+  ``statement_cache_size`` each), so a hot report is planned once per
+  connection;
+- :meth:`~AsyncQueryExecutor.fetch_many`, which sends independent queries
+  down one connection in pipeline mode and waits for the results once,
+  rather than paying a round trip per query.
+
+The PostgreSQL backend uses psycopg 3 (imported on first use). The
+``sqlite`` backend runs each pooled ``sqlite3`` connection on its own
+worker thread; it has the same interface and is what the offline benchmark
+uses.
+"""
+
+import asyncio
+import collections
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ._sql import DIALECT_PARAMSTYLES, check_dialect, placeholder
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_STATEMENT_CACHE_SIZE = 256
+
+
+class _StatementCache:
+    """LRU of SQL texts prepared on one connection (bookkeeping and stats)."""
+
+    def __init__(self, size, stats):
+        self.size = size
+        self.stats = stats
+        self._texts = collections.OrderedDict()
+
+    def note(self, sql):
+        """Record a use of ``sql``; returns True if it was already prepared."""
+        if sql in self._texts:
+            self._texts.move_to_end(sql)
+            self.stats["statement_hits"] += 1
+            return True
+        self.stats["statement_misses"] += 1
+        self._texts[sql] = None
+        if len(self._texts) > self.size:
+            self._texts.popitem(last=False)
+            self.stats["statement_evictions"] += 1
+        return False
+
+
+class _SQLiteConnection:
+    def __init__(self, database, statement_cache_size, stats, connect_kwargs):
+        # One thread per connection: sqlite3 objects must not be used from
+        # two threads at once, and queries on different connections overlap.
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-pool")
+        self._database = database
+        self._kwargs = dict(connect_kwargs, check_same_thread=False, cached_statements=statement_cache_size)
+        self._conn = None
+        self.statements = _StatementCache(statement_cache_size, stats)
+        self.closed = False
+
+    async def _call(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._thread, fn, *args)
+
+    def _open(self):
+        self._conn = sqlite3.connect(self._database, **self._kwargs)
+
+    async def open(self):
+        await self._call(self._open)
+
+    def _run(self, queries):
+        results = []
+        try:
+            for sql, params in queries:
+                results.append(self._conn.execute(sql, params).fetchall())
+        except Exception:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+        return results
+
+    async def fetch_many(self, queries):
+        for sql, _ in queries:
+            self.statements.note(sql)
+        # A single hop to the worker thread for the whole batch.
+        return await self._call(self._run, queries)
+
+    async def close(self):
+        if self._conn is not None:
+            await self._call(self._conn.close)
+        self._thread.shutdown(wait=False)
+        self.closed = True
+
+
+class _PsycopgConnection:
+    def __init__(self, dsn, statement_cache_size, stats, connect_kwargs):
+        self._dsn = dsn
+        self._kwargs = connect_kwargs
+        self._size = statement_cache_size
+        self._conn = None
+        self.statements = _StatementCache(statement_cache_size, stats)
+
+    @property
+    def closed(self):
+        return self._conn is None or self._conn.closed
+
+    async def open(self):
+        import psycopg
+
+        self._conn = await psycopg.AsyncConnection.connect(self._dsn, autocommit=True, **self._kwargs)
+        # psycopg keeps its own LRU of server-side prepared statements keyed
+        # by query text; size it like ours so the two agree.
+        self._conn.prepared_max = self._size
+
+    async def fetch_many(self, queries):
+        for sql, _ in queries:
+            self.statements.note(sql)
+        if len(queries) == 1:
+            sql, params = queries[0]
+            cur = await self._conn.execute(sql, params, prepare=True)
+            return [await cur.fetchall()]
+        cursors = []
+        async with self._conn.pipeline():
+            for sql, params in queries:
+                cur = self._conn.cursor()
+                await cur.execute(sql, params, prepare=True)
+                cursors.append(cur)
+        return [await cur.fetchall() for cur in cursors]
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+
+
+class AsyncQueryExecutor:
+    """Run queries on a bounded pool of connections.
+
+    ``target`` is a libpq DSN for ``dialect="postgresql"`` or a database
+    path for ``"sqlite"`` (use a file, or a shared-cache URI with
+    ``uri=True`` in ``connect_kwargs``: plain ``:memory:`` gives every
+    pooled connection its own empty database). Use it as an async context
+    manager, or call :meth:`close`.
+    """
+
+    def __init__(self, target, dialect="postgresql", pool_size=DEFAULT_POOL_SIZE,
+                 statement_cache_size=DEFAULT_STATEMENT_CACHE_SIZE, connect_kwargs=None):
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self.target = target
+        self.dialect = check_dialect(dialect)
+        self.mark = placeholder(DIALECT_PARAMSTYLES[dialect])
+        self.pool_size = pool_size
+        self.statement_cache_size = statement_cache_size
+        self.connect_kwargs = dict(connect_kwargs or {})
+        self.stats = collections.Counter()
+        self._idle = []
+        self._slots = None
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _new_connection(self):
+        backend = _PsycopgConnection if self.dialect == "postgresql" else _SQLiteConnection
+        return backend(self.target, self.statement_cache_size, self.stats, self.connect_kwargs)
+
+    async def _acquire(self):
+        if self._closed:
+            raise RuntimeError("executor is closed")
+        if self._slots is None:
+            # Created here so it binds to the running event loop.
+            self._slots = asyncio.Semaphore(self.pool_size)
+        start = time.perf_counter()
+        await self._slots.acquire()
+        self.stats["pool_wait_ns"] += int((time.perf_counter() - start) * 1e9)
+        if self._idle:
+            return self._idle.pop()
+        conn = self._new_connection()
+        try:
+            await conn.open()
+        except BaseException:
+            self._slots.release()
+            await conn.close()
+            raise
+        self.stats["connections_opened"] += 1
+        return conn
+
+    async def _release(self, conn):
+        if conn.closed or self._closed:
+            await conn.close()
+        else:
+            self._idle.append(conn)
+        self._slots.release()
+
+    async def fetch_many(self, queries):
+        """Run ``[(sql, params), ...]`` on one connection, pipelined.
+
+        Returns one list of rows per query, in order. The queries should
+        be independent: on PostgreSQL they run in autocommit mode, each
+        in its own implicit transaction.
+        """
+        queries = [(sql, tuple(params)) for sql, params in queries]
+        if not queries:
+            return []
+        conn = await self._acquire()
+        try:
+            results = await conn.fetch_many(queries)
+        finally:
+            await self._release(conn)
+        self.stats["queries"] += len(queries)
+        return results
+
+    async def fetch(self, sql, params=()):
+        """Run one query and return its rows."""
+        return (await self.fetch_many([(sql, params)]))[0]
+
+    async def gather(self, queries):
+        """Run ``queries`` concurrently, one pooled connection each."""
+        return await asyncio.gather(*(self.fetch(sql, params) for sql, params in queries))
+
+    async def close(self):
+        """Close idle connections now and busy ones as they are released."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            await conn.close()
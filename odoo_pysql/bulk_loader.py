@@ -0,0 +1,282 @@
+"""Set-based bulk loading of customers instead of ``CALL InsertCustomer`` (Q22).
+
+The ``InsertCustomer`` procedure inserts one row per ``CALL``: loading a
+million partners costs a million round trips, statement executions and
+(in autocommit mode) commits. :class:`BulkLoader` moves the records in
+batches:
+
+1. each batch is streamed with ``COPY staging (...) FROM STDIN`` into a
+   ``TEMP ... ON COMMIT DELETE ROWS`` staging table (no WAL, no
+   constraints, no indexes, emptied by each commit). Temporary tables are
+   private to the session, so loaders on different connections never see
+   each other's staged rows;
+2. one ``INSERT INTO customers ... SELECT ... FROM staging ON CONFLICT``
+   statement merges it, keeping the last record per conflict key;
+3. the batch commits on its own, so a bad batch is rolled back and
+   reported without losing the others. With ``bisect`` the failing batch
+   is split in halves until the offending records are isolated and the
+   rest still load. Malformed records (wrong number of values, not a
+   sequence) are rejected when the batch is built and never reach the
+   database.
+
+Batches are serialized on a producer thread into a bounded queue: when the
+database falls behind the producer blocks instead of reading the whole
+input into memory.
+
+SQLite (used for local benchmarks) has no ``COPY``; there the TEMP staging
+table is filled with ``executemany`` and emptied before each batch.
+"""
+
+import collections
+import queue
+import threading
+
+from ._sql import DIALECT_PARAMSTYLES, check_dialect, check_identifier, placeholder
+
+DEFAULT_BATCH_SIZE = 10_000
+
+# rows: records in the batch; loaded: how many of them were merged;
+# error: the first exception the batch raised, or None.
+BatchResult = collections.namedtuple("BatchResult", "index rows loaded error")
+
+
+class LoadReport:
+    """What a :meth:`BulkLoader.load` call did."""
+
+    def __init__(self):
+        self.batches = []
+        self.rejected = []
+
+    @property
+    def rows_loaded(self):
+        return sum(b.loaded for b in self.batches)
+
+    @property
+    def failed_batches(self):
+        return [b for b in self.batches if b.error is not None]
+
+    def __repr__(self):
+        return "<LoadReport batches=%d rows_loaded=%d failed=%d rejected=%d>" % (
+            len(self.batches), self.rows_loaded, len(self.failed_batches), len(self.rejected))
+
+
+def _copy_field(value):
+    # COPY ... (FORMAT csv): an unquoted empty field is NULL, "" is ''.
+    if value is None:
+        return ""
+    return '"%s"' % str(value).replace('"', '""')
+
+
+class _CopyStream:
+    """File-like object feeding CSV lines to ``copy_expert`` without building one big string."""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ""
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+        if size < 0:
+            data, self._buffer = self._buffer, ""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class BulkLoader:
+    """Load records into ``table`` through a staging table and one merge per batch.
+
+    ``columns`` are the loaded columns; records may be tuples in that order
+    or dicts. ``conflict`` is the unique key for ``ON CONFLICT`` (``None``
+    for a plain insert); ``update`` are the columns overwritten on conflict
+    (default: every non-key column; ``()`` means ``DO NOTHING``).
+    """
+
+    def __init__(self, table="customers", columns=("customer_name", "contact_email", "country"),
+                 conflict=("contact_email",), update=None, staging=None, batch_size=DEFAULT_BATCH_SIZE,
+                 max_pending=2, bisect=True, dialect="postgresql"):
+        self.table = check_identifier(table)
+        self.columns = [check_identifier(c) for c in columns]
+        self.conflict = [check_identifier(c) for c in conflict] if conflict else []
+        if update is None:
+            update = [c for c in self.columns if c not in self.conflict]
+        self.update = [check_identifier(c) for c in update]
+        self.staging = check_identifier(staging or "%s_staging" % table.replace(".", "_"))
+        if batch_size < 1 or max_pending < 1:
+            raise ValueError("batch_size and max_pending must be at least 1")
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.bisect = bisect
+        self.dialect = check_dialect(dialect)
+        self.mark = placeholder(DIALECT_PARAMSTYLES[dialect])
+        self._staging_ready = False
+
+    def staging_sql(self):
+        """Staging table with the target's column types and a load-order column."""
+        select = "SELECT %s, 0 AS load_row FROM %s" % (", ".join(self.columns), self.table)
+        if self.dialect == "postgresql":
+            return ("CREATE TEMP TABLE IF NOT EXISTS %s ON COMMIT DELETE ROWS AS %s WITH NO DATA"
+                    % (self.staging, select))
+        return "CREATE TEMP TABLE IF NOT EXISTS %s AS %s WHERE 0" % (self.staging, select)
+
+    def merge_sql(self):
+        """The single set-based statement moving a staged batch into ``table``."""
+        columns = ", ".join(self.columns)
+        sql = "INSERT INTO %s (%s)\nSELECT %s FROM %s" % (self.table, columns, columns, self.staging)
+        if not self.conflict:
+            return sql
+        key = ", ".join(self.conflict)
+        # ON CONFLICT cannot touch one target row twice per statement: keep
+        # the last staged record for each key. NULLs never conflict under a
+        # UNIQUE index, so records with a NULL key column are all kept.
+        nulls = "".join("%s IS NULL OR " % c for c in self.conflict)
+        sql += "\nWHERE %sload_row IN (SELECT max(load_row) FROM %s GROUP BY %s)" % (nulls, self.staging, key)
+        if self.update:
+            action = "DO UPDATE SET " + ", ".join("%s = EXCLUDED.%s" % (c, c) for c in self.update)
+        else:
+            action = "DO NOTHING"
+        return sql + "\nON CONFLICT (%s) %s" % (key, action)
+
+    def _row(self, record):
+        if isinstance(record, dict):
+            return tuple(record.get(c) for c in self.columns)
+        row = tuple(record)
+        if len(row) != len(self.columns):
+            raise ValueError("record has %d values, expected %d" % (len(row), len(self.columns)))
+        return row
+
+    def _batches(self, records):
+        """Yield ``(rows, rejected)``: up to ``batch_size`` rows, plus the
+        ``(record, exception)`` pairs that could not be turned into rows."""
+        batch, rejected = [], []
+        for record in records:
+            try:
+                batch.append(self._row(record))
+            except (TypeError, ValueError) as exc:
+                rejected.append((record, exc))
+                continue
+            if len(batch) == self.batch_size:
+                yield batch, rejected
+                batch, rejected = [], []
+        if batch or rejected:
+            yield batch, rejected
+
+    def _stage(self, cur, rows):
+        if self.dialect == "sqlite":
+            cur.executemany(
+                "INSERT INTO %s VALUES (%s)" % (self.staging, ", ".join([self.mark] * (len(self.columns) + 1))),
+                [row + (i,) for i, row in enumerate(rows)])
+            return
+        lines = (",".join(map(_copy_field, row)) + ",%d\n" % i for i, row in enumerate(rows))
+        sql = "COPY %s (%s, load_row) FROM STDIN WITH (FORMAT csv)" % (self.staging, ", ".join(self.columns))
+        if hasattr(cur, "copy_expert"):  # psycopg2
+            cur.copy_expert(sql, _CopyStream(lines))
+        else:  # psycopg 3
+            with cur.copy(sql) as copy:
+                for line in lines:
+                    copy.write(line)
+
+    def _load_batch(self, connection, rows):
+        """Stage and merge ``rows`` in one transaction; rolls back on error."""
+        cur = connection.cursor()
+        try:
+            if not self._staging_ready:
+                cur.execute(self.staging_sql())
+                self._staging_ready = True
+            if self.dialect == "sqlite":
+                cur.execute("DELETE FROM %s" % self.staging)
+            self._stage(cur, rows)
+            cur.execute(self.merge_sql())
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            # The CREATE may have been rolled back with the failed batch.
+            self._staging_ready = False
+            raise
+        finally:
+            cur.close()
+
+    def _isolate(self, connection, rows, report):
+        """Split a failing batch until the bad records are alone; load the rest."""
+        pending = [rows]
+        while pending:
+            part = pending.pop()
+            try:
+                self._load_batch(connection, part)
+            except Exception as exc:
+                if len(part) == 1:
+                    report.rejected.append((part[0], exc))
+                    continue
+                middle = len(part) // 2
+                # Later half pushed first: the earlier half loads first, so
+                # "last record wins" still holds across the split.
+                pending.append(part[middle:])
+                pending.append(part[:middle])
+
+    def load(self, connection, records):
+        """Load an iterable of records; returns a :class:`LoadReport`.
+
+        ``records`` is consumed lazily: at most ``max_pending`` batches are
+        serialized ahead of the database.
+        """
+        report = LoadReport()
+        # The staging table lives in the session: create it on this connection.
+        self._staging_ready = False
+        batches = queue.Queue(maxsize=self.max_pending)
+        stop = threading.Event()
+        done = object()
+
+        def offer(item):
+            # Blocks while the queue is full (back-pressure), but gives up
+            # once the consumer has stopped.
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for batch in self._batches(records):
+                    if not offer(batch):
+                        return
+            except Exception as exc:
+                offer(exc)
+                return
+            offer(done)
+
+        producer = threading.Thread(target=produce, name="bulk-loader-producer", daemon=True)
+        producer.start()
+        try:
+            index = 0
+            while True:
+                batch = batches.get()
+                if batch is done:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                batch, rejected = batch
+                report.rejected.extend(rejected)
+                if not batch:
+                    continue
+                try:
+                    self._load_batch(connection, batch)
+                    report.batches.append(BatchResult(index, len(batch), len(batch), None))
+                except Exception as exc:
+                    loaded = 0
+                    if self.bisect:
+                        rejected = len(report.rejected)
+                        self._isolate(connection, batch, report)
+                        loaded = len(batch) - (len(report.rejected) - rejected)
+                    report.batches.append(BatchResult(index, len(batch), loaded, exc))
+                index += 1
+        finally:
+            stop.set()
+            producer.join()
+        return report
@@ -0,0 +1,185 @@
+"""Append buffer for stacking many same-schema DataFrame batches (Q3 concat).
+
+Calling ``pd.concat([result, batch])`` in a loop copies everything gathered
+so far on every iteration. :class:`FrameBuffer` keeps one pre-allocated NumPy
+array per column, grows it geometrically (amortized O(1) per row), and
+builds the final DataFrame from views of those arrays. When a memory budget
+is set, the fixed-width columns move to memory-mapped files once the buffer
+would outgrow it.
+"""
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_GROWTH = 2.0
+
+
+class FrameBuffer:
+    """Collect DataFrame batches with identical columns and dtypes.
+
+    The schema is taken from the first batch. ``memory_budget`` (bytes)
+    enables spilling fixed-width columns to ``np.memmap`` files in
+    ``spill_dir`` (a temporary directory by default); object and extension
+    columns always stay in memory. Use it as a context manager, or call
+    :meth:`close`, to remove the spill files.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, growth=DEFAULT_GROWTH,
+                 memory_budget=None, spill_dir=None):
+        if growth <= 1:
+            raise ValueError("growth must be greater than 1")
+        self.capacity = capacity
+        self.growth = growth
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.spilled = False
+        self._schema = None
+        self._arrays = {}
+        self._length = 0
+        self._owned_spill_dir = None
+
+    def __len__(self):
+        return self._length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def columns(self):
+        return list(self._schema) if self._schema is not None else []
+
+    @property
+    def nbytes(self):
+        """Bytes reserved by the fixed-width column arrays (capacity, not length)."""
+        return sum(a.nbytes for a in self._arrays.values() if a.dtype != object)
+
+    def _storage_dtype(self, dtype):
+        if isinstance(dtype, np.dtype):
+            return dtype
+        return np.dtype(object)
+
+    def _init_schema(self, frame):
+        self._schema = {name: frame[name].dtype for name in frame.columns}
+        self.capacity = max(self.capacity, len(frame))
+        for name, dtype in self._schema.items():
+            self._arrays[name] = np.empty(self.capacity, dtype=self._storage_dtype(dtype))
+        self._maybe_spill()
+
+    def append(self, frame):
+        """Copy ``frame``'s rows to the end of the buffer."""
+        if self._schema is None:
+            self._init_schema(frame)
+        elif list(frame.columns) != list(self._schema):
+            raise ValueError("batch columns %r do not match buffer columns %r"
+                             % (list(frame.columns), list(self._schema)))
+        n = len(frame)
+        if self._length + n > self.capacity:
+            self._grow(self._length + n)
+        stop = self._length + n
+        # A dtype mismatch part way through leaves _length unchanged, so the
+        # rows already copied for this batch are simply overwritten later.
+        for name, column in frame.items():
+            if column.dtype != self._schema[name]:
+                raise ValueError("column %r has dtype %s, buffer expects %s"
+                                 % (name, column.dtype, self._schema[name]))
+            array = self._arrays[name]
+            if array.dtype == object:
+                array[self._length:stop] = column.to_numpy(dtype=object)
+            else:
+                array[self._length:stop] = column.to_numpy()
+        self._length = stop
+        return self
+
+    def extend(self, frames):
+        """Append every DataFrame in ``frames``."""
+        for frame in frames:
+            self.append(frame)
+        return self
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity = max(int(capacity * self.growth), capacity + 1)
+        self.capacity = capacity
+        if not self.spilled:
+            self._maybe_spill()
+        for name, array in self._arrays.items():
+            if isinstance(array, np.memmap):
+                self._arrays[name] = self._resize_memmap(name, array, capacity)
+            else:
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:self._length] = array[:self._length]
+                self._arrays[name] = grown
+
+    def _fixed_width_bytes(self, capacity):
+        return sum(
+            capacity * a.dtype.itemsize for a in self._arrays.values() if a.dtype != object
+        )
+
+    def _maybe_spill(self):
+        if self.memory_budget is None or self.spilled:
+            return
+        if self._fixed_width_bytes(self.capacity) <= self.memory_budget:
+            return
+        if self.spill_dir is None:
+            self._owned_spill_dir = self.spill_dir = tempfile.mkdtemp(prefix="frame_buffer_")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        for name, array in self._arrays.items():
+            if array.dtype == object:
+                continue
+            mapped = self._resize_memmap(name, None, len(array))
+            mapped[:self._length] = array[:self._length]
+            self._arrays[name] = mapped
+        self.spilled = True
+
+    def _spill_path(self, name):
+        position = list(self._schema).index(name)
+        return os.path.join(self.spill_dir, "column_%d.bin" % position)
+
+    def _resize_memmap(self, name, array, capacity):
+        path = self._spill_path(name)
+        dtype = array.dtype if array is not None else self._arrays[name].dtype
+        if array is not None:
+            array.flush()
+        # Growing the file in place keeps the existing rows; no copy needed.
+        with open(path, "ab") as handle:
+            handle.truncate(capacity * dtype.itemsize)
+        return np.memmap(path, dtype=dtype, mode="r+", shape=(capacity,))
+
+    def to_frame(self):
+        """Return the collected rows as a DataFrame backed by the buffer arrays.
+
+        Fixed-width columns are zero-copy views, so later appends (which only
+        write past the current length, or into freshly grown arrays) never
+        change a frame that was already returned.
+        """
+        if self._schema is None:
+            return pd.DataFrame()
+        data = {}
+        for name, dtype in self._schema.items():
+            values = self._arrays[name][:self._length]
+            if isinstance(values, np.memmap):
+                values = values.view(np.ndarray)
+            if values.dtype != dtype:
+                values = pd.array(values, dtype=dtype)
+            elif dtype == object:
+                # A bare object array of strings would be inferred as "str".
+                values = pd.Series(values, dtype=object, copy=False)
+            data[name] = values
+        return pd.DataFrame(data, copy=False)
+
+    def close(self):
+        """Drop the buffer and remove spill files this buffer created."""
+        self._arrays = {}
+        self._length = 0
+        if self._owned_spill_dir is not None:
+            shutil.rmtree(self._owned_spill_dir, ignore_errors=True)
+            self._owned_spill_dir = None
@@ -0,0 +1,325 @@
+"""Materialized-path hierarchy index for ancestor/descendant lookups (Q20).
+
+The ``WITH RECURSIVE EmployeeHierarchy`` query in the notes walks
+``manager_id`` one level per iteration, so each lookup costs one index probe
+per level. :class:`HierarchyIndex` stores the whole chain in a
+``parent_path`` column instead, the way Odoo's ``_parent_store`` does for
+product categories and analytic accounts::
+
+    employee_id | manager_id | parent_path
+    1           | NULL       | 1/
+    5           | 1          | 1/5/
+    23          | 5          | 1/5/23/
+
+- ancestors of 23: read one row by primary key and split ``1/5/23/``;
+- descendants of 5: one index range scan, ``parent_path LIKE '1/5/%'``;
+- moving 5 (and everything under it) to a new manager: one ``UPDATE``
+  rewriting the prefix of the whole subtree.
+
+:class:`AncestorCache` keeps ``id -> parent`` and the computed ancestor
+chains in memory; :meth:`HierarchyIndex.move` invalidates exactly the moved
+subtree.
+"""
+
+import collections
+
+from ._sql import DIALECT_PARAMSTYLES, check_dialect, check_identifier, placeholder
+
+
+class HierarchyError(ValueError):
+    """Raised for unknown nodes or moves that would create a cycle."""
+
+
+def parse_path(path):
+    """``"1/5/23/"`` -> ``[1, 5, 23]``."""
+    return [int(part) for part in path.split("/") if part]
+
+
+class AncestorCache:
+    """In-memory ``id -> parent`` map with memoized ancestor chains."""
+
+    def __init__(self, parents=None):
+        self._parent = dict(parents or {})
+        # Built on the first re-parenting or descendant query; plain ancestor
+        # lookups never need it.
+        self._children = None
+        self._chains = {}
+
+    def _child_map(self):
+        if self._children is None:
+            children = collections.defaultdict(set)
+            for node, parent in self._parent.items():
+                if parent is not None:
+                    children[parent].add(node)
+            self._children = children
+        return self._children
+
+    def __contains__(self, node):
+        return node in self._parent
+
+    def __len__(self):
+        return len(self._parent)
+
+    def __iter__(self):
+        return iter(self._parent)
+
+    def parent(self, node):
+        return self._parent[node]
+
+    def chain(self, node):
+        """Tuple of ids from the root down to ``node`` (inclusive)."""
+        chain = self._chains.get(node)
+        if chain is not None:
+            return chain
+        # Walk up to the nearest memoized ancestor, then fill in downwards.
+        pending = []
+        current = node
+        while current is not None and current not in self._chains:
+            if current not in self._parent:
+                raise HierarchyError("unknown node %r" % current)
+            pending.append(current)
+            if len(pending) > len(self._parent):
+                raise HierarchyError("cycle detected above node %r" % node)
+            current = self._parent[current]
+        chain = self._chains[current] if current is not None else ()
+        for item in reversed(pending):
+            chain = chain + (item,)
+            self._chains[item] = chain
+        return chain
+
+    def paths(self):
+        """``{node: "1/5/23/"}`` for every node, without filling the chain memo."""
+        paths = {}
+        parent_of = self._parent
+        for node in parent_of:
+            if node in paths:
+                continue
+            pending = []
+            current = node
+            while current is not None and current not in paths:
+                pending.append(current)
+                if len(pending) > len(parent_of):
+                    raise HierarchyError("cycle detected above node %r" % node)
+                current = parent_of.get(current)
+                if current is not None and current not in parent_of:
+                    raise HierarchyError("unknown node %r" % current)
+            prefix = paths[current] if current is not None else ""
+            for item in reversed(pending):
+                prefix = paths[item] = "%s%d/" % (prefix, item)
+        return paths
+
+    def ancestors(self, node):
+        """Ancestors of ``node``, root first, excluding the node itself."""
+        return self.chain(node)[:-1]
+
+    def descendants(self, node):
+        """Every node below ``node`` (breadth first)."""
+        children = self._child_map()
+        result = []
+        queue = collections.deque(children.get(node, ()))
+        while queue:
+            current = queue.popleft()
+            result.append(current)
+            queue.extend(children.get(current, ()))
+        return result
+
+    def add(self, node, parent):
+        self._parent[node] = parent
+        if parent is not None and self._children is not None:
+            self._children[parent].add(node)
+
+    def set_parent(self, node, parent):
+        """Re-parent ``node`` and drop the cached chains of its subtree."""
+        children = self._child_map()
+        old = self._parent[node]
+        if old is not None:
+            children[old].discard(node)
+        self._parent[node] = parent
+        if parent is not None:
+            children[parent].add(node)
+        self._chains.pop(node, None)
+        for child in self.descendants(node):
+            self._chains.pop(child, None)
+
+    def remove(self, node):
+        """Forget a leaf node."""
+        children = self._child_map()
+        if children.get(node):
+            raise HierarchyError("node %r still has children" % node)
+        parent = self._parent.pop(node)
+        if parent is not None:
+            children[parent].discard(node)
+        self._chains.pop(node, None)
+
+
+class HierarchyIndex:
+    """Maintain a ``parent_path`` column on ``table`` and answer tree queries.
+
+    Node ids must be integers. Writes that change ``parent_column`` should go
+    through :meth:`move` (or :meth:`attach` for new rows); anything else
+    needs a :meth:`rebuild`.
+    """
+
+    def __init__(self, table="employees", id_column="employee_id", parent_column="manager_id",
+                 path_column="parent_path", dialect="postgresql", cache=True):
+        self.table = check_identifier(table)
+        self.id_column = check_identifier(id_column)
+        self.parent_column = check_identifier(parent_column)
+        self.path_column = check_identifier(path_column)
+        self.dialect = check_dialect(dialect)
+        self.mark = placeholder(DIALECT_PARAMSTYLES[dialect])
+        self.cache = AncestorCache() if cache else None
+
+    def _execute(self, connection, sql, params=(), many=False):
+        cur = connection.cursor()
+        try:
+            if many:
+                cur.executemany(sql, params)
+            else:
+                cur.execute(sql, params)
+        finally:
+            cur.close()
+
+    def _fetch(self, connection, sql, params=()):
+        cur = connection.cursor()
+        try:
+            cur.execute(sql, params)
+            return cur.fetchall()
+        finally:
+            cur.close()
+
+    def create_sql(self):
+        """Column and index DDL. PostgreSQL needs ``text_pattern_ops`` for LIKE prefixes."""
+        opclass = " text_pattern_ops" if self.dialect == "postgresql" else ""
+        return [
+            "ALTER TABLE %s ADD COLUMN %s VARCHAR" % (self.table, self.path_column),
+            "CREATE INDEX IF NOT EXISTS %s_%s_idx ON %s (%s%s)"
+            % (self.table.replace(".", "_"), self.path_column, self.table, self.path_column, opclass),
+        ]
+
+    def install(self, connection):
+        """Add the column, fill it, then index it (cheaper than indexing first)."""
+        add_column, create_index = self.create_sql()
+        self._execute(connection, add_column)
+        self.rebuild(connection)
+        self._execute(connection, create_index)
+        connection.commit()
+
+    def load(self, connection):
+        """Fill the in-memory cache from the table."""
+        rows = self._fetch(
+            connection, "SELECT %s, %s FROM %s" % (self.id_column, self.parent_column, self.table))
+        self.cache = AncestorCache(dict(rows))
+        return self.cache
+
+    def rebuild(self, connection):
+        """Recompute every ``parent_path`` from ``parent_column`` in one pass."""
+        cache = self.load(connection)
+        rows = [(path, node) for node, path in cache.paths().items()]
+        self._execute(
+            connection,
+            "UPDATE %s SET %s = %s WHERE %s = %s" % (self.table, self.path_column, self.mark,
+                                                     self.id_column, self.mark),
+            rows, many=True)
+        connection.commit()
+        return len(rows)
+
+    def path(self, connection, node):
+        """The stored ``parent_path`` of ``node`` (from the cache when loaded)."""
+        if self.cache is not None and node in self.cache:
+            return "/".join(map(str, self.cache.chain(node))) + "/"
+        rows = self._fetch(
+            connection,
+            "SELECT %s FROM %s WHERE %s = %s" % (self.path_column, self.table, self.id_column, self.mark),
+            (node,))
+        if not rows or rows[0][0] is None:
+            raise HierarchyError("unknown node %r" % node)
+        return rows[0][0]
+
+    def ancestors(self, connection, node):
+        """Ancestor ids of ``node``, root first: one primary-key lookup at most."""
+        if self.cache is not None and node in self.cache:
+            return list(self.cache.ancestors(node))
+        return parse_path(self.path(connection, node))[:-1]
+
+    def _subtree_predicate(self, prefix):
+        if self.dialect == "postgresql":
+            return "%s LIKE %s" % (self.path_column, self.mark), [prefix + "%"]
+        # SQLite compares bytewise: every path under "1/5/" sorts before "1/50".
+        return "%s >= %s AND %s < %s" % (self.path_column, self.mark, self.path_column, self.mark), \
+            [prefix, prefix[:-1] + "0"]
+
+    def descendants(self, connection, node, include_self=False):
+        """Ids of every node below ``node``: one index range scan."""
+        prefix = self.path(connection, node)
+        predicate, params = self._subtree_predicate(prefix)
+        rows = self._fetch(
+            connection, "SELECT %s FROM %s WHERE %s" % (self.id_column, self.table, predicate),
+            params)
+        return [r[0] for r in rows if include_self or r[0] != node]
+
+    def attach(self, connection, node, commit=True):
+        """Set ``parent_path`` for a freshly inserted row from its parent's path."""
+        rows = self._fetch(
+            connection,
+            "SELECT %s FROM %s WHERE %s = %s" % (self.parent_column, self.table, self.id_column, self.mark),
+            (node,))
+        if not rows:
+            raise HierarchyError("unknown node %r" % node)
+        parent = rows[0][0]
+        prefix = self.path(connection, parent) if parent is not None else ""
+        self._execute(
+            connection,
+            "UPDATE %s SET %s = %s WHERE %s = %s" % (self.table, self.path_column, self.mark,
+                                                     self.id_column, self.mark),
+            (prefix + "%d/" % node, node))
+        if self.cache is not None and (parent is None or parent in self.cache):
+            self.cache.add(node, parent)
+        if commit:
+            connection.commit()
+
+    def move(self, connection, node, new_parent, commit=True):
+        """Re-parent ``node``; its whole subtree is rewritten by one UPDATE."""
+        old_prefix = self.path(connection, node)
+        new_base = self.path(connection, new_parent) if new_parent is not None else ""
+        if new_base.startswith(old_prefix):
+            raise HierarchyError("cannot move %r under its own descendant %r" % (node, new_parent))
+        new_prefix = new_base + "%d/" % node
+        predicate, params = self._subtree_predicate(old_prefix)
+        self._execute(
+            connection,
+            "UPDATE %s SET %s = %s WHERE %s = %s" % (self.table, self.parent_column, self.mark,
+                                                     self.id_column, self.mark),
+            (new_parent, node))
+        self._execute(
+            connection,
+            "UPDATE %s SET %s = %s || substr(%s, %s) WHERE %s" % (
+                self.table, self.path_column, self.mark, self.path_column, self.mark, predicate),
+            [new_prefix, len(old_prefix) + 1] + params)
+        if self.cache is not None and node in self.cache:
+            self.cache.set_parent(node, new_parent)
+        if commit:
+            connection.commit()
+
+    def move_many(self, connection, moves):
+        """Apply ``[(node, new_parent), ...]`` in order inside one transaction."""
+        try:
+            for node, new_parent in moves:
+                self.move(connection, node, new_parent, commit=False)
+        except Exception:
+            connection.rollback()
+            if self.cache is not None:
+                self.load(connection)
+            raise
+        connection.commit()
+
+    def recursive_ancestors_sql(self):
+        """The original recursive-CTE lookup, kept for comparison and checks."""
+        return (
+            "WITH RECURSIVE chain AS (\n"
+            "    SELECT {id}, {parent} FROM {table} WHERE {id} = {mark}\n"
+            "    UNION\n"
+            "    SELECT e.{id}, e.{parent} FROM {table} e JOIN chain c ON e.{id} = c.{parent}\n"
+            ")\n"
+            "SELECT {id} FROM chain"
+        ).format(id=self.id_column, parent=self.parent_column, table=self.table, mark=self.mark)
@@ -0,0 +1,397 @@
+"""Latency histograms, ``with timed(...)`` blocks and reversible call patching (Q5, Q6).
+
+Ad-hoc timing in production is a ``with`` block around a stage (Q5) or a
+monkey patch swapping ``MyClass.original_method`` for a timing wrapper
+(Q6), each printing or logging its own numbers. This module gives both one
+place to record into:
+
+- :class:`LatencyHistogram` counts nanosecond latencies in HDR-style
+  log-linear buckets (128 sub-buckets per power of two, so quantiles are
+  within 0.8%) in O(1) per value and a few KiB of memory, and merges with
+  other histograms;
+- :class:`timed` is a context manager (and decorator) recording its
+  block's wall time into a named histogram of a :class:`MetricsRegistry`;
+- :class:`Patcher` wraps named functions or methods (``"odoo_pysql.
+  join_index.JoinIndex.merge"``) with call/error counters and, for every
+  ``sample_every``-th call, a timer; ``sample_every=0`` only counts, in a
+  few hundred nanoseconds per call. Every patch is undone by
+  :meth:`Patcher.restore` (or on leaving the ``with`` block), leaving the
+  original attribute exactly as it was;
+- :meth:`MetricsRegistry.snapshot` exports everything as a dict, JSON or
+  Prometheus text exposition format.
+
+As with any monkey patch, code that imported a function by name before it
+was patched keeps calling the original. Recording takes no lock (a lock
+would double the cost of a timed call), so threads updating the same
+counter or histogram at once can occasionally lose an increment.
+"""
+
+import functools
+import importlib
+import inspect
+import json
+import threading
+import time
+
+import numpy as np
+
+# 2**(_SUB_BITS - 1) sub-buckets per power of two: bucket width / value <= 2**(1 - _SUB_BITS).
+_SUB_BITS = 8
+_SUB = 1 << _SUB_BITS
+_HALF_BITS = _SUB_BITS - 1
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+DEFAULT_PREFIX = "odoo_pysql"
+
+_MISSING = object()
+
+
+def _bucket_index(value):
+    if value < _SUB:
+        return value
+    shift = value.bit_length() - _SUB_BITS
+    return (shift << _HALF_BITS) + (value >> shift)
+
+
+def _bucket_bounds(index):
+    """``(lowest value, width)`` of bucket ``index``."""
+    if index < _SUB:
+        return index, 1
+    shift = (index >> _HALF_BITS) - 1
+    return (index - (shift << _HALF_BITS)) << shift, 1 << shift
+
+
+class LatencyHistogram:
+    """Log-linear histogram of non-negative integer latencies (nanoseconds)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self._min = float("inf")
+        self._max = -1
+
+    @property
+    def min(self):
+        return self._min if self.count else None
+
+    @property
+    def max(self):
+        return self._max if self.count else None
+
+    def record(self, value):
+        if value < _SUB:
+            value = index = value if value > 0 else 0
+        else:
+            shift = value.bit_length() - _SUB_BITS
+            index = (shift << _HALF_BITS) + (value >> shift)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def record_many(self, values):
+        """Record an array of latencies at once (NumPy bucketing)."""
+        values = np.maximum(np.asarray(values, dtype=np.int64), 0)
+        if not values.size:
+            return
+        shift = np.zeros(values.shape, dtype=np.int64)
+        big = values >= _SUB
+        # floor(log2) via frexp is exact for int64 values below 2**53.
+        shift[big] = np.frexp(values[big].astype(np.float64))[1] - _SUB_BITS
+        index = np.where(big, (shift << _HALF_BITS) + (values >> shift), values)
+        self._add(np.bincount(index).tolist(), int(values.size), int(values.sum()),
+                  int(values.min()), int(values.max()))
+
+    def _add(self, counts, count, total, low, high):
+        mine = self.counts
+        if len(counts) > len(mine):
+            mine.extend([0] * (len(counts) - len(mine)))
+        for i, c in enumerate(counts):
+            if c:
+                mine[i] += c
+        self.count += count
+        self.total += total
+        self._min = min(self._min, low)
+        self._max = max(self._max, high)
+
+    def merge(self, other):
+        """Add ``other``'s counts (e.g. from another worker) into this histogram."""
+        if other.count:
+            self._add(list(other.counts), other.count, other.total, other.min, other.max)
+        return self
+
+    def quantile(self, q):
+        """Latency at quantile ``q`` (bucket midpoint, clamped to min/max), or None."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                low, width = _bucket_bounds(index)
+                return min(max(low + (width - 1) / 2, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def snapshot(self, quantiles=DEFAULT_QUANTILES):
+        """Summary in seconds: count, sum, min, max, mean and the quantiles."""
+        out = {"count": self.count, "sum": self.total / 1e9}
+        for key, value in (("min", self.min), ("max", self.max), ("mean", self.mean)):
+            out[key] = value / 1e9 if value is not None else None
+        out["quantiles"] = {repr(q): (self.quantile(q) / 1e9 if self.count else None) for q in quantiles}
+        return out
+
+
+class _CallStats:
+    __slots__ = ("calls", "errors", "histogram")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.histogram = LatencyHistogram()
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Named stage histograms and per-function call statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.calls = {}
+
+    def histogram(self, name):
+        histogram = self.stages.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stages.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def call_stats(self, name):
+        stats = self.calls.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.calls.setdefault(name, _CallStats())
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.calls.clear()
+
+    def snapshot(self, quantiles=DEFAULT_QUANTILES):
+        """``{"stages": {name: summary}, "calls": {name: {calls, errors, latency}}}``."""
+        return {
+            "stages": {name: h.snapshot(quantiles) for name, h in sorted(self.stages.items())},
+            "calls": {
+                name: {"calls": s.calls, "errors": s.errors, "latency": s.histogram.snapshot(quantiles)}
+                for name, s in sorted(self.calls.items())
+            },
+        }
+
+    def to_json(self, quantiles=DEFAULT_QUANTILES, **kwargs):
+        return json.dumps(self.snapshot(quantiles), **kwargs)
+
+    def to_prometheus(self, prefix=DEFAULT_PREFIX, quantiles=DEFAULT_QUANTILES):
+        """Prometheus text exposition: stage and call latencies as summaries
+        (``..._seconds``, labelled ``stage``/``function``), calls and errors as
+        counters."""
+        lines = []
+
+        def summary(metric, label, items):
+            lines.append("# TYPE %s summary" % metric)
+            for name, histogram in items:
+                tag = '%s="%s"' % (label, _escape_label(name))
+                for q in quantiles:
+                    value = histogram.quantile(q)
+                    lines.append('%s{%s,quantile="%s"} %s'
+                                 % (metric, tag, q, "NaN" if value is None else repr(value / 1e9)))
+                lines.append("%s_sum{%s} %r" % (metric, tag, histogram.total / 1e9))
+                lines.append("%s_count{%s} %d" % (metric, tag, histogram.count))
+
+        calls = sorted(self.calls.items())
+        if self.stages:
+            summary("%s_stage_seconds" % prefix, "stage", sorted(self.stages.items()))
+        if calls:
+            summary("%s_call_seconds" % prefix, "function", [(name, s.histogram) for name, s in calls])
+            for metric, attr in (("calls", "calls"), ("call_errors", "errors")):
+                lines.append("# TYPE %s_%s_total counter" % (prefix, metric))
+                for name, stats in calls:
+                    lines.append('%s_%s_total{function="%s"} %d'
+                                 % (prefix, metric, _escape_label(name), getattr(stats, attr)))
+        return "\n".join(lines) + "\n"
+
+
+DEFAULT_REGISTRY = MetricsRegistry()
+
+
+class timed:
+    """``with timed("stage"):`` records the block's duration in ``registry``.
+
+    The histogram is looked up once, so an instance can be kept and reused
+    for every pass through a hot loop (one thread at a time). Also works as
+    a decorator: ``@timed("stage")``.
+    """
+
+    __slots__ = ("name", "histogram", "_start")
+
+    def __init__(self, name, registry=None):
+        self.name = name
+        self.histogram = (registry or DEFAULT_REGISTRY).histogram(name)
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.record(time.perf_counter_ns() - self._start)
+        return False
+
+    def __call__(self, fn):
+        histogram = self.histogram
+        clock = time.perf_counter_ns
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.record(clock() - start)
+        return wrapper
+
+
+def _wrap(fn, stats, sample_every):
+    if not sample_every:
+        @functools.wraps(fn)
+        def counted(*args, **kwargs):
+            stats.calls += 1
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                stats.errors += 1
+                raise
+        return counted
+
+    clock = time.perf_counter_ns
+    record = stats.histogram.record
+
+    @functools.wraps(fn)
+    def sampled(*args, **kwargs):
+        stats.calls += 1
+        if stats.calls % sample_every:
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                stats.errors += 1
+                raise
+        start = clock()
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            stats.errors += 1
+            raise
+        finally:
+            record(clock() - start)
+    return sampled
+
+
+def _resolve(target):
+    """``(owner, attribute, dotted name)`` for ``"pkg.module.Class.method"`` or ``(owner, "attr")``."""
+    if not isinstance(target, str):
+        owner, attribute = target
+        qualname = getattr(owner, "__qualname__", getattr(owner, "__name__", type(owner).__name__))
+        module = getattr(owner, "__module__", None)
+        if module and not inspect.ismodule(owner):
+            qualname = "%s.%s" % (module, qualname)
+        return owner, attribute, "%s.%s" % (qualname, attribute)
+    parts = target.split(".")
+    for split in range(len(parts) - 1, 0, -1):
+        try:
+            owner = importlib.import_module(".".join(parts[:split]))
+        except ImportError:
+            continue
+        for part in parts[split:-1]:
+            owner = getattr(owner, part)
+        return owner, parts[-1], target
+    raise ValueError("cannot import a module from %r" % target)
+
+
+class Patcher:
+    """Reversibly wrap functions and methods with counters and timers.
+
+    ``sample_every=1`` times every call, ``N`` every N-th call, ``0`` none
+    (calls and errors are always counted). Use as a context manager, or call
+    :meth:`restore`, to put the originals back.
+    """
+
+    def __init__(self, registry=None, sample_every=1):
+        self.registry = registry or DEFAULT_REGISTRY
+        self.sample_every = sample_every
+        self._patches = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.restore()
+
+    def __len__(self):
+        return len(self._patches)
+
+    def patch(self, target, name=None, sample_every=None):
+        """Wrap ``target`` in place; returns the statistics name."""
+        owner, attribute, default_name = _resolve(target)
+        try:
+            raw = inspect.getattr_static(owner, attribute)
+        except AttributeError:
+            raise AttributeError("%s does not exist" % default_name) from None
+        kind = None
+        if not (inspect.isclass(owner) or inspect.ismodule(owner)):
+            # Patching one instance: wrap its bound method.
+            fn = getattr(owner, attribute)
+        elif isinstance(raw, (staticmethod, classmethod)):
+            kind, fn = type(raw), raw.__func__
+        else:
+            fn = raw
+        if not callable(fn):
+            raise TypeError("%s is not callable" % default_name)
+        if getattr(fn, "__instrumented__", False):
+            raise ValueError("%s is already patched" % default_name)
+        name = name or default_name
+        stats = self.registry.call_stats(name)
+        every = self.sample_every if sample_every is None else sample_every
+        wrapper = _wrap(fn, stats, every)
+        wrapper.__instrumented__ = True
+        original = vars(owner).get(attribute, _MISSING) if hasattr(owner, "__dict__") else _MISSING
+        setattr(owner, attribute, kind(wrapper) if kind else wrapper)
+        self._patches.append((owner, attribute, original))
+        return name
+
+    def patch_all(self, targets, sample_every=None):
+        return [self.patch(target, sample_every=sample_every) for target in targets]
+
+    def restore(self):
+        """Undo every patch, most recent first."""
+        while self._patches:
+            owner, attribute, original = self._patches.pop()
+            if original is _MISSING:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, original)
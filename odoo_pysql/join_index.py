@@ -0,0 +1,217 @@
+"""Reusable hash-join index for merging many batches against one table (Q3).
+
+``pd.merge(df1, df2, on='key')`` hashes the key column from scratch on every
+call. When the same right-hand table (a customer dimension, say) is joined
+against batch after batch, :class:`JoinIndex` does that work once:
+
+- the right keys are factorized into integer codes, and the distinct keys
+  are kept in ``pd.Index`` segments whose hash tables stay warm;
+- the right row numbers are stored grouped by code (CSR layout: an
+  ``order`` array plus ``offsets``), so the rows for a key are one slice.
+
+Integer keys that are reasonably dense (customer or order IDs) additionally
+get a direct-address table, so probing is an array lookup instead of a hash.
+A merge then costs one probe per left row plus a gather of the matching
+right rows. New right rows are added with :meth:`JoinIndex.append`
+without re-hashing the keys that are already indexed.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Appends add a new key segment; past this many they are consolidated.
+MAX_KEY_SEGMENTS = 8
+# Integer keys use a direct-address table when max - min < DENSE_FACTOR * n_keys.
+DENSE_FACTOR = 4
+
+
+class JoinIndex:
+    """Pre-built join index on the ``on`` column of the right-hand DataFrame.
+
+    Keys that are missing (NaN/None) never match, unlike ``pd.merge`` which
+    matches NaN with NaN. Rows come out in left order, each left row followed
+    by its matches in right order; ``how='outer'`` appends the unmatched
+    right rows at the end.
+    """
+
+    def __init__(self, right, on):
+        self.on = on
+        self._right = right.reset_index(drop=True)
+        codes, uniques = pd.factorize(self._right[on])
+        self._segments = [(pd.Index(uniques), 0)]
+        self._n_keys = len(uniques)
+        self._codes = codes.astype(np.int64)
+        self._build_groups()
+        self._build_dense()
+
+    def __len__(self):
+        return len(self._right)
+
+    @property
+    def n_keys(self):
+        return self._n_keys
+
+    def _build_groups(self):
+        valid = self._codes >= 0
+        counts = np.bincount(self._codes[valid], minlength=self._n_keys)
+        self._offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        rows = np.flatnonzero(valid)
+        self._order = rows[np.argsort(self._codes[valid], kind="stable")]
+
+    def _build_dense(self):
+        self._dense = None
+        if self._n_keys == 0 or any(segment.dtype.kind not in "iu" for segment, _ in self._segments):
+            return
+        keys = np.concatenate([segment.to_numpy(dtype=np.int64) for segment, _ in self._segments])
+        low = int(keys.min())
+        span = int(keys.max()) - low + 1
+        if span > DENSE_FACTOR * self._n_keys:
+            return
+        # Headroom so that growing IDs can be appended without a rebuild.
+        table = np.full(span + span // 2 + 1, -1, dtype=np.int64)
+        table[keys - low] = np.arange(self._n_keys)
+        self._dense = (low, table)
+
+    def _dense_add(self, keys, base):
+        low, table = self._dense
+        if keys.dtype.kind not in "iu":
+            self._build_dense()
+            return
+        pos = keys.astype(np.int64) - low
+        if pos.size and (pos.min() < 0 or pos.max() >= table.size):
+            self._build_dense()
+            return
+        table[pos] = np.arange(base, base + pos.size)
+
+    def lookup(self, keys):
+        """Return the key code of each entry in ``keys`` (-1 when unknown)."""
+        if self._dense is not None:
+            values = np.asarray(keys)
+            if values.dtype.kind in "iu":
+                low, table = self._dense
+                pos = values.astype(np.int64) - low
+                inside = (pos >= 0) & (pos < table.size)
+                if inside.all():
+                    return table[pos]
+                codes = np.full(pos.size, -1, dtype=np.int64)
+                codes[inside] = table[pos[inside]]
+                return codes
+        keys = pd.Index(keys)
+        codes = np.full(len(keys), -1, dtype=np.int64)
+        pending = np.arange(len(keys))
+        probe = keys
+        for segment, base in self._segments:
+            found = segment.get_indexer(probe)
+            hit = found >= 0
+            codes[pending[hit]] = found[hit] + base
+            pending = pending[~hit]
+            if pending.size == 0:
+                break
+            probe = keys[pending]
+        return codes
+
+    def append(self, rows):
+        """Add rows to the right-hand table without rebuilding the index.
+
+        Only keys not already indexed are hashed, into a new key segment. If
+        every new row has a brand-new key the groups are extended in place;
+        otherwise the row groups are re-sorted from the stored codes.
+        """
+        rows = rows.reset_index(drop=True)
+        if rows.empty:
+            return self
+        start = len(self._right)
+        new_codes = self.lookup(rows[self.on])
+        unknown = new_codes < 0
+        new_keys, first_seen = pd.factorize(rows[self.on][unknown])
+        missing_key = new_keys < 0
+        new_keys = np.where(missing_key, -1, new_keys + self._n_keys)
+        new_codes[unknown] = new_keys
+        if len(first_seen):
+            base = self._n_keys
+            self._segments.append((pd.Index(first_seen), base))
+            # Count the new keys first: a dense rebuild numbers all of them.
+            self._n_keys += len(first_seen)
+            if self._dense is not None:
+                self._dense_add(np.asarray(first_seen), base)
+        self._right = pd.concat([self._right, rows], ignore_index=True)
+        self._codes = np.concatenate((self._codes, new_codes))
+
+        if unknown.all() and (np.diff(new_keys[~missing_key]) >= 0).all():
+            # Pure growth with keys in first-seen order: extend the CSR arrays.
+            counts = np.bincount(new_keys[~missing_key] - (self._n_keys - len(first_seen)),
+                                 minlength=len(first_seen))
+            tail = self._offsets[-1] + np.cumsum(counts)
+            self._offsets = np.concatenate((self._offsets, tail))
+            fresh = np.flatnonzero(~missing_key) + start
+            self._order = np.concatenate((self._order, fresh))
+        else:
+            self._build_groups()
+        if len(self._segments) > MAX_KEY_SEGMENTS:
+            self._consolidate()
+        return self
+
+    def _consolidate(self):
+        merged = self._segments[0][0].append([segment for segment, _ in self._segments[1:]])
+        self._segments = [(merged, 0)]
+
+    def _match(self, left_keys):
+        codes = self.lookup(left_keys)
+        found = codes >= 0
+        if self._offsets[-1] == self._n_keys:
+            # Unique right keys: each code owns exactly one row, order[code].
+            left_idx = np.flatnonzero(found)
+            return found.astype(np.int64), left_idx, self._order[codes[left_idx]]
+        safe = np.where(found, codes, 0)
+        starts = self._offsets[safe]
+        counts = np.where(found, self._offsets[safe + 1] - starts, 0)
+        left_idx = np.repeat(np.arange(len(codes)), counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        right_idx = self._order[starts[left_idx] + np.arange(left_idx.size) - first]
+        return counts, left_idx, right_idx
+
+    def merge(self, left, how="inner", left_on=None, suffixes=("_x", "_y")):
+        """Join ``left`` against the indexed table, like ``pd.merge(left, right, on=...)``."""
+        if how not in ("inner", "left", "outer"):
+            raise ValueError("how must be 'inner', 'left' or 'outer', got %r" % how)
+        left_on = left_on or self.on
+        left = left.reset_index(drop=True)
+        counts, left_idx, right_idx = self._match(left[left_on])
+
+        if how in ("left", "outer"):
+            # Left rows without a match keep one output row with right = -1.
+            counts_out = np.maximum(counts, 1)
+            unmatched = counts == 0
+            full_left = np.repeat(np.arange(len(left)), counts_out)
+            full_right = np.full(full_left.size, -1, dtype=np.int64)
+            matched_slots = np.flatnonzero(np.repeat(~unmatched, counts_out))
+            full_right[matched_slots] = right_idx
+            left_idx, right_idx = full_left, full_right
+        if how == "outer":
+            hit = np.zeros(len(self._right), dtype=bool)
+            hit[right_idx[right_idx >= 0]] = True
+            extra = np.flatnonzero(~hit)
+            left_idx = np.concatenate((left_idx, np.full(extra.size, -1, dtype=np.int64)))
+            right_idx = np.concatenate((right_idx, extra))
+
+        return self._assemble(left, left_on, left_idx, right_idx, suffixes)
+
+    def _assemble(self, left, left_on, left_idx, right_idx, suffixes):
+        right = self._right
+        overlap = (set(left.columns) & set(right.columns)) - {left_on, self.on}
+        columns = {}
+        left_missing = (left_idx < 0).any()
+        right_missing = (right_idx < 0).any()
+
+        for name in left.columns:
+            values = left[name].array.take(left_idx, allow_fill=left_missing)
+            if name == left_on and left_on == self.on and left_missing:
+                right_keys = right[self.on].array.take(right_idx, allow_fill=right_missing)
+                values = np.where(left_idx >= 0, np.asarray(values), np.asarray(right_keys))
+            columns[name + suffixes[0] if name in overlap else name] = values
+        for name in right.columns:
+            if name == self.on and self.on == left_on:
+                continue
+            values = right[name].array.take(right_idx, allow_fill=right_missing)
+            columns[name + suffixes[1] if name in overlap else name] = values
+        return pd.DataFrame(columns)
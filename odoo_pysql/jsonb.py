@@ -0,0 +1,361 @@
+"""JSONB key profiling, promotion to generated columns and typed decoding (Q21).
+
+``SELECT data->>'name', data->>'age' FROM person_table`` detoasts and walks
+the JSONB value of every row, returns text for everything, and a filter
+such as ``WHERE data->>'age' = '42'`` has no index to use.
+:class:`JsonbColumn` works out which keys are worth more than that:
+
+- ``profile()`` counts, on a sample, how often each top-level key appears
+  and with which JSON type;
+- ``promote()`` turns the hot keys into ``GENERATED ALWAYS AS (...) STORED``
+  columns (``data_name text``, ``data_age numeric``) with B-tree indexes, so
+  reads and filters on them no longer touch the document;
+- ``gin_index_sql()`` adds a ``jsonb_path_ops`` GIN index for ``@>``
+  containment filters on the keys that stay inside the document;
+- ``select_query()`` uses a promoted column where there is one and the
+  JSON operator otherwise.
+
+:class:`JsonRecordDecoder` is the Python half: it turns rows into typed
+NumPy arrays or ``__slots__`` dataclass instances rather than dicts of
+strings.
+
+SQLite (used for local benchmarks) cannot add STORED columns with
+``ALTER TABLE``, so promotion there adds VIRTUAL columns; their indexes
+still serve the filters, but reading them re-evaluates ``json_extract``.
+"""
+
+import collections
+import dataclasses
+import json
+import re
+
+import numpy as np
+
+from ._sql import DIALECT_PARAMSTYLES, check_dialect, check_identifier, placeholder
+
+_KEY = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_SQL_TYPE = re.compile(r"^[A-Za-z][A-Za-z ]*(\(\d+(, *\d+)?\))?$")
+
+# JSON type -> column type of the promoted column.
+PROMOTED_TYPES = {
+    "postgresql": {"string": "text", "number": "numeric", "boolean": "boolean"},
+    "sqlite": {"string": "TEXT", "number": "NUMERIC", "boolean": "INTEGER"},
+}
+
+# SQLite's json_each() reports finer types than jsonb_typeof().
+_SQLITE_JSON_TYPES = {"text": "string", "integer": "number", "real": "number",
+                      "true": "boolean", "false": "boolean"}
+
+KeyProfile = collections.namedtuple("KeyProfile", "key json_type rows fraction types")
+
+
+def _check_key(key):
+    if not _KEY.match(key):
+        raise ValueError("only identifier-like JSON keys can be promoted: %r" % key)
+    return key
+
+
+class JsonbColumn:
+    """Profile and promote the keys of a JSON(B) column.
+
+    ``promoted`` lists keys that already have a generated column (named
+    ``<column>_<key>``), e.g. when the instance is recreated after
+    :meth:`promote` ran in an earlier process.
+    """
+
+    def __init__(self, table="person_table", column="data", dialect="postgresql", promoted=()):
+        self.table = check_identifier(table)
+        self.column = check_identifier(column)
+        self.dialect = check_dialect(dialect)
+        self.mark = placeholder(DIALECT_PARAMSTYLES[dialect])
+        self.promoted = {_check_key(key): self.column_name(key) for key in promoted}
+
+    def column_name(self, key):
+        return check_identifier("%s_%s" % (self.column, _check_key(key)))
+
+    def _execute(self, connection, statements):
+        cur = connection.cursor()
+        try:
+            for statement in statements:
+                cur.execute(statement)
+        finally:
+            cur.close()
+
+    def _fetch(self, connection, sql, params=()):
+        cur = connection.cursor()
+        try:
+            cur.execute(sql, params)
+            return cur.fetchall()
+        finally:
+            cur.close()
+
+    def text_expression(self, key):
+        """``data->>'key'``: the key's value as text, parsed from the document."""
+        if self.dialect == "postgresql":
+            return "(%s->>'%s')" % (self.column, _check_key(key))
+        return "json_extract(%s, '$.%s')" % (self.column, _check_key(key))
+
+    def profile_sql(self, sample=None):
+        """Key/type/count query over an optional ``sample`` percentage of rows."""
+        if self.dialect == "postgresql":
+            source = "SELECT %s FROM %s" % (self.column, self.table)
+            if sample is not None:
+                source += " TABLESAMPLE SYSTEM (%s)" % float(sample)
+            return (
+                "WITH s AS (%s)\n"
+                "SELECT k.key, jsonb_typeof(k.value), count(*), (SELECT count(*) FROM s)\n"
+                "FROM s CROSS JOIN LATERAL jsonb_each(s.%s) k\n"
+                "WHERE jsonb_typeof(s.%s) = 'object'\n"
+                "GROUP BY 1, 2"
+            ) % (source, self.column, self.column)
+        source = "SELECT %s FROM %s" % (self.column, self.table)
+        if sample is not None:
+            source += " WHERE abs(random() %% 1000000) < %d" % round(float(sample) * 10000)
+        # MATERIALIZED: both references must see the same random sample.
+        return (
+            "WITH s AS MATERIALIZED (%s)\n"
+            "SELECT k.key, k.type, count(*), (SELECT count(*) FROM s)\n"
+            "FROM s, json_each(s.%s) k\n"
+            "WHERE json_type(s.%s) = 'object'\n"
+            "GROUP BY 1, 2"
+        ) % (source, self.column, self.column)
+
+    def profile(self, connection, sample=None):
+        """Return a :class:`KeyProfile` per top-level key, most frequent first.
+
+        ``json_type`` is the key's most common non-null type; ``fraction``
+        is the share of sampled rows that have the key at all.
+        """
+        types = collections.defaultdict(collections.Counter)
+        total = 0
+        for key, json_type, count, sampled in self._fetch(connection, self.profile_sql(sample)):
+            if self.dialect == "sqlite":
+                json_type = _SQLITE_JSON_TYPES.get(json_type, json_type)
+            types[key][json_type] += count
+            total = sampled
+        result = []
+        for key, counter in types.items():
+            rows = sum(counter.values())
+            typed = [(n, t) for t, n in counter.items() if t != "null"]
+            json_type = max(typed)[1] if typed else "null"
+            result.append(KeyProfile(key, json_type, rows, rows / total if total else 0.0, dict(counter)))
+        result.sort(key=lambda p: (-p.rows, p.key))
+        return result
+
+    @staticmethod
+    def hot_keys(profile, min_fraction=0.5):
+        """Scalar keys present in at least ``min_fraction`` of the rows."""
+        return [
+            p.key for p in profile
+            if p.fraction >= min_fraction and p.json_type in ("string", "number", "boolean")
+            and _KEY.match(p.key)
+        ]
+
+    def promote_sql(self, key, json_type="string", sql_type=None):
+        """``ALTER TABLE ... ADD COLUMN ... GENERATED`` plus its B-tree index.
+
+        Numbers and booleans are only cast when the value has that JSON
+        type (anything else becomes NULL), so one odd document cannot make
+        the ``ALTER`` fail. An explicit ``sql_type`` is cast unguarded.
+        """
+        column = self.column_name(key)
+        if sql_type is None:
+            try:
+                sql_type = PROMOTED_TYPES[self.dialect][json_type]
+            except KeyError:
+                raise ValueError("cannot promote a key of JSON type %r" % json_type) from None
+            guarded = json_type != "string"
+        else:
+            if not _SQL_TYPE.match(sql_type):
+                raise ValueError("invalid column type: %r" % sql_type)
+            guarded = False
+        if self.dialect == "postgresql":
+            expression = "%s->>'%s'" % (self.column, key)
+            if json_type != "string" or sql_type != "text":
+                expression = "(%s)::%s" % (expression, sql_type)
+            if guarded:
+                expression = "CASE WHEN jsonb_typeof(%s->'%s') = '%s' THEN %s END" % (
+                    self.column, key, json_type, expression)
+            storage = "STORED"
+        else:
+            expression = self.text_expression(key)
+            if guarded:
+                kinds = "'integer', 'real'" if json_type == "number" else "'true', 'false'"
+                expression = "CASE WHEN json_type(%s, '$.%s') IN (%s) THEN %s END" % (
+                    self.column, key, kinds, expression)
+            storage = "VIRTUAL"
+        return [
+            "ALTER TABLE %s ADD COLUMN %s %s GENERATED ALWAYS AS (%s) %s"
+            % (self.table, column, sql_type, expression, storage),
+            "CREATE INDEX IF NOT EXISTS %s_%s_idx ON %s (%s)"
+            % (self.table.replace(".", "_"), column, self.table, column),
+        ]
+
+    def promote(self, connection, keys=None, min_fraction=0.5, sample=None, sql_types=None):
+        """Promote ``keys`` (default: the hot keys of a fresh profile).
+
+        Returns ``{key: column}`` for the keys promoted by this call.
+        """
+        profile = {p.key: p for p in self.profile(connection, sample)}
+        if keys is None:
+            keys = self.hot_keys(profile.values(), min_fraction)
+        sql_types = sql_types or {}
+        done = {}
+        for key in keys:
+            if key in self.promoted:
+                continue
+            json_type = profile[key].json_type if key in profile else "string"
+            self._execute(connection, self.promote_sql(key, json_type, sql_types.get(key)))
+            done[key] = self.promoted[key] = self.column_name(key)
+        connection.commit()
+        return done
+
+    def gin_index_sql(self):
+        """``jsonb_path_ops`` GIN index serving ``data @> '{...}'`` filters."""
+        if self.dialect != "postgresql":
+            raise ValueError("GIN indexes need PostgreSQL")
+        return "CREATE INDEX IF NOT EXISTS %s_%s_gin_idx ON %s USING gin (%s jsonb_path_ops)" % (
+            self.table.replace(".", "_"), self.column, self.table, self.column)
+
+    def select_query(self, keys, filters=None, limit=None):
+        """Return ``(sql, params)`` selecting ``keys``, filtered by equality ``filters``.
+
+        Promoted keys are read and compared through their columns (B-tree);
+        the remaining filters become one ``@>`` containment test on
+        PostgreSQL (GIN) or ``json_extract`` comparisons on SQLite.
+        """
+        mark = self.mark
+        columns = [
+            "%s AS %s" % (self.promoted[key], key) if key in self.promoted
+            else "%s AS %s" % (self.text_expression(key), _check_key(key))
+            for key in keys
+        ]
+        clauses = []
+        params = []
+        contained = {}
+        for key, value in (filters or {}).items():
+            if key in self.promoted:
+                clauses.append("%s = %s" % (self.promoted[key], mark))
+                params.append(value)
+            elif self.dialect == "postgresql":
+                contained[key] = value
+            else:
+                clauses.append("%s = %s" % (self.text_expression(key), mark))
+                params.append(value)
+        if contained:
+            clauses.append("%s @> %s::jsonb" % (self.column, mark))
+            params.append(json.dumps(contained))
+        sql = "SELECT %s FROM %s" % (", ".join(columns), self.table)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if limit is not None:
+            sql += " LIMIT %s" % mark
+            params.append(limit)
+        return sql, params
+
+
+_BOOL_LITERALS = {"true": True, "t": True, "1": True, "false": False, "f": False, "0": False}
+
+
+def _coerce(kind, value):
+    # Like the guarded generated columns: a value that does not fit the
+    # declared type decodes as missing rather than failing the batch.
+    if value is None or type(value) is kind:
+        return value
+    if kind is bool:
+        if isinstance(value, str):
+            return _BOOL_LITERALS.get(value.lower())
+        return bool(value) if isinstance(value, (int, float)) else None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class JsonRecordDecoder:
+    """Decode JSON documents or row tuples into typed columns or slotted records.
+
+    ``schema`` maps field names to ``str``, ``int``, ``float`` or ``bool``
+    (insertion order is the field order). Documents may be JSON text/bytes
+    or already-decoded dicts (psycopg2 returns JSONB as dicts); documents
+    that are not JSON objects have every field missing. Values that do not
+    convert to their field's type decode as missing.
+    """
+
+    def __init__(self, schema, name="Record"):
+        self.schema = dict(schema)
+        for field, kind in self.schema.items():
+            if kind not in (str, int, float, bool):
+                raise ValueError("unsupported type for %r: %r" % (field, kind))
+        self.record_type = dataclasses.make_dataclass(
+            name, [(field, kind, dataclasses.field(default=None)) for field, kind in self.schema.items()],
+            slots=True,
+        )
+        self._loads = json.JSONDecoder().decode
+
+    def _documents(self, docs):
+        loads = self._loads
+        for doc in docs:
+            if isinstance(doc, (bytes, bytearray)):
+                doc = doc.decode()
+            if isinstance(doc, str):
+                doc = loads(doc)
+            # SQL NULL, JSON null and non-object documents have no fields.
+            yield doc if isinstance(doc, dict) else {}
+
+    def records(self, docs):
+        """List of ``record_type`` instances, one per document."""
+        make = self.record_type
+        fields = list(self.schema.items())
+        return [
+            make(*[_coerce(kind, doc.get(field)) for field, kind in fields])
+            for doc in self._documents(docs)
+        ]
+
+    def arrays(self, docs):
+        """``{field: ndarray}`` decoded from documents in one pass."""
+        fields = list(self.schema)
+        values = {field: [] for field in fields}
+        appends = [(field, values[field].append) for field in fields]
+        for doc in self._documents(docs):
+            get = doc.get
+            for field, append in appends:
+                append(get(field))
+        return {field: self._to_array(values[field], self.schema[field]) for field in fields}
+
+    def rows_to_arrays(self, rows):
+        """``{field: ndarray}`` from row tuples in schema order (promoted columns)."""
+        columns = list(zip(*rows)) if rows else [()] * len(self.schema)
+        return {field: self._to_array(list(column), kind)
+                for (field, kind), column in zip(self.schema.items(), columns)}
+
+    @staticmethod
+    def _to_array(values, kind):
+        # Missing integers become NaN in a float64 array, as pandas does;
+        # missing booleans and strings keep None in an object array.
+        if kind is str:
+            array = np.empty(len(values), dtype=object)
+            array[:] = [v if v is None or type(v) is str else str(v) for v in values]
+            return array
+        if kind is bool:
+            values = [_coerce(bool, v) for v in values]
+            if any(v is None for v in values):
+                array = np.empty(len(values), dtype=object)
+                array[:] = values
+                return array
+            return np.array(values, dtype=bool)
+        if kind is int and not any(v is None for v in values):
+            try:
+                return np.array(values, dtype=np.int64)
+            except (TypeError, ValueError, OverflowError):
+                values = [_coerce(int, v) for v in values]
+                if not any(v is None for v in values):
+                    try:
+                        return np.array(values, dtype=np.int64)
+                    except OverflowError:
+                        pass  # past int64: float64, like the missing-value case
+        try:
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            values = [_coerce(float, v) for v in values]
+            return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
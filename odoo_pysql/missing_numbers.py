@@ -0,0 +1,279 @@
+"""Streaming missing-number search (Q12) for sequences that do not fit in memory.
+
+The notes version calls ``len()`` and ``sum()`` on a list and finds exactly
+one gap. The helpers here read any iterable, NumPy array or ``np.memmap`` in
+fixed-size chunks, so memory stays constant no matter how long the input is:
+
+- one missing value: XOR of everything seen against XOR of ``1..n``;
+- ``k`` missing values: power sums ``sum(x**j)`` for ``j = 1..k``, kept
+  modulo a few 31-bit primes so NumPy never overflows, rebuilt exactly with
+  the Chinese remainder theorem and solved with Newton's identities;
+- unknown ``k``: a packed bitmap of ``n`` bits.
+
+Accumulators can be merged, so partial results from several workers (see
+:func:`parallel_find_missing_numbers`) combine into the same answer.
+"""
+
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Primes just below 2**31: residues multiply without overflowing int64, and a
+# chunk of DEFAULT_CHUNK_SIZE residues sums well inside int64.
+_PRIMES = (
+    2147483647, 2147483629, 2147483587, 2147483579, 2147483563,
+    2147483549, 2147483543, 2147483497, 2147483489, 2147483477,
+    2147483423, 2147483399, 2147483353, 2147483323, 2147483269,
+    2147483249, 2147483237, 2147483179, 2147483171, 2147483137,
+)
+_MAX_SUM_CHUNK = 1 << 31
+
+
+def _xor_upto(n):
+    """XOR of 1..n in O(1)."""
+    return (n, 1, n + 1, 0)[n % 4]
+
+
+def _bernoulli_numbers(m):
+    """B_0..B_m (Akiyama-Tanigawa, with the B_1 = +1/2 convention)."""
+    numbers = []
+    row = []
+    for i in range(m + 1):
+        row.append(Fraction(1, i + 1))
+        for j in range(i, 0, -1):
+            row[j - 1] = j * (row[j - 1] - row[j])
+        numbers.append(row[0])
+    return numbers
+
+
+def _power_sum_upto(n, j):
+    """Exact sum of i**j for i = 1..n (Faulhaber's formula)."""
+    bernoulli = _bernoulli_numbers(j)
+    total = Fraction(0)
+    for r in range(j + 1):
+        total += math.comb(j + 1, r) * bernoulli[r] * n ** (j + 1 - r)
+    return int(total / (j + 1))
+
+
+def _iter_chunks(nums, chunk_size):
+    if isinstance(nums, np.ndarray):
+        flat = nums.reshape(-1)
+        for start in range(0, flat.size, chunk_size):
+            yield np.asarray(flat[start:start + chunk_size], dtype=np.int64)
+        return
+    iterator = iter(nums)
+    while True:
+        chunk = np.fromiter(itertools.islice(iterator, chunk_size), dtype=np.int64)
+        if chunk.size == 0:
+            return
+        yield chunk
+
+
+class MissingNumberAccumulator:
+    """Mergeable one-pass state for finding ``k`` values missing from ``1..n``.
+
+    Feed chunks with :meth:`update`, combine partial states from other
+    workers with :meth:`merge`, then call :meth:`result`. Memory is O(k)
+    regardless of how many values are streamed through.
+    """
+
+    def __init__(self, n, k=1):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        if n < k:
+            raise ValueError("n must be at least k")
+        self.n = n
+        self.k = k
+        self.count = 0
+        self.xor = 0
+        # The missing values' j-th power sum is at most k * n**k; the prime
+        # product must exceed it for the CRT reconstruction to be exact.
+        bound_bits = (k * n ** k).bit_length() + 1
+        n_primes = -(-bound_bits // 30)
+        if n_primes > len(_PRIMES):
+            raise ValueError("k=%d is too large for n=%d" % (k, n))
+        self.primes = _PRIMES[:n_primes] if k > 1 else ()
+        self.residues = [[0] * k for _ in self.primes]
+
+    def update(self, chunk):
+        """Fold a chunk of integers (array or iterable) into the state."""
+        chunk = np.asarray(chunk, dtype=np.int64).reshape(-1)
+        for start in range(0, chunk.size, _MAX_SUM_CHUNK):
+            self._update(chunk[start:start + _MAX_SUM_CHUNK])
+        return self
+
+    def _update(self, chunk):
+        if chunk.size == 0:
+            return
+        self.count += int(chunk.size)
+        self.xor ^= int(np.bitwise_xor.reduce(chunk))
+        for prime, residues in zip(self.primes, self.residues):
+            base = chunk % prime
+            power = base
+            for j in range(self.k):
+                residues[j] = (residues[j] + int(power.sum())) % prime
+                if j + 1 < self.k:
+                    power = power * base % prime
+
+    def merge(self, other):
+        """Combine another accumulator built with the same ``n`` and ``k``."""
+        if (other.n, other.k) != (self.n, self.k):
+            raise ValueError("cannot merge accumulators for different (n, k)")
+        self.count += other.count
+        self.xor ^= other.xor
+        for prime, mine, theirs in zip(self.primes, self.residues, other.residues):
+            for j in range(self.k):
+                mine[j] = (mine[j] + theirs[j]) % prime
+        return self
+
+    def _missing_power_sums(self):
+        modulus = math.prod(self.primes)
+        sums = []
+        for j in range(self.k):
+            value = 0
+            for prime, residues in zip(self.primes, self.residues):
+                partial = modulus // prime
+                value += residues[j] * partial * pow(partial, -1, prime)
+            expected = _power_sum_upto(self.n, j + 1)
+            sums.append((expected - value) % modulus)
+        return sums
+
+    def result(self):
+        """Return the sorted list of missing values."""
+        if self.count != self.n - self.k:
+            raise ValueError(
+                "expected %d values for n=%d, k=%d but saw %d"
+                % (self.n - self.k, self.n, self.k, self.count)
+            )
+        if self.k == 1:
+            return [self.xor ^ _xor_upto(self.n)]
+        return sorted(_integer_roots(_elementary_symmetric(self._missing_power_sums()), self.n))
+
+
+def _elementary_symmetric(power_sums):
+    # Newton's identities: m * e_m = sum_{i=1..m} (-1)**(i-1) * e_{m-i} * p_i
+    e = [1]
+    for m in range(1, len(power_sums) + 1):
+        total = 0
+        for i in range(1, m + 1):
+            total += (-1) ** (i - 1) * e[m - i] * power_sums[i - 1]
+        if total % m:
+            raise ValueError("input is not 1..n with distinct values missing")
+        e.append(total // m)
+    return e
+
+
+def _integer_roots(e, n):
+    """Roots of prod(x - r) given its elementary symmetric polynomials ``e``."""
+    coeffs = [(-1) ** i * e[i] for i in range(len(e))]  # highest degree first
+    roots = []
+    x = n + 1
+    while len(coeffs) > 1:
+        # All roots are distinct integers <= x, so integer Newton from the
+        # right decreases monotonically and lands exactly on the largest one.
+        while True:
+            value = 0
+            slope = 0
+            for c in coeffs:
+                slope = slope * x + value
+                value = value * x + c
+            if value == 0:
+                break
+            if slope <= 0 or value < 0 or x < 1:
+                raise ValueError("input is not 1..n with distinct values missing")
+            x -= -(-value // slope)
+        roots.append(x)
+        deflated = [coeffs[0]]
+        for c in coeffs[1:-1]:
+            deflated.append(c + deflated[-1] * x)
+        coeffs = deflated
+    if len(set(roots)) != len(roots) or any(r < 1 or r > n for r in roots):
+        raise ValueError("input is not 1..n with distinct values missing")
+    return roots
+
+
+def find_missing_number(nums, n=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return the single value missing from ``nums`` (a stream over ``1..n``).
+
+    ``n`` defaults to ``count + 1``. ``nums`` is read once, chunk by chunk.
+    """
+    count = 0
+    xor = 0
+    for chunk in _iter_chunks(nums, chunk_size):
+        count += int(chunk.size)
+        xor ^= int(np.bitwise_xor.reduce(chunk))
+    if n is None:
+        n = count + 1
+    elif count != n - 1:
+        raise ValueError("expected %d values for n=%d but saw %d" % (n - 1, n, count))
+    return xor ^ _xor_upto(n)
+
+
+def find_missing_numbers(nums, n, k, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return the ``k`` values missing from ``nums`` (a stream over ``1..n``)."""
+    acc = MissingNumberAccumulator(n, k)
+    for chunk in _iter_chunks(nums, chunk_size):
+        acc.update(chunk)
+    return acc.result()
+
+
+def find_missing_bitmap(nums, n, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return every value of ``1..n`` absent from ``nums``, for unknown ``k``.
+
+    Uses a packed bitmap of ``n`` bits (``n / 8`` bytes); duplicates and
+    out-of-range values are ignored.
+    """
+    bits = np.zeros((n + 8) // 8, dtype=np.uint8)
+    for chunk in _iter_chunks(nums, chunk_size):
+        chunk = chunk[(chunk >= 1) & (chunk <= n)]
+        np.bitwise_or.at(bits, chunk >> 3, (1 << (chunk & 7)).astype(np.uint8))
+    missing = []
+    block = 1 << 20
+    for start in range(0, bits.size, block):
+        seen = np.unpackbits(bits[start:start + block], bitorder="little")
+        values = np.flatnonzero(seen == 0) + start * 8
+        missing.append(values[(values >= 1) & (values <= n)])
+    return np.concatenate(missing)
+
+
+def _open_int_array(path, dtype):
+    if str(path).endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def _reduce_range(path, dtype, start, stop, n, k, chunk_size):
+    data = _open_int_array(path, dtype)
+    acc = MissingNumberAccumulator(n, k)
+    for chunk in _iter_chunks(data[start:stop], chunk_size):
+        acc.update(chunk)
+    return acc
+
+
+def parallel_find_missing_numbers(path, n, k=1, dtype=np.int64, workers=None,
+                                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """Find ``k`` missing values in an on-disk int array using a process pool.
+
+    ``path`` is a ``.npy`` file or a raw binary file of ``dtype`` values. Each
+    worker memory-maps its own slice and returns a
+    :class:`MissingNumberAccumulator`; the parent merges them.
+    """
+    size = _open_int_array(path, dtype).size
+    workers = workers or os.cpu_count() or 1
+    step = max(1, -(-size // workers))
+    bounds = [(start, min(start + step, size)) for start in range(0, size, step)]
+    total = MissingNumberAccumulator(n, k)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_reduce_range, path, dtype, start, stop, n, k, chunk_size)
+            for start, stop in bounds
+        ]
+        for future in futures:
+            total.merge(future.result())
+    return total.result()
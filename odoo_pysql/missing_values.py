@@ -0,0 +1,251 @@
+"""Chunked missing-value handling for exports that do not fit in memory.
+
+The pandas recipe in the notes (``isna()``, ``dropna()``, ``fillna()``,
+``interpolate()``, mean imputation) works on one in-memory DataFrame and
+every step returns a full copy. :class:`MissingValuePipeline` runs the same
+operations over a CSV or Parquet file in two streaming passes:
+
+1. ``fit()`` reads the file chunk by chunk and collects per-column null
+   counts, sums (for mean imputation) and the first/last valid value of each
+   chunk (so interpolation can cross chunk boundaries);
+2. ``transform()`` reads it again and cleans each chunk in place, optionally
+   on a process pool, yielding the chunks in order.
+
+Peak memory is a few chunks, whatever the size of the file.
+"""
+
+import collections
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 250_000
+
+
+def _detect_format(path):
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    return "csv"
+
+
+def _read_chunks(path, fmt, chunksize, columns=None, read_options=None):
+    read_options = read_options or {}
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("reading Parquet files requires pyarrow") from exc
+        parquet = pq.ParquetFile(path)
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas(**read_options)
+        return
+    yield from pd.read_csv(path, chunksize=chunksize, usecols=columns, **read_options)
+
+
+def _valid_bounds(values):
+    """(first_pos, first_value, last_pos, last_value) of the non-NaN entries, or None."""
+    valid = np.flatnonzero(~np.isnan(values))
+    if valid.size == 0:
+        return None
+    first, last = valid[0], valid[-1]
+    return first, values[first], last, values[last]
+
+
+def _interpolate_column(values, offset, prev_point, next_point):
+    """Linear interpolation of ``values`` using neighbours from other chunks.
+
+    Matches ``Series.interpolate()`` on the whole column: NaNs before the
+    first valid value stay NaN, NaNs after the last valid value take that
+    value.
+    """
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+    valid = np.flatnonzero(~missing)
+    xp = valid + offset
+    fp = values[valid]
+    if prev_point is not None:
+        xp = np.concatenate(([prev_point[0]], xp))
+        fp = np.concatenate(([prev_point[1]], fp))
+    if next_point is not None:
+        xp = np.concatenate((xp, [next_point[0]]))
+        fp = np.concatenate((fp, [next_point[1]]))
+    if xp.size == 0:
+        return values
+    positions = np.flatnonzero(missing)
+    global_positions = positions + offset
+    fillable = global_positions > xp[0]
+    values[positions[fillable]] = np.interp(global_positions[fillable], xp, fp)
+    return values
+
+
+def _transform_chunk(chunk, offset, boundaries, means, fill, dropna):
+    for column, (prev_point, next_point) in boundaries.items():
+        values = chunk[column].to_numpy(dtype=np.float64, copy=True)
+        chunk[column] = _interpolate_column(values, offset, prev_point, next_point)
+    if means:
+        chunk.fillna(value=means, inplace=True)
+    if fill:
+        chunk.fillna(value=fill, inplace=True)
+    if dropna:
+        subset = None if dropna is True else list(dropna)
+        chunk.dropna(subset=subset, inplace=True)
+    return chunk
+
+
+class MissingValuePipeline:
+    """Streamed null profiling, imputation, interpolation and row dropping.
+
+    ``impute_mean`` columns are filled with the column mean from ``fit()``,
+    ``interpolate`` columns are linearly interpolated across the whole file,
+    ``fill`` maps columns to constant replacements, and ``dropna`` (``True``
+    or a list of columns) drops the rows that are still missing afterwards.
+    Steps run in that order. ``workers`` > 1 cleans chunks on a process pool.
+    """
+
+    def __init__(self, path, chunksize=DEFAULT_CHUNKSIZE, fmt=None, columns=None,
+                 impute_mean=(), interpolate=(), fill=None, dropna=False,
+                 workers=None, read_options=None):
+        self.path = path
+        self.chunksize = chunksize
+        self.fmt = fmt or _detect_format(path)
+        self.columns = columns
+        self.impute_mean = list(impute_mean)
+        self.interpolate = list(interpolate)
+        self.fill = dict(fill or {})
+        self.dropna = dropna
+        self.workers = workers
+        self.read_options = read_options
+        self.means = None
+        self.profile = None
+        self._boundaries = None
+
+    def _chunks(self):
+        return _read_chunks(self.path, self.fmt, self.chunksize, self.columns, self.read_options)
+
+    def fit(self):
+        """First pass: null profile, means and interpolation anchors.
+
+        Returns the null profile as a DataFrame indexed by column with
+        ``rows``, ``nulls``, ``null_fraction`` and ``mean`` (numeric columns).
+        """
+        nulls = None
+        sums = None
+        counts = None
+        rows = 0
+        chunk_bounds = {column: [] for column in self.interpolate}
+        for chunk in self._chunks():
+            # count() works column by column; no boolean isna() frame is built.
+            non_null = chunk.count()
+            chunk_nulls = len(chunk) - non_null
+            chunk_sums = chunk.sum(numeric_only=True)
+            chunk_counts = non_null[chunk_sums.index]
+            if nulls is None:
+                nulls, sums, counts = chunk_nulls, chunk_sums, chunk_counts
+            else:
+                nulls = nulls.add(chunk_nulls, fill_value=0)
+                sums = sums.add(chunk_sums, fill_value=0)
+                counts = counts.add(chunk_counts, fill_value=0)
+            for column in self.interpolate:
+                values = chunk[column].to_numpy(dtype=np.float64)
+                bounds = _valid_bounds(values)
+                if bounds is not None:
+                    first, first_value, last, last_value = bounds
+                    bounds = (first + rows, first_value, last + rows, last_value)
+                chunk_bounds[column].append(bounds)
+            rows += len(chunk)
+
+        if nulls is None:
+            self.means = {}
+            self.profile = pd.DataFrame(columns=["rows", "nulls", "null_fraction", "mean"])
+            self._boundaries = []
+            return self.profile
+
+        means = sums / counts.replace(0, np.nan)
+        self.means = {c: means[c] for c in self.impute_mean if c in means.index}
+        profile = pd.DataFrame({"rows": rows, "nulls": nulls.astype(np.int64)})
+        profile["null_fraction"] = profile["nulls"] / rows if rows else 0.0
+        profile["mean"] = means.reindex(profile.index)
+        self.profile = profile
+        self._boundaries = self._resolve_boundaries(chunk_bounds)
+        return profile
+
+    def _resolve_boundaries(self, chunk_bounds):
+        """For every chunk and column, the nearest valid point before and after it."""
+        n_chunks = len(next(iter(chunk_bounds.values()), []))
+        boundaries = [dict() for _ in range(n_chunks)]
+        for column, bounds in chunk_bounds.items():
+            prev_point = None
+            for i, b in enumerate(bounds):
+                boundaries[i][column] = [prev_point, None]
+                if b is not None:
+                    prev_point = (b[2], b[3])
+            next_point = None
+            for i in range(len(bounds) - 1, -1, -1):
+                boundaries[i][column][1] = next_point
+                if bounds[i] is not None:
+                    next_point = (bounds[i][0], bounds[i][1])
+        return boundaries
+
+    def null_profile(self):
+        """Per-column null counts (runs ``fit()`` if needed)."""
+        if self.profile is None:
+            self.fit()
+        return self.profile
+
+    def transform(self):
+        """Second pass: yield cleaned chunks in file order."""
+        if self.profile is None:
+            self.fit()
+        jobs = self._jobs()
+        if not self.workers or self.workers <= 1:
+            for args in jobs:
+                yield _transform_chunk(*args)
+            return
+        in_flight = collections.deque()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for args in jobs:
+                in_flight.append(pool.submit(_transform_chunk, *args))
+                # Back-pressure: keep at most two chunks per worker in memory.
+                if len(in_flight) >= 2 * self.workers:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def _jobs(self):
+        offset = 0
+        for i, chunk in enumerate(self._chunks()):
+            boundaries = {c: tuple(points) for c, points in self._boundaries[i].items()} if self._boundaries else {}
+            length = len(chunk)
+            yield chunk, offset, boundaries, self.means, self.fill, self.dropna
+            offset += length
+
+    def to_csv(self, path, **kwargs):
+        """Stream the cleaned data to a CSV file."""
+        header = True
+        mode = "w"
+        for chunk in self.transform():
+            chunk.to_csv(path, mode=mode, header=header, index=False, **kwargs)
+            header = False
+            mode = "a"
+
+    def to_parquet(self, path):
+        """Stream the cleaned data to a Parquet file (requires pyarrow)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("writing Parquet files requires pyarrow") from exc
+        writer = None
+        try:
+            for chunk in self.transform():
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+        finally:
+            if writer is not None:
+                writer.close()
@@ -0,0 +1,197 @@
+"""Keyset ("seek") pagination to replace ROW_NUMBER()/OFFSET paging (Q14, Q18).
+
+``ROW_NUMBER() OVER (ORDER BY amount DESC)`` or ``OFFSET n LIMIT m`` make the
+database produce and throw away every row before the requested page, so page
+10,000 costs 10,000 times page 1. Keyset pagination remembers the sort key of
+the last row shown and asks for the rows after it::
+
+    SELECT ... FROM orders
+    WHERE (amount, order_id) < (%s, %s)
+    ORDER BY amount DESC, order_id DESC
+    LIMIT 50
+
+With a composite index on ``(amount DESC, order_id DESC)`` every page is one
+index seek plus ``LIMIT`` rows, whatever its depth. The last key is handed to
+clients as an opaque, optionally signed cursor token.
+
+Key columns must be NOT NULL and together unique (append the primary key as
+the last column, as with ``order_id`` above).
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+
+from ._sql import check_identifier, placeholder
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token is malformed, forged or for another query."""
+
+
+class KeysetPaginator:
+    """Build and run keyset-paginated queries over ``table``.
+
+    ``order_by`` is a list of ``(column, "asc"|"desc")`` pairs, most
+    significant first; the last column must make the order unique.
+    ``paramstyle`` is ``"format"`` (psycopg2, ``%s``) or ``"qmark"``
+    (sqlite3, ``?``). With ``secret`` set, cursor tokens are HMAC-signed so
+    clients cannot craft their own.
+    """
+
+    def __init__(self, table, order_by=(("amount", "desc"), ("order_id", "desc")),
+                 columns=("*",), page_size=50, paramstyle="format", secret=None):
+        self.table = check_identifier(table)
+        self.order_by = []
+        for column, direction in order_by:
+            direction = direction.lower()
+            if direction not in ("asc", "desc"):
+                raise ValueError("direction must be 'asc' or 'desc', got %r" % direction)
+            self.order_by.append((check_identifier(column), direction))
+        if not self.order_by:
+            raise ValueError("order_by needs at least one column")
+        self.columns = [c if c == "*" else check_identifier(c) for c in columns]
+        self.page_size = page_size
+        self.mark = placeholder(paramstyle)
+        self.paramstyle = paramstyle
+        self.secret = secret.encode() if isinstance(secret, str) else secret
+
+    @property
+    def key_columns(self):
+        return [column for column, _ in self.order_by]
+
+    def _select(self):
+        # The key columns are always selected, so the next cursor can be built.
+        columns = list(self.columns)
+        if columns != ["*"]:
+            columns += [c for c in self.key_columns if c not in columns]
+        return "SELECT %s FROM %s" % (", ".join(columns), self.table)
+
+    def _order_clause(self):
+        return "ORDER BY " + ", ".join("%s %s" % (c, d.upper()) for c, d in self.order_by)
+
+    def _seek_predicate(self):
+        mark = self.mark
+        directions = {d for _, d in self.order_by}
+        if len(directions) == 1:
+            # Uniform direction: a row-value comparison, which PostgreSQL (and
+            # SQLite >= 3.15) can turn into a single index range scan.
+            op = "<" if directions == {"desc"} else ">"
+            return "(%s) %s (%s)" % (
+                ", ".join(self.key_columns), op, ", ".join([mark] * len(self.order_by))
+            ), list(range(len(self.order_by)))
+        # Mixed directions: expand to (a > x) OR (a = x AND b < y) OR ...
+        terms = []
+        params = []
+        for i, (column, direction) in enumerate(self.order_by):
+            parts = []
+            for j in range(i):
+                parts.append("%s = %s" % (self.order_by[j][0], mark))
+                params.append(j)
+            parts.append("%s %s %s" % (column, "<" if direction == "desc" else ">", mark))
+            params.append(i)
+            terms.append("(" + " AND ".join(parts) + ")")
+        return "(" + " OR ".join(terms) + ")", params
+
+    def page_query(self, cursor=None, where=None, where_params=(), limit=None):
+        """Return ``(sql, params)`` for the page after ``cursor`` (first page if None).
+
+        ``where`` is an optional extra filter (using this paginator's
+        paramstyle) ANDed with the seek predicate. ``limit`` defaults to the
+        page size.
+        """
+        clauses = []
+        params = list(where_params)
+        if where:
+            clauses.append("(%s)" % where)
+        if cursor is not None:
+            values = self.decode_cursor(cursor)
+            predicate, order = self._seek_predicate()
+            clauses.append(predicate)
+            params.extend(values[i] for i in order)
+        mark = self.mark
+        sql = self._select()
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " %s LIMIT %s" % (self._order_clause(), mark)
+        params.append(self.page_size if limit is None else limit)
+        return sql, params
+
+    def index_name(self):
+        return "%s_%s_keyset_idx" % (self.table.replace(".", "_"), "_".join(self.key_columns))
+
+    def index_sql(self, concurrently=False):
+        """``CREATE INDEX`` statement for the composite index the seek needs."""
+        return "CREATE INDEX %sIF NOT EXISTS %s ON %s (%s)" % (
+            "CONCURRENTLY " if concurrently else "",
+            self.index_name(),
+            self.table,
+            ", ".join("%s %s" % (c, d.upper()) for c, d in self.order_by),
+        )
+
+    def ensure_index(self, connection, concurrently=False):
+        """Create the supporting index if it does not exist yet.
+
+        PostgreSQL refuses ``CREATE INDEX CONCURRENTLY`` inside a transaction
+        block, so ``concurrently=True`` needs a connection in autocommit mode
+        (``connection.autocommit = True`` with psycopg); otherwise
+        ``ValueError`` is raised before anything is sent.
+        """
+        if concurrently and not getattr(connection, "autocommit", False):
+            raise ValueError("CREATE INDEX CONCURRENTLY cannot run inside a transaction block; "
+                             "pass a connection in autocommit mode")
+        cur = connection.cursor()
+        try:
+            cur.execute(self.index_sql(concurrently=concurrently))
+        finally:
+            cur.close()
+        if not concurrently:
+            connection.commit()
+
+    def encode_cursor(self, values):
+        """Turn the last row's key values into an opaque URL-safe token."""
+        payload = json.dumps(list(values), separators=(",", ":"), default=str).encode()
+        if self.secret:
+            payload += b"." + hmac.new(self.secret, payload, hashlib.sha256).hexdigest().encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    def decode_cursor(self, token):
+        """Inverse of :meth:`encode_cursor`; raises :class:`InvalidCursor`."""
+        try:
+            payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (ValueError, TypeError) as exc:
+            raise InvalidCursor("cursor is not valid base64") from exc
+        if self.secret:
+            payload, _, signature = payload.rpartition(b".")
+            expected = hmac.new(self.secret, payload, hashlib.sha256).hexdigest().encode()
+            if not hmac.compare_digest(signature, expected):
+                raise InvalidCursor("cursor signature does not match")
+        try:
+            values = json.loads(payload)
+        except ValueError as exc:
+            raise InvalidCursor("cursor payload is not valid JSON") from exc
+        if not isinstance(values, list) or len(values) != len(self.order_by):
+            raise InvalidCursor("cursor does not match the %d key columns" % len(self.order_by))
+        return values
+
+    def fetch_page(self, connection, cursor=None, where=None, where_params=()):
+        """Run the page query on a DB-API connection.
+
+        Returns ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+        """
+        # One extra row tells whether another page exists.
+        sql, params = self.page_query(cursor, where, where_params, limit=self.page_size + 1)
+        cur = connection.cursor()
+        try:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+            names = [d[0] for d in cur.description]
+        finally:
+            cur.close()
+        if len(rows) <= self.page_size:
+            return rows, None
+        rows = rows[:self.page_size]
+        positions = [names.index(c.rsplit(".", 1)[-1]) for c in self.key_columns]
+        last = rows[-1]
+        return rows, self.encode_cursor([last[i] for i in positions])
@@ -0,0 +1,126 @@
+"""Perfect-square checks (Q10) for single values and whole batches.
+
+The notes version uses ``int(num**0.5)``, which goes through a float and
+gives wrong answers once ``num`` no longer fits in the 53-bit mantissa.
+Here single values use ``math.isqrt`` (exact for any size), and batches are
+screened with quadratic-residue tables before any square root is taken.
+"""
+
+import math
+
+import numpy as np
+
+# Largest int64 whose integer square root squared still fits in uint64 math.
+_INT64_MAX = np.iinfo(np.int64).max
+_ROOT_MAX = math.isqrt(int(_INT64_MAX))
+
+# Moduli whose square residues reject ~99.4% of non-squares combined.
+_FILTER_MODULI = (64, 63, 65, 11)
+
+
+def _residue_table(modulus):
+    table = np.zeros(modulus, dtype=bool)
+    table[[(i * i) % modulus for i in range(modulus)]] = True
+    return table
+
+
+_RESIDUE_TABLES = {m: _residue_table(m) for m in _FILTER_MODULI}
+_RESIDUE_SETS = {m: frozenset(np.flatnonzero(t).tolist()) for m, t in _RESIDUE_TABLES.items()}
+
+
+def is_perfect_square(num):
+    """Return True if the integer ``num`` is a perfect square (exact for big ints).
+
+    Floats count only when integral (``16.0`` is, ``4.5``, ``inf`` and ``nan``
+    are not), as with the notes' ``root * root == num`` comparison.
+    """
+    if isinstance(num, (float, np.floating)) and not float(num).is_integer():
+        return False
+    num = int(num)
+    if num < 0:
+        return False
+    for modulus in _FILTER_MODULI:
+        if num % modulus not in _RESIDUE_SETS[modulus]:
+            return False
+    root = math.isqrt(num)
+    return root * root == num
+
+
+def _mask_int64(values):
+    # values: non-negative int64 array
+    mask = _RESIDUE_TABLES[64][values & 63]
+    candidates = np.flatnonzero(mask)
+    for modulus in _FILTER_MODULI[1:]:
+        if candidates.size == 0:
+            break
+        keep = _RESIDUE_TABLES[modulus][values[candidates] % modulus]
+        mask[candidates[~keep]] = False
+        candidates = candidates[keep]
+    if candidates.size == 0:
+        return mask
+
+    x = values[candidates].astype(np.uint64)
+    # float64 sqrt is within one unit of the true root for any int64, so
+    # checking root - 1, root and root + 1 exactly is enough.
+    root = np.rint(np.sqrt(x.astype(np.float64))).astype(np.uint64)
+    np.minimum(root, _ROOT_MAX, out=root)
+    hit = root * root == x
+    below = root - 1
+    hit |= (root > 0) & (below * below == x)
+    above = root + 1
+    hit |= above * above == x
+    mask[candidates] = hit
+    return mask
+
+
+def is_perfect_square_batch(values):
+    """Return a boolean mask telling which entries of ``values`` are perfect squares.
+
+    ``values`` can be a NumPy array or any iterable of integers. Values that
+    fit in int64 are checked with vectorized operations; anything larger
+    (object arrays, uint64 above the int64 range, Python big ints) falls back
+    to the exact :func:`is_perfect_square` per element.
+    """
+    if not isinstance(values, np.ndarray):
+        values = list(values)
+        try:
+            array = np.asarray(values)
+        except OverflowError:
+            array = None
+        # Ints past int64 mixed with negatives are inferred as float64;
+        # keep them exact.
+        if array is None or (array.dtype.kind not in "iub"
+                             and all(isinstance(v, (int, np.integer)) for v in values)):
+            array = np.asarray(values, dtype=object)
+        values = array
+        if values.size == 0:
+            return np.zeros(values.shape, dtype=bool)
+
+    if values.dtype == bool:
+        # False and True are 0 and 1, both squares.
+        return np.ones(values.shape, dtype=bool)
+    if values.dtype.kind not in "iuO":
+        raise TypeError("is_perfect_square_batch expects integer values, got %s" % values.dtype)
+
+    if values.dtype.kind == "O":
+        flat = values.ravel()
+        mask = np.fromiter((is_perfect_square(v) for v in flat), dtype=bool, count=flat.size)
+        return mask.reshape(values.shape)
+
+    flat = values.ravel()
+    mask = np.zeros(flat.size, dtype=bool)
+    if flat.dtype.kind == "u":
+        small = flat <= _INT64_MAX
+        big = np.flatnonzero(~small)
+        for i in big:
+            mask[i] = is_perfect_square(int(flat[i]))
+        small_idx = np.flatnonzero(small)
+        mask[small_idx] = _mask_int64(flat[small_idx].astype(np.int64))
+    else:
+        flat = flat.astype(np.int64, copy=False)
+        if flat.size and flat.min() >= 0:
+            mask = _mask_int64(flat)
+        else:
+            positive = np.flatnonzero(flat >= 0)
+            mask[positive] = _mask_int64(flat[positive])
+    return mask.reshape(values.shape)
@@ -0,0 +1,275 @@
+"""Lazy comprehension pipelines with fused stages (Q7).
+
+``[x**2 for x in range(10) if x % 2 == 0]`` is fine once. Copied over large
+record sets it turns into chains of comprehensions, one per step, and every
+intermediate list is allocated in full before the next step starts.
+:class:`Pipeline` records ``map``/``filter`` stages and runs them lazily:
+
+- the stages are fused into one generated loop (no per-stage generator or
+  list), specialised for the sink (iteration, list, dict);
+- with ``vectorize=True``, a numeric source (``range``, NumPy array,
+  numeric Series, or a list of numbers) is processed in chunks of
+  ``chunksize`` elements, calling each stage once per chunk on an array, so
+  ``x % 2 == 0`` becomes a boolean mask; if a stage does not vectorize on
+  the first chunk (raises, or returns something else than an array of the
+  right length), that chunk and the rest run per item;
+- ``workers=N`` on the collecting methods runs the chunks on a
+  ``ProcessPoolExecutor`` with a bounded number of chunks in flight; stage
+  functions must then be picklable (module-level functions or
+  ``functools.partial``, not lambdas).
+
+Vectorization is opt-in because array stages follow NumPy semantics:
+integers wrap at 64 bits (``x**3`` over ``range(3_000_000)`` overflows) and
+division by zero gives ``inf``/``nan`` instead of raising. The default
+per-item loop gives the same results as the comprehensions it replaces.
+"""
+
+import collections
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 1 << 16
+
+_FUSED = {}
+
+
+class _NotVectorizable(Exception):
+    pass
+
+
+def _fuse(kinds, sink):
+    """Compile one loop running ``kinds`` (``"map"``/``"filter"``) into ``sink``."""
+    fused = _FUSED.get((kinds, sink))
+    if fused is not None:
+        return fused
+    lines = ["def fused(items, stages, out, key, value):"]
+    if kinds:
+        lines.append("    %s, = stages" % ", ".join("f%d" % i for i in range(len(kinds))))
+    if sink == "append":
+        lines.append("    append = out.append")
+    lines.append("    for x in items:")
+    for i, kind in enumerate(kinds):
+        if kind == "map":
+            lines.append("        x = f%d(x)" % i)
+        else:
+            lines.append("        if not f%d(x):" % i)
+            lines.append("            continue")
+    lines.append("        " + {
+        "yield": "yield x",
+        "append": "append(x)",
+        "pairs": "k, v = x; out[k] = v",
+        "key": "out[key(x)] = x",
+        "items": "out[key(x)] = value(x)",
+    }[sink])
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    fused = _FUSED[(kinds, sink)] = namespace["fused"]
+    return fused
+
+
+def _dict_sink(key, value):
+    if key is None and value is None:
+        return "pairs"
+    if key is None:
+        raise ValueError("value= needs key=")
+    return "key" if value is None else "items"
+
+
+_INT64 = np.iinfo(np.int64)
+
+
+def _as_numeric(source):
+    """``source`` as a 1-D int/float ndarray, or a ``range`` within int64.
+
+    Ranges stay ranges, so each chunk becomes an array only when it runs.
+    Ranges past int64 give None (they run per item); other non-numeric
+    sources raise ``ValueError``.
+    """
+    if isinstance(source, range):
+        if _INT64.min <= min(source.start, source.stop) and max(source.start, source.stop) <= _INT64.max:
+            return source
+        return None
+    if isinstance(source, (pd.Series, pd.Index)):
+        source = source.to_numpy()
+    if not isinstance(source, np.ndarray):
+        source = np.asarray(list(source))
+    if source.dtype.kind in "biuf" and source.ndim == 1:
+        return source
+    raise ValueError("vectorize=True needs a 1-D numeric source, got %s" % source.dtype)
+
+
+def _as_array(chunk):
+    if isinstance(chunk, range):
+        return np.arange(chunk.start, chunk.stop, chunk.step, dtype=np.int64)
+    return chunk
+
+
+def _vector_apply(stages, array):
+    length = len(array)
+    for kind, fn in stages:
+        try:
+            result = fn(array)
+        except (TypeError, ValueError, AttributeError) as exc:
+            raise _NotVectorizable(exc)
+        if kind == "filter":
+            if not isinstance(result, np.ndarray) or result.dtype != bool or result.shape != (length,):
+                raise _NotVectorizable(fn)
+            array = array[result]
+            length = len(array)
+        else:
+            if np.ndim(result) == 0 and not isinstance(result, (str, bytes, tuple, list, dict)):
+                result = np.full(length, result)
+            if not isinstance(result, np.ndarray) or result.shape[:1] != (length,) or result.dtype == object:
+                raise _NotVectorizable(fn)
+            array = result
+    return array
+
+
+def _vector_collect(stages, chunk, sink, key, value):
+    """Run ``stages`` over one chunk as arrays; raises ``_NotVectorizable``."""
+    array = _vector_apply(stages, _as_array(chunk))
+    if sink == "append":
+        return array
+    keys = _vector_apply((("map", key),), array).tolist()
+    values = _vector_apply((("map", value),), array).tolist() if value is not None else array.tolist()
+    return dict(zip(keys, values))
+
+
+def _collect(stages, chunk, sink, key, value, vectorize):
+    """Run ``stages`` over one chunk: an array or list for ``"append"``, else a dict."""
+    if vectorize:
+        try:
+            return _vector_collect(stages, chunk, sink, key, value)
+        except _NotVectorizable:
+            pass
+    if isinstance(chunk, np.ndarray):
+        chunk = chunk.tolist()
+    kinds = tuple(kind for kind, _ in stages)
+    out = [] if sink == "append" else {}
+    _fuse(kinds, sink)(chunk, tuple(fn for _, fn in stages), out, key, value)
+    return out
+
+
+def _collect_job(job):
+    return _collect(*job)
+
+
+class Pipeline:
+    """Lazy ``map``/``filter`` chain over ``source``, run in one fused pass.
+
+    ``vectorize=True`` runs the stages on NumPy arrays (``source`` must be
+    numeric; lists of numbers are converted, iterators one chunk at a
+    time); by default every item goes
+    through the fused per-item loop. Pipelines are immutable: ``map`` and
+    ``filter`` return a new one.
+    """
+
+    def __init__(self, source, vectorize=False, chunksize=DEFAULT_CHUNKSIZE, _stages=()):
+        self.source = source
+        self.vectorize = vectorize
+        self.chunksize = chunksize
+        self.stages = tuple(_stages)
+
+    def _extend(self, kind, fn):
+        return Pipeline(self.source, self.vectorize, self.chunksize, self.stages + ((kind, fn),))
+
+    def map(self, fn):
+        return self._extend("map", fn)
+
+    def filter(self, predicate):
+        return self._extend("filter", predicate)
+
+    def __repr__(self):
+        steps = "".join(".%s(%s)" % (kind, getattr(fn, "__name__", fn)) for kind, fn in self.stages)
+        return "Pipeline(%s)%s" % (type(self.source).__name__, steps)
+
+    def _numeric_chunks(self):
+        """Chunks of the source as arrays (ranges stay ranges), or None when
+        the stages run per item. Call it once: it consumes iterators."""
+        if not self.vectorize:
+            return None
+        if isinstance(self.source, (range, list, tuple, np.ndarray, pd.Series, pd.Index)):
+            numeric = _as_numeric(self.source)
+            if numeric is None:
+                return None
+            return (numeric[start:start + self.chunksize] for start in range(0, len(numeric), self.chunksize))
+        # One-shot iterables are converted a chunk at a time, never as a whole.
+        return (_as_numeric(chunk) for chunk in self._chunks())
+
+    def _chunks(self):
+        if isinstance(self.source, (list, tuple, range)):
+            for start in range(0, len(self.source), self.chunksize):
+                yield self.source[start:start + self.chunksize]
+        else:
+            iterator = iter(self.source)
+            while True:
+                chunk = list(itertools.islice(iterator, self.chunksize))
+                if not chunk:
+                    return
+                yield chunk
+
+    def _run(self, sink, key=None, value=None, workers=None, chunks=None):
+        if chunks is None and sink in ("append", "key", "items"):
+            chunks = self._numeric_chunks()
+        vectorize = chunks is not None
+        if not vectorize:
+            chunks = self._chunks()
+        else:
+            # The first chunk decides, in this process: if the stages do not
+            # vectorize there, it and every later chunk run per item.
+            first = next(chunks, None)
+            if first is None:
+                return
+            try:
+                head = _vector_collect(self.stages, first, sink, key, value)
+            except _NotVectorizable:
+                vectorize = False
+                head = _collect(self.stages, _as_array(first), sink, key, value, False)
+            yield head
+        jobs = ((self.stages, chunk, sink, key, value, vectorize) for chunk in chunks)
+        if not workers or workers <= 1:
+            yield from map(_collect_job, jobs)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = collections.deque()
+            for job in jobs:
+                pending.append(pool.submit(_collect_job, job))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def __iter__(self):
+        chunks = self._numeric_chunks()
+        if chunks is not None:
+            for chunk in self._run("append", chunks=chunks):
+                yield from chunk.tolist() if isinstance(chunk, np.ndarray) else chunk
+            return
+        kinds = tuple(kind for kind, _ in self.stages)
+        yield from _fuse(kinds, "yield")(self.source, tuple(fn for _, fn in self.stages), None, None, None)
+
+    def to_list(self, workers=None):
+        out = []
+        for chunk in self._run("append", workers=workers):
+            out.extend(chunk.tolist() if isinstance(chunk, np.ndarray) else chunk)
+        return out
+
+    def to_tuple(self, workers=None):
+        return tuple(self.to_list(workers))
+
+    def to_dict(self, key=None, value=None, workers=None):
+        """Collect into a dict: items are ``(key, value)`` pairs unless
+        ``key`` (and optionally ``value``) functions are given."""
+        out = {}
+        for chunk in self._run(_dict_sink(key, value), key, value, workers):
+            out.update(chunk)
+        return out
+
+    def to_array(self, dtype=None, workers=None):
+        chunks = [np.asarray(chunk, dtype=dtype) for chunk in self._run("append", workers=workers)]
+        if not chunks:
+            return np.empty(0, dtype=dtype or np.float64)
+        return np.concatenate(chunks)
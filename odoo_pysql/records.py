@@ -0,0 +1,427 @@
+"""Compact record classes and columnar record tables (Q6, Q9).
+
+``class Person: def __init__(self, name, age)`` keeps every instance's
+attributes in its own ``__dict__``: about 300 bytes of overhead per object
+before the values themselves, which adds up to gigabytes for a few million
+partner or employee records. Two smaller layouts:
+
+- :func:`record_class` generates a ``__slots__`` class (a slotted
+  dataclass, like the records of :class:`~odoo_pysql.jsonb.JsonRecordDecoder`):
+  same attribute syntax, no per-instance dict. Methods live on the class, so
+  Q6-style monkey patching of ``MyClass.original_method`` still works;
+  adding new instance attributes does not.
+- :class:`RecordTable` (and :class:`PersonTable` for ``name``/``age``)
+  stores one typed NumPy array per numeric field and strings as one packed
+  UTF-8 buffer with start/length arrays. Indexing returns a small row view
+  that reads (and writes) the arrays on attribute access; whole columns
+  come out as arrays for vectorized work, and :meth:`RecordTable.itertuples`
+  streams plain tuples for full scans.
+
+Tables are built in bulk from row tuples, DB-API cursors (``fetchmany``
+batches) or DataFrames, and grow geometrically when appended to.
+"""
+
+import dataclasses
+import itertools
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CAPACITY = 1024
+DEFAULT_GROWTH = 2.0
+DEFAULT_ARRAYSIZE = 10_000
+
+_ROW_TYPES = {}
+
+
+def record_class(name, fields, namespace=None, frozen=False):
+    """A ``__slots__`` dataclass with ``fields`` (names or ``(name, type)`` pairs).
+
+    ``namespace`` adds methods or class attributes, as for ``type()``.
+    """
+    specs = [(field, object) if isinstance(field, str) else tuple(field) for field in fields]
+    return dataclasses.make_dataclass(name, specs, namespace=namespace, slots=True, frozen=frozen)
+
+
+def _storage_dtype(kind):
+    if kind is str:
+        return None
+    if kind is int:
+        return np.dtype(np.int64)
+    if kind is float:
+        return np.dtype(np.float64)
+    if kind is bool:
+        return np.dtype(bool)
+    dtype = np.dtype(kind)
+    if dtype.kind not in "biuf":
+        raise ValueError("unsupported column type: %r" % (kind,))
+    return dtype
+
+
+def _checked(values, dtype):
+    # Array assignment casts unsafely; refuse values an integer column would
+    # silently truncate (30.7, NaN) or a narrow one (int16 ages) would wrap.
+    if dtype.kind in "iu" and values.dtype != dtype and values.size:
+        if values.dtype.kind == "f":
+            if not np.isfinite(values).all():
+                raise ValueError("NaN or infinite values in a %s column" % dtype)
+            if not np.array_equal(values, np.trunc(values)):
+                raise ValueError("non-integer values in a %s column" % dtype)
+        info = np.iinfo(dtype)
+        if values.min() < info.min or values.max() > info.max:
+            raise OverflowError("values out of range for %s" % dtype)
+    return values
+
+
+def _scalar(value, dtype):
+    """``value`` as the Python scalar a typed memoryview of ``dtype`` accepts.
+
+    Floats and NumPy scalars are accepted for integer fields when they hold
+    an integral value in range; anything else raises like :func:`_checked`.
+    """
+    if dtype.kind in "iu":
+        number = int(value)
+        if number != value:
+            raise ValueError("%r is not an integer" % (value,))
+        info = np.iinfo(dtype)
+        if not info.min <= number <= info.max:
+            raise OverflowError("%d out of range for %s" % (number, dtype))
+        return number
+    if dtype.kind == "f":
+        return float(value)
+    return bool(value)
+
+
+class _StringColumn:
+    """Strings packed into one UTF-8 buffer; ``None`` is stored as length -1.
+
+    Start/length pairs (rather than offsets) let a value be rewritten in
+    place of its slot: the new bytes go to the end of the buffer and the old
+    ones are only counted as ``garbage`` until :meth:`compact`.
+    """
+
+    def __init__(self, capacity):
+        self.data = bytearray()
+        self.garbage = 0
+        self.starts = np.zeros(capacity, dtype=np.int64)
+        self.lengths = np.zeros(capacity, dtype=np.int32)
+        self._refresh()
+
+    def _refresh(self):
+        self._starts = memoryview(self.starts)
+        self._lengths = memoryview(self.lengths)
+
+    @property
+    def nbytes(self):
+        return len(self.data) + self.starts.nbytes + self.lengths.nbytes
+
+    def reserve(self, capacity, length):
+        for attr in ("starts", "lengths"):
+            old = getattr(self, attr)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:length] = old[:length]
+            setattr(self, attr, new)
+        self._refresh()
+
+    def get(self, i):
+        n = self._lengths[i]
+        if n < 0:
+            return None
+        start = self._starts[i]
+        return self.data[start:start + n].decode()
+
+    def set(self, i, value):
+        old = self._lengths[i]
+        if old > 0:
+            self.garbage += old
+        if value is None:
+            self._lengths[i] = -1
+            return
+        encoded = value.encode()
+        self._starts[i] = len(self.data)
+        self._lengths[i] = len(encoded)
+        self.data += encoded
+
+    def put(self, at, values):
+        """Write ``values`` (str or None) to slots ``at .. at + len(values)``."""
+        encoded = [None if v is None else (v if type(v) is str else str(v)).encode() for v in values]
+        lengths = np.fromiter((-1 if e is None else len(e) for e in encoded),
+                              dtype=np.int64, count=len(encoded))
+        sizes = np.maximum(lengths, 0)
+        stop = at + len(encoded)
+        self.starts[at:stop] = len(self.data) + np.cumsum(sizes) - sizes
+        self.lengths[at:stop] = lengths
+        self.data += b"".join(e for e in encoded if e is not None)
+
+    def values(self, start, stop):
+        """Decoded values of slots ``start .. stop`` as a list."""
+        starts = self.starts[start:stop]
+        lengths = self.lengths[start:stop]
+        if len(starts) and lengths.min() >= 0:
+            ends = starts + lengths
+            if (starts[1:] == ends[:-1]).all():
+                # Contiguous run (as written by bulk loads): ASCII text can be
+                # decoded once and sliced by byte offsets.
+                lo = int(starts[0])
+                segment = bytes(self.data[lo:int(ends[-1])])
+                if segment.isascii():
+                    text = segment.decode("ascii")
+                    return [text[a:b] for a, b in zip((starts - lo).tolist(), (ends - lo).tolist())]
+        get = self.get
+        return [get(i) for i in range(start, stop)]
+
+    def to_array(self, length):
+        out = np.empty(length, dtype=object)
+        out[:] = self.values(0, length)
+        return out
+
+    def compact(self, length):
+        """Rewrite the buffer without the bytes of overwritten values."""
+        values = self.values(0, length)
+        self.data = bytearray()
+        self.garbage = 0
+        self.put(0, values)
+
+
+def _row_type(fields, kinds):
+    key = (fields, tuple(kind is str for kind in kinds))
+    row_type = _ROW_TYPES.get(key)
+    if row_type is not None:
+        return row_type
+
+    def numeric(j):
+        def get(self):
+            return self._table._views[j][self._index]
+
+        def set_(self, value):
+            table = self._table
+            table._views[j][self._index] = _scalar(value, table._dtypes[j])
+        return property(get, set_)
+
+    def text(j):
+        def get(self):
+            return self._table._columns[j].get(self._index)
+
+        def set_(self, value):
+            self._table._columns[j].set(self._index, value)
+        return property(get, set_)
+
+    namespace = {"__slots__": ("_table", "_index"), "_fields": fields}
+    for j, (field, kind) in enumerate(zip(fields, kinds)):
+        namespace[field] = text(j) if kind is str else numeric(j)
+    row_type = _ROW_TYPES[key] = type("RowView", (_RowView,), namespace)
+    return row_type
+
+
+class _RowView:
+    __slots__ = ()
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self._table).__name__.replace("Table", "") or "Row",
+                           ", ".join("%s=%r" % item for item in self._asdict().items()))
+
+    def __eq__(self, other):
+        if isinstance(other, _RowView):
+            return self._fields == other._fields and tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __iter__(self):
+        return (getattr(self, field) for field in self._fields)
+
+    def _asdict(self):
+        return {field: getattr(self, field) for field in self._fields}
+
+
+class RecordTable:
+    """Columnar storage for records with a fixed ``schema``.
+
+    ``schema`` maps field names to ``str``, ``int``, ``float``, ``bool`` or a
+    NumPy integer/float dtype (e.g. ``np.int16`` for ages), in field order;
+    subclasses may set it as a class attribute. ``table[i]`` is a row view
+    with one attribute per field; ``table.column(name)`` is the whole column.
+    Numeric fields cannot hold None (use a float field and NaN).
+    """
+
+    schema = None
+
+    def __init__(self, schema=None, capacity=DEFAULT_CAPACITY, growth=DEFAULT_GROWTH):
+        if growth <= 1:
+            raise ValueError("growth must be greater than 1")
+        schema = dict(schema if schema is not None else self.schema or {})
+        if not schema:
+            raise ValueError("a schema is required")
+        self.schema = schema
+        self.fields = tuple(schema)
+        self.growth = growth
+        self.capacity = max(capacity, 1)
+        self._length = 0
+        self._dtypes = [_storage_dtype(kind) for kind in schema.values()]
+        self._columns = [_StringColumn(self.capacity) if dtype is None else np.zeros(self.capacity, dtype=dtype)
+                         for dtype in self._dtypes]
+        self._refresh()
+        self._row = _row_type(self.fields, tuple(schema.values()))
+
+    def _refresh(self):
+        self._views = [None if dtype is None else memoryview(column)
+                       for dtype, column in zip(self._dtypes, self._columns)]
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def nbytes(self):
+        """Bytes held by the columns (capacity of the numeric arrays, not length)."""
+        return sum(column.nbytes for column in self._columns)
+
+    def _reserve(self, extra):
+        needed = self._length + extra
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, int(self.capacity * self.growth))
+        for j, (dtype, column) in enumerate(zip(self._dtypes, self._columns)):
+            if dtype is None:
+                column.reserve(capacity, self._length)
+            else:
+                new = np.zeros(capacity, dtype=dtype)
+                new[:self._length] = column[:self._length]
+                self._columns[j] = new
+        self.capacity = capacity
+        self._refresh()
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("row index out of range")
+        return self._row(self, index)
+
+    def __iter__(self):
+        return map(self._row, itertools.repeat(self, self._length), range(self._length))
+
+    def itertuples(self, chunksize=DEFAULT_ARRAYSIZE):
+        """Plain value tuples in field order, decoded ``chunksize`` rows at a time.
+
+        Much cheaper than row views when every row is read once.
+        """
+        for start in range(0, self._length, chunksize):
+            stop = min(start + chunksize, self._length)
+            columns = []
+            for dtype, column in zip(self._dtypes, self._columns):
+                if dtype is None:
+                    columns.append(column.values(start, stop))
+                else:
+                    columns.append(column[start:stop].tolist())
+            yield from zip(*columns)
+
+    def append(self, *values, **fields):
+        """Add one record (positional in field order, or by field name)."""
+        if fields:
+            values = values + tuple(fields[field] for field in self.fields[len(values):])
+        if len(values) != len(self.fields):
+            raise TypeError("expected %d values, got %d" % (len(self.fields), len(values)))
+        # Convert first, so a rejected value leaves no partial row behind.
+        values = [value if dtype is None else _scalar(value, dtype) for dtype, value in zip(self._dtypes, values)]
+        self._reserve(1)
+        for j, (dtype, value) in enumerate(zip(self._dtypes, values)):
+            if dtype is None:
+                self._columns[j].set(self._length, value)
+            else:
+                self._views[j][self._length] = value
+        self._length += 1
+        return self._row(self, self._length - 1)
+
+    def extend_columns(self, columns):
+        """Append whole columns, ``{field: sequence}`` or sequences in field order."""
+        if isinstance(columns, dict):
+            columns = [columns[field] for field in self.fields]
+        columns = list(columns)
+        if len(columns) != len(self.fields):
+            raise TypeError("expected %d columns, got %d" % (len(self.fields), len(columns)))
+        count = len(columns[0]) if columns else 0
+        if any(len(column) != count for column in columns):
+            raise ValueError("columns have different lengths")
+        # Check every numeric column before writing any, so a rejected batch
+        # leaves no partial rows behind.
+        columns = [values if dtype is None else _checked(np.asarray(values), dtype)
+                   for dtype, values in zip(self._dtypes, columns)]
+        self._reserve(count)
+        start = self._length
+        for j, (dtype, values) in enumerate(zip(self._dtypes, columns)):
+            if dtype is None:
+                if isinstance(values, (pd.Series, np.ndarray)):
+                    values = [None if v is None or v is pd.NA or v != v else str(v) for v in values.tolist()]
+                self._columns[j].put(start, values)
+            else:
+                self._columns[j][start:start + count] = values
+        self._length += count
+
+    def extend(self, rows):
+        """Append row tuples in field order."""
+        rows = rows if isinstance(rows, list) else list(rows)
+        if rows:
+            self.extend_columns(list(zip(*rows)))
+
+    @classmethod
+    def from_rows(cls, rows, schema=None):
+        rows = rows if isinstance(rows, list) else list(rows)
+        table = cls(schema, capacity=len(rows) or DEFAULT_CAPACITY)
+        table.extend(rows)
+        return table
+
+    @classmethod
+    def from_cursor(cls, cursor, schema=None, arraysize=DEFAULT_ARRAYSIZE):
+        """Load an executed DB-API cursor, ``arraysize`` rows per ``fetchmany``.
+
+        Result columns are matched to fields by name (``cursor.description``).
+        """
+        table = cls(schema)
+        names = [d[0] for d in cursor.description]
+        missing = [field for field in table.fields if field not in names]
+        if missing:
+            raise ValueError("cursor has no column for %s" % ", ".join(missing))
+        positions = [names.index(field) for field in table.fields]
+        while True:
+            rows = cursor.fetchmany(arraysize)
+            if not rows:
+                return table
+            columns = list(zip(*rows))
+            table.extend_columns([columns[p] for p in positions])
+
+    @classmethod
+    def from_frame(cls, frame, schema=None):
+        """Load the schema's columns from a DataFrame (vectorized per column)."""
+        table = cls(schema, capacity=len(frame) or DEFAULT_CAPACITY)
+        table.extend_columns([frame[field] for field in table.fields])
+        return table
+
+    def column(self, field):
+        """The column as an array: a view for numeric fields, decoded objects for strings."""
+        j = self.fields.index(field)
+        if self._dtypes[j] is None:
+            return self._columns[j].to_array(self._length)
+        return self._columns[j][:self._length]
+
+    def to_frame(self):
+        return pd.DataFrame({field: self.column(field) for field in self.fields})
+
+    def records(self, record_type=None):
+        """Materialise every row as ``record_type`` (a slotted class by default)."""
+        record_type = record_type or record_class(type(self).__name__.replace("Table", "") or "Record",
+                                                  list(self.schema.items()))
+        return [record_type(*values) for values in zip(*(self.column(field).tolist() for field in self.fields))]
+
+    def compact(self):
+        """Drop the bytes left behind by rewritten string values."""
+        for column in self._columns:
+            if isinstance(column, _StringColumn) and column.garbage:
+                column.compact(self._length)
+
+
+class PersonTable(RecordTable):
+    """The Q9 ``Person(name, age)`` as a table: UTF-8 names, ``int16`` ages."""
+
+    schema = {"name": str, "age": np.int16}
@@ -0,0 +1,286 @@
+"""Bulk string replacement with many rules per record (Q1).
+
+``"Hello World".replace(' ', '-')`` is fine for one rule on one string. For
+many rules over millions of product names or partner references, chaining
+``.replace()`` calls rescans every record once per rule and lets earlier
+replacements feed later ones. :class:`ReplacementRules` compiles the rule
+set once and rewrites each record in a single left-to-right pass:
+
+- single-character rules go into a ``str.translate`` table;
+- multi-character rules go into an Aho-Corasick automaton, matched
+  leftmost-longest (so ``"Co."`` beats ``"C"`` at the same position).
+
+All rules apply simultaneously to the original text: replacement output is
+never rescanned.
+
+The automaton is also used at compile time to check whether any two
+multi-character patterns can partially overlap (a proper suffix of one is a
+proper prefix of another). When none can, leftmost-longest matching is the
+same as replacing the longest patterns first, so a whole chunk of records is
+joined and rewritten in C: every pattern (longest first) is swapped for a
+private-use placeholder character with ``str.replace``, then the
+placeholders are expanded. That costs two C-level passes per rule, so it is
+only used up to ``BULK_MAX_RULES`` rules; larger or overlapping rule sets use
+the per-character automaton scan, whose cost does not depend on the number
+of rules.
+"""
+
+import collections
+import mmap
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 10_000
+BULK_MAX_RULES = 64
+
+# Placeholders come from the BMP Private Use Area (keeping strings at two
+# bytes per character), the record separator is a Unicode noncharacter;
+# neither turns up in business text.
+_PLACEHOLDER_BASE = 0xE000
+_PLACEHOLDER_RE = re.compile("[\uE000-\uF8FF]")
+_SEPARATOR = "\uFDD0"
+
+
+class _Automaton:
+    """Aho-Corasick automaton compiled to a DFA (one dict of moves per state)."""
+
+    def __init__(self, patterns):
+        goto = [{}]
+        depth = [0]
+        terminal = [None]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    depth.append(depth[state] + 1)
+                    terminal.append(None)
+                state = nxt
+            terminal[state] = index
+
+        fail = [0] * len(goto)
+        # outputs[s]: lengths of every pattern ending at state s, longest first.
+        outputs = [[] for _ in goto]
+        moves = [dict() for _ in goto]
+        queue = collections.deque()
+        for ch, nxt in goto[0].items():
+            moves[0][ch] = nxt
+            queue.append(nxt)
+        for state in range(len(goto)):
+            if terminal[state] is not None:
+                outputs[state].append(depth[state])
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + [
+                length for length in outputs[fail[state]] if length not in outputs[state]
+            ]
+            # Inherit the failure state's moves, then override with our own.
+            moves[state] = dict(moves[fail[state]])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = moves[fail[state]].get(ch, 0) if state else 0
+                moves[state][ch] = nxt
+                queue.append(nxt)
+        self.moves = moves
+        self.outputs = outputs
+        self.has_partial_overlap = any(
+            goto[f] for state in range(len(goto)) if terminal[state] is not None
+            for f in _fail_chain(fail, state)
+        )
+
+    def longest_matches(self, text):
+        """Return ``{start: length}`` of the longest pattern starting at each match start."""
+        moves = self.moves
+        outputs = self.outputs
+        state = 0
+        best = {}
+        for end, ch in enumerate(text, 1):
+            state = moves[state].get(ch, 0)
+            if outputs[state]:
+                for length in outputs[state]:
+                    start = end - length
+                    if best.get(start, 0) < length:
+                        best[start] = length
+        return best
+
+
+def _fail_chain(fail, state):
+    state = fail[state]
+    while state:
+        yield state
+        state = fail[state]
+
+
+class ReplacementRules:
+    """A compiled set of ``{pattern: replacement}`` rules."""
+
+    def __init__(self, rules):
+        rules = dict(rules)
+        if any(not pattern for pattern in rules):
+            raise ValueError("replacement patterns must be non-empty strings")
+        self.rules = rules
+        single = {p: r for p, r in rules.items() if len(p) == 1}
+        self._table = str.maketrans(single)
+        # Longest first: with no partial overlaps this is leftmost-longest.
+        multi = sorted((p for p in rules if len(p) > 1), key=len, reverse=True)
+        self._automaton = _Automaton(multi) if multi else None
+        # Characters that can start a multi-character match: records without
+        # any of them skip the automaton and go straight to str.translate.
+        self._first_chars = frozenset(p[0] for p in multi)
+        self.bulk = (
+            len(rules) <= BULK_MAX_RULES
+            and not (self._automaton is not None and self._automaton.has_partial_overlap)
+            and not any(_PLACEHOLDER_RE.search(p + r) or _SEPARATOR in p + r for p, r in rules.items())
+        )
+        ordered = multi + list(single)
+        placeholders = [chr(_PLACEHOLDER_BASE + i) for i in range(len(ordered))]
+        self._hide = list(zip(ordered, placeholders))
+        self._expand = [(ph, rules[p]) for p, ph in self._hide]
+
+    def __getstate__(self):
+        return {"rules": self.rules}
+
+    def __setstate__(self, state):
+        self.__init__(state["rules"])
+
+    def apply(self, text):
+        """Return ``text`` with every rule applied in one pass."""
+        if self._automaton is None or self._first_chars.isdisjoint(text):
+            return text.translate(self._table)
+        if self.bulk and not _PLACEHOLDER_RE.search(text):
+            return self._bulk_apply(text)
+        return self._scan_apply(text)
+
+    def _bulk_apply(self, text):
+        for pattern, placeholder in self._hide:
+            text = text.replace(pattern, placeholder)
+        for placeholder, replacement in self._expand:
+            text = text.replace(placeholder, replacement)
+        return text
+
+    def _scan_apply(self, text):
+        best = self._automaton.longest_matches(text)
+        if not best:
+            return text.translate(self._table)
+        table = self._table
+        rules = self.rules
+        parts = []
+        position = 0
+        for start in sorted(best):
+            if start < position:
+                continue
+            length = best[start]
+            parts.append(text[position:start].translate(table))
+            parts.append(rules[text[start:start + length]])
+            position = start + length
+        parts.append(text[position:].translate(table))
+        return "".join(parts)
+
+    def _apply_chunk(self, records):
+        if self.bulk:
+            strings = [r for r in records if isinstance(r, str)]
+            joined = _SEPARATOR.join(strings)
+            if not _PLACEHOLDER_RE.search(joined) and joined.count(_SEPARATOR) == max(len(strings) - 1, 0):
+                # One pass over the whole chunk; the separator matches no rule.
+                done = iter(self._bulk_apply(joined).split(_SEPARATOR) if strings else ())
+                return [next(done) if isinstance(r, str) else r for r in records]
+        apply = self.apply
+        return [apply(r) if isinstance(r, str) else r for r in records]
+
+    def apply_many(self, records, workers=None, chunksize=DEFAULT_CHUNKSIZE):
+        """Apply the rules to a list/iterable of strings (non-strings pass through).
+
+        With ``workers`` > 1 chunks of ``chunksize`` records are processed on
+        a process pool; the compiled rules are sent to each worker once.
+        """
+        records = list(records)
+        if not workers or workers <= 1 or len(records) <= chunksize:
+            return self._apply_chunk(records)
+        chunks = [records[i:i + chunksize] for i in range(0, len(records), chunksize)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self,)) as pool:
+            results = pool.map(_apply_worker_chunk, chunks)
+            return [r for chunk in results for r in chunk]
+
+    def apply_series(self, series, workers=None, chunksize=DEFAULT_CHUNKSIZE):
+        """Apply the rules to a pandas Series, keeping its index and name."""
+        values = self.apply_many(series.tolist(), workers=workers, chunksize=chunksize)
+        return pd.Series(values, index=series.index, name=series.name, dtype=series.dtype)
+
+    def apply_file(self, src, dst, workers=None, encoding="utf-8"):
+        """Rewrite a line-oriented text file, memory-mapping the input.
+
+        With ``workers`` > 1 the file is split at line boundaries into one
+        byte range per worker; each worker writes its own part file and the
+        parts are concatenated into ``dst``.
+        """
+        size = os.path.getsize(src)
+        if size == 0:
+            open(dst, "wb").close()
+            return
+        if not workers or workers <= 1:
+            _rewrite_range(self, src, dst, 0, size, encoding)
+            return
+        bounds = _line_ranges(src, size, workers)
+        part_dir = tempfile.mkdtemp(prefix="replace_parts_")
+        try:
+            parts = [os.path.join(part_dir, "part_%d" % i) for i in range(len(bounds))]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_rewrite_range, self, src, part, start, stop, encoding)
+                    for part, (start, stop) in zip(parts, bounds)
+                ]
+                for future in futures:
+                    future.result()
+            with open(dst, "wb") as out:
+                for part in parts:
+                    with open(part, "rb") as handle:
+                        shutil.copyfileobj(handle, out)
+        finally:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+
+_worker_rules = None
+
+
+def _init_worker(rules):
+    global _worker_rules
+    _worker_rules = rules
+
+
+def _apply_worker_chunk(records):
+    return _worker_rules._apply_chunk(records)
+
+
+def _line_ranges(path, size, parts):
+    """Split ``path`` into up to ``parts`` byte ranges that end on newlines."""
+    step = max(1, size // parts)
+    bounds = []
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            stop = mm.find(b"\n", min(start + step, size) - 1)
+            stop = size if stop < 0 else stop + 1
+            bounds.append((start, stop))
+            start = stop
+    return bounds
+
+
+def _rewrite_range(rules, src, dst, start, stop, encoding):
+    with open(src, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            open(dst, "w", encoding=encoding, newline="") as out:
+        mm.seek(start)
+        lines = []
+        while mm.tell() < stop:
+            lines.append(mm.readline().decode(encoding))
+            if len(lines) == DEFAULT_CHUNKSIZE:
+                out.write("".join(rules._apply_chunk(lines)))
+                lines = []
+        out.write("".join(rules._apply_chunk(lines)))
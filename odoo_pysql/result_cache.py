@@ -0,0 +1,310 @@
+"""Query-result cache with table-level invalidation (Q13, Q17).
+
+Dashboards re-run ``SELECT AVG(amount), MAX(amount), MIN(amount) FROM
+order_details`` and the orders/customers join on every refresh although the
+tables rarely change between two refreshes. :class:`ResultCache` keeps
+their results in memory:
+
+- entries are keyed by the normalized SQL text (comments and whitespace
+  removed, keywords lower-cased) plus the parameters;
+- each entry records the tables it reads, and a write to any of them drops
+  exactly the entries that depend on it;
+- the cache is bounded by entry count and by estimated size in bytes,
+  evicting least-recently-used entries first;
+- ``stats`` counts hits, misses, evictions and invalidations.
+
+Writes are signalled by :meth:`ResultCache.execute_write`, by PostgreSQL
+``LISTEN/NOTIFY`` (:func:`notify_trigger_sql` installs a statement-level
+trigger that notifies after each write) or, as a local stand-in, by SQLite
+triggers calling back into Python (:meth:`ResultCache.attach_sqlite`).
+
+A per-table version counter guards against a write that lands while a
+query is running: such a result is returned but not stored.
+"""
+
+import collections
+import re
+import sys
+
+from ._sql import check_identifier
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_CHANNEL = "result_cache"
+
+_TOKEN = re.compile(
+    r"""(?P<string>'(?:[^']|'')*')"""
+    r"""|(?P<quoted>"(?:[^"]|"")*")"""
+    r"""|(?P<comment>--[^\n]*|/\*.*?\*/)"""
+    r"""|(?P<space>\s+)"""
+    r"""|(?P<word>[^\s'"]+?(?=\s|'|"|--|/\*|$))""",
+    re.S,
+)
+_NAME = r"(?:\"[^\"]+\"|[a-z_][\w$]*)"
+_TABLE_REF = re.compile(r"\b(?:from|join|update|into)\s+(%s(?:\.%s)?)" % (_NAME, _NAME))
+_FROM_LIST = re.compile(
+    r"\bfrom\s+(.+?)"
+    r"(?=\b(?:where|group|order|limit|join|on|having|union|except|intersect|window)\b|\)|$)"
+)
+_CTE_NAME = re.compile(r"(?:\bwith(?:\s+recursive)?|,)\s+([a-z_][\w$]*)\s+as\s*(?:not\s+)?(?:materialized\s*)?\(")
+_WRITE = re.compile(r"^\s*(?:with\b.*?\)\s*)?(insert|update|delete|truncate|merge)\b", re.S)
+
+Entry = collections.namedtuple("Entry", "rows tables size")
+
+
+def normalize_sql(sql):
+    """Canonical form of ``sql`` for cache keys.
+
+    Comments go, runs of whitespace become one space, and everything
+    outside string literals and quoted identifiers is lower-cased.
+    """
+    parts = []
+    for match in _TOKEN.finditer(sql.strip().rstrip(";")):
+        kind = match.lastgroup
+        if kind in ("comment", "space"):
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+        elif kind == "word":
+            parts.append(match.group().lower())
+        else:
+            parts.append(match.group())
+    return "".join(parts).strip()
+
+
+def _table_key(name):
+    # Dependencies are tracked by bare table name, which is what
+    # TG_TABLE_NAME and SQLite triggers report.
+    name = name.rsplit(".", 1)[-1]
+    return name[1:-1] if name.startswith('"') else name.lower()
+
+
+def _segment_tables(text, tables):
+    tables.update(_table_key(m) for m in _TABLE_REF.findall(text))
+    for from_list in _FROM_LIST.findall(text):
+        for item in from_list.split(","):
+            words = item.split()
+            if words and re.match(r'^[a-z_"]', words[0]):
+                tables.add(_table_key(words[0]))
+
+
+def referenced_tables(sql):
+    """Best-effort set of tables read or written by ``sql`` (CTE names excluded)."""
+    text = normalize_sql(sql)
+    # Blank out literals so their contents cannot look like table names.
+    text = re.sub(r"'(?:[^']|'')*'", "''", text)
+    ctes = set(_CTE_NAME.findall(text))
+    tables = set()
+    # Innermost parentheses first: each subquery is read on its own, then
+    # collapsed to "()" so the enclosing FROM list stays one segment.
+    innermost = re.compile(r"\(([^()]*)\)")
+    while True:
+        match = innermost.search(text)
+        if match is None:
+            break
+        _segment_tables(match.group(1), tables)
+        text = text[:match.start()] + "[]" + text[match.end():]
+    _segment_tables(text, tables)
+    return frozenset(t for t in tables if t not in ctes and t not in ("select", "lateral"))
+
+
+def _estimate_size(rows):
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row:
+            size += sys.getsizeof(value)
+    return size
+
+
+def notify_trigger_sql(table, channel=DEFAULT_CHANNEL):
+    """PostgreSQL function + statement-level trigger sending ``NOTIFY channel, 'table'``.
+
+    Notifications are delivered at commit, so listeners never invalidate
+    for a write that is rolled back or not yet visible.
+    """
+    table = check_identifier(table)
+    channel = check_identifier(channel)
+    trigger = "%s_%s" % (table.replace(".", "_"), channel)
+    return [
+        "CREATE OR REPLACE FUNCTION result_cache_notify() RETURNS trigger LANGUAGE plpgsql AS $$\n"
+        "BEGIN\n"
+        "    PERFORM pg_notify(TG_ARGV[0], TG_TABLE_NAME);\n"
+        "    RETURN NULL;\n"
+        "END $$",
+        "DROP TRIGGER IF EXISTS %s ON %s" % (trigger, table),
+        "CREATE TRIGGER %s AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %s\n"
+        "FOR EACH STATEMENT EXECUTE FUNCTION result_cache_notify('%s')" % (trigger, table, channel),
+    ]
+
+
+class ResultCache:
+    """LRU cache of query results bounded by ``max_entries`` and ``max_bytes``."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = collections.Counter()
+        self.nbytes = 0
+        self._entries = collections.OrderedDict()
+        self._dependents = collections.defaultdict(set)
+        self._versions = collections.Counter()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def hit_ratio(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    @staticmethod
+    def key(sql, params=()):
+        return normalize_sql(sql), tuple(params)
+
+    def get(self, sql, params=()):
+        """Cached rows for ``sql``/``params`` as a tuple, or None (counted as hit or miss).
+
+        The tuple is shared by every hit, so callers cannot change what
+        later hits see by adding or removing rows.
+        """
+        key = self.key(sql, params)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry.rows
+
+    def versions(self, tables):
+        """Snapshot of the tables' write counters, to pass back to :meth:`put`."""
+        return tuple(self._versions[t] for t in sorted(tables))
+
+    def put(self, sql, params, rows, tables=None, versions=None):
+        """Store ``rows``; skipped when a dependency was written since ``versions``."""
+        tables = frozenset(_table_key(t) for t in tables) if tables is not None else referenced_tables(sql)
+        if versions is not None and versions != self.versions(tables):
+            self.stats["stale_skipped"] += 1
+            return False
+        rows = tuple(rows)
+        size = _estimate_size(rows)
+        if size > self.max_bytes:
+            self.stats["too_large"] += 1
+            return False
+        key = self.key(sql, params)
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = Entry(rows, tables, size)
+        self.nbytes += size
+        for table in tables:
+            self._dependents[table].add(key)
+        while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+        return True
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self.nbytes -= entry.size
+        for table in entry.tables:
+            dependents = self._dependents.get(table)
+            if dependents is not None:
+                dependents.discard(key)
+                if not dependents:
+                    del self._dependents[table]
+
+    def invalidate(self, *tables):
+        """Drop every entry reading any of ``tables``; returns how many went."""
+        dropped = 0
+        for table in tables:
+            table = _table_key(table)
+            self._versions[table] += 1
+            for key in list(self._dependents.get(table, ())):
+                self._drop(key)
+                dropped += 1
+        self.stats["invalidations"] += dropped
+        return dropped
+
+    def clear(self):
+        self._entries.clear()
+        self._dependents.clear()
+        self.nbytes = 0
+
+    def fetch(self, connection, sql, params=(), tables=None):
+        """Read-through: cached rows, or run the query on a DB-API connection and cache it.
+
+        Rows come back as a tuple either way.
+        """
+        rows = self.get(sql, params)
+        if rows is not None:
+            return rows
+        deps = frozenset(_table_key(t) for t in tables) if tables is not None else referenced_tables(sql)
+        versions = self.versions(deps)
+        cur = connection.cursor()
+        try:
+            cur.execute(sql, params)
+            rows = tuple(cur.fetchall())
+        finally:
+            cur.close()
+        self.put(sql, params, rows, deps, versions)
+        return rows
+
+    def execute_write(self, connection, sql, params=(), tables=None, commit=True):
+        """Run a write statement and invalidate the tables it touches."""
+        if tables is None:
+            if not _WRITE.match(normalize_sql(sql)):
+                raise ValueError("not a write statement; pass tables= explicitly")
+            tables = referenced_tables(sql)
+        cur = connection.cursor()
+        try:
+            cur.execute(sql, params)
+            rowcount = cur.rowcount
+        finally:
+            cur.close()
+        # Before the commit, for readers of this connection; after it, so
+        # nothing cached in between (from the old snapshot) survives.
+        self.invalidate(*tables)
+        if commit:
+            connection.commit()
+            self.invalidate(*tables)
+        return rowcount
+
+    def listen(self, connection, channel=DEFAULT_CHANNEL):
+        """``LISTEN`` on a PostgreSQL connection in autocommit mode."""
+        cur = connection.cursor()
+        try:
+            cur.execute("LISTEN %s" % check_identifier(channel))
+        finally:
+            cur.close()
+
+    def drain_notifications(self, connection):
+        """Apply pending psycopg2 ``NOTIFY`` payloads (table names); returns the count.
+
+        Call it before serving from the cache, or from an event loop when
+        the connection's socket becomes readable.
+        """
+        connection.poll()
+        count = 0
+        while connection.notifies:
+            self.invalidate(connection.notifies.pop(0).payload)
+            count += 1
+        return count
+
+    def attach_sqlite(self, connection, tables):
+        """Local stand-in for NOTIFY: SQLite triggers that invalidate in-process.
+
+        Invalidation happens when the row is written rather than at commit,
+        and only for writes made through SQLite connections that have this
+        hook registered.
+        """
+        connection.create_function("result_cache_invalidate", 1, self.invalidate)
+        for table in tables:
+            table = check_identifier(table)
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                connection.execute(
+                    "CREATE TEMP TRIGGER IF NOT EXISTS %s_result_cache_%s AFTER %s ON %s "
+                    "BEGIN SELECT result_cache_invalidate('%s'); END"
+                    % (table.replace(".", "_"), event.lower(), event, table, _table_key(table)))
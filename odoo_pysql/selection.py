@@ -0,0 +1,254 @@
+"""Nth-distinct-largest and top-k selection without a full sort (Q14).
+
+``SELECT DISTINCT salary FROM employees ORDER BY salary DESC LIMIT 1
+OFFSET 1`` sorts and deduplicates the whole table to return one value; the
+pandas equivalent (``sort_values().unique()[-2]``) does the same in memory.
+This module selects instead:
+
+- :func:`nth_largest_distinct` takes the running maximum below the
+  previous answer, one O(n) pass per rank, for small ``n``; for larger
+  ``n`` it partitions out the top candidates with ``numpy.partition`` and
+  only deduplicates those (doubling the candidate count when ties eat
+  into them). Plain Python iterables use a bounded heap.
+- :func:`nth_largest_distinct_by` does the same per group (department);
+  for larger ``n`` a strided sample bounds each group's answer from below
+  and only the rows above that bound are sorted.
+- :func:`top_k` returns the ``k`` largest values or their positions.
+- :func:`nth_highest_sql` emits index-friendly SQL: nested ``MAX(...) WHERE
+  salary < (SELECT MAX(...))`` probes, a recursive skip scan for larger
+  ``n``, or ``DENSE_RANK()`` per partition over a matching index.
+
+NaN/None values are ignored and a missing answer is ``None``, as in SQL.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from ._sql import DIALECT_PARAMSTYLES, check_dialect, check_identifier, placeholder
+
+# Up to this many ranks, repeated masked max passes beat partitioning.
+MAX_PASSES = 4
+# Beyond that, every SAMPLE_STRIDE-th row bounds each group's answer first.
+SAMPLE_STRIDE = 64
+# Up to this many ranks the SQL generator nests MAX() subqueries.
+MAX_NESTED = 3
+
+
+def _as_numeric_array(values):
+    array = np.asarray(values)
+    if array.dtype == object:
+        array = pd.to_numeric(pd.Series(array), errors="coerce").to_numpy(dtype=np.float64)
+    return array
+
+
+def _as_float_array(values):
+    array = _as_numeric_array(values)
+    if array.dtype.kind == "f":
+        array = array[~np.isnan(array)]
+    return array
+
+
+def _is_missing(value):
+    return value is None or value is pd.NA or value != value
+
+
+def _nth_distinct_iterable(values, n):
+    heap = []
+    members = set()
+    for value in values:
+        if _is_missing(value) or value in members:
+            continue
+        if len(heap) < n:
+            heapq.heappush(heap, value)
+            members.add(value)
+        elif value > heap[0]:
+            members.discard(heapq.heapreplace(heap, value))
+            members.add(value)
+    return heap[0] if len(heap) == n else None
+
+
+def nth_largest_distinct(values, n=2):
+    """The ``n``-th largest distinct value of ``values`` (``None`` if fewer).
+
+    NumPy arrays and pandas Series are handled with array passes; any other
+    iterable is streamed through a heap of ``n`` values.
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    if not isinstance(values, (np.ndarray, pd.Series, pd.Index)):
+        return _nth_distinct_iterable(values, n)
+    array = _as_float_array(values)
+    if not len(array):
+        return None
+    if n <= MAX_PASSES:
+        # max() where value < previous answer: one read of the array per rank.
+        current = array.max()
+        floor = array.min()
+        for _ in range(n - 1):
+            below = array < current
+            if not below.any():
+                return None
+            current = np.max(array, where=below, initial=floor)
+        return current.item()
+    candidates = n
+    while True:
+        if candidates >= len(array):
+            distinct = np.unique(array)
+            return distinct[-n].item() if len(distinct) >= n else None
+        top = np.partition(array, len(array) - candidates)[len(array) - candidates:]
+        distinct = np.unique(top)
+        if len(distinct) >= n:
+            return distinct[-n].item()
+        candidates *= 4
+
+
+def _grouped_nth_sorted(values, codes, groups, n):
+    # Dense rank inside each group: sort by value (descending), then stably
+    # by group, and count value changes from each group's start.
+    order = np.argsort(-values)
+    order = order[np.argsort(codes[order], kind="stable")]
+    sorted_codes = codes[order]
+    sorted_values = values[order]
+    new_group = np.concatenate([[True], sorted_codes[1:] != sorted_codes[:-1]])
+    new_value = new_group | np.concatenate([[True], sorted_values[1:] != sorted_values[:-1]])
+    rank = np.cumsum(new_value)
+    rank -= np.maximum.accumulate(np.where(new_group, rank - 1, 0))
+    hit = new_value & (rank == n)
+    result = np.full(groups, np.nan)
+    result[sorted_codes[hit]] = sorted_values[hit]
+    return result
+
+
+def nth_largest_distinct_by(values, keys, n=2):
+    """Per-group ``n``-th largest distinct value, as a Series indexed by group.
+
+    Groups with fewer than ``n`` distinct values get NaN.
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    values = np.asarray(values, dtype=np.float64)
+    codes, uniques = pd.factorize(np.asarray(keys), sort=True)
+    valid = ~np.isnan(values) & (codes >= 0)
+    values = values[valid]
+    codes = codes[valid]
+    groups = len(uniques)
+    if n <= MAX_PASSES:
+        current = np.full(groups, -np.inf)
+        np.maximum.at(current, codes, values)
+        for _ in range(n - 1):
+            below = values < current[codes]
+            nxt = np.full(groups, -np.inf)
+            np.maximum.at(nxt, codes[below], values[below])
+            current = nxt
+        result = np.where(np.isinf(current), np.nan, current)
+    else:
+        # A subset's n-th distinct value never exceeds the full set's, so a
+        # strided sample gives a per-group floor; only rows at or above it
+        # are sorted.
+        if len(values) > SAMPLE_STRIDE * groups * n:
+            floor = _grouped_nth_sorted(values[::SAMPLE_STRIDE], codes[::SAMPLE_STRIDE], groups, n)
+            keep = ~(values < np.nan_to_num(floor, nan=-np.inf)[codes])
+            values = values[keep]
+            codes = codes[keep]
+        result = _grouped_nth_sorted(values, codes, groups, n)
+    return pd.Series(result, index=pd.Index(uniques, name=getattr(keys, "name", None)))
+
+
+def top_k(values, k, positions=False):
+    """The ``k`` largest values, largest first, in O(n + k log k).
+
+    With ``positions=True`` the indices into ``values`` are returned
+    instead. Missing values are skipped. Plain iterables use
+    ``heapq.nlargest``.
+    """
+    if not isinstance(values, (np.ndarray, pd.Series, pd.Index)):
+        pairs = ((v, i) for i, v in enumerate(values) if not _is_missing(v))
+        if positions:
+            return [i for _, i in heapq.nlargest(k, pairs)]
+        return heapq.nlargest(k, (v for v, _ in pairs))
+    array = _as_numeric_array(values)
+    kept = None
+    if array.dtype.kind == "f":
+        missing = np.isnan(array)
+        if missing.any():
+            # argpartition sorts NaN above every number.
+            kept = np.flatnonzero(~missing)
+            array = array[kept]
+    k = min(k, len(array))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp if positions else array.dtype)
+    part = np.argpartition(array, len(array) - k)[len(array) - k:]
+    part = part[np.argsort(array[part], kind="stable")[::-1]]
+    if not positions:
+        return array[part]
+    return part if kept is None else kept[part]
+
+
+def index_sql(table="employees", column="salary", partition_by=None):
+    """The B-tree index the generated queries probe."""
+    table = check_identifier(table)
+    columns = [check_identifier(partition_by)] if partition_by else []
+    columns.append(check_identifier(column))
+    return "CREATE INDEX IF NOT EXISTS %s_%s_idx ON %s (%s DESC)" % (
+        table.replace(".", "_"), "_".join(columns), table, ", ".join(columns))
+
+
+def nth_highest_sql(table="employees", column="salary", n=2, partition_by=None,
+                    style=None, dialect="postgresql"):
+    """Return ``(sql, params)`` for the ``n``-th highest distinct ``column``.
+
+    Without ``partition_by`` the styles are ``"max"`` (nested
+    ``MAX(...) WHERE column < (SELECT MAX(...))`` probes, default up to
+    ``MAX_NESTED``) and ``"skip"`` (a recursive CTE making one index probe
+    per rank, default above). With ``partition_by`` the styles are
+    ``"max"`` (the nested probes per distinct group, default up to
+    ``MAX_NESTED``) and ``"dense_rank"`` (one window pass, served in order
+    by :func:`index_sql`, default above).
+    """
+    if n < 1:
+        raise ValueError("n must be at least 1")
+    table = check_identifier(table)
+    column = check_identifier(column)
+    check_dialect(dialect)
+    mark = placeholder(DIALECT_PARAMSTYLES[dialect])
+    if partition_by is None:
+        style = style or ("max" if n <= MAX_NESTED else "skip")
+        if style == "max":
+            sql = "SELECT MAX(%s) FROM %s" % (column, table)
+            for _ in range(n - 1):
+                sql = "SELECT MAX(%s) FROM %s WHERE %s < (%s)" % (column, table, column, sql)
+            return sql, []
+        if style == "skip":
+            sql = (
+                "WITH RECURSIVE ranks (value, rank) AS (\n"
+                "    SELECT MAX({col}), 1 FROM {table}\n"
+                "    UNION ALL\n"
+                "    SELECT (SELECT MAX({col}) FROM {table} WHERE {col} < ranks.value), rank + 1\n"
+                "    FROM ranks WHERE rank < {mark} AND ranks.value IS NOT NULL\n"
+                ")\n"
+                "SELECT value FROM ranks WHERE rank = {mark}"
+            ).format(col=column, table=table, mark=mark)
+            return sql, [n, n]
+        raise ValueError("style must be 'max' or 'skip' without partition_by")
+    group = check_identifier(partition_by)
+    style = style or ("max" if n <= MAX_NESTED else "dense_rank")
+    if style == "max":
+        inner = "SELECT MAX(e.{col}) FROM {table} e WHERE e.{grp} = g.{grp}"
+        for _ in range(n - 1):
+            inner = "SELECT MAX(e.{col}) FROM {table} e WHERE e.{grp} = g.{grp} AND e.{col} < (%s)" % inner
+        sql = ("SELECT g.{grp}, (%s) AS {col}\nFROM (SELECT DISTINCT {grp} FROM {table}) g" % inner)
+        return sql.format(col=column, table=table, grp=group), []
+    if style == "dense_rank":
+        sql = (
+            "SELECT {grp}, {col} FROM (\n"
+            "    SELECT DISTINCT {grp}, {col},\n"
+            "           DENSE_RANK() OVER (PARTITION BY {grp} ORDER BY {col} DESC) AS rank\n"
+            "    FROM {table}\n"
+            "    WHERE {col} IS NOT NULL\n"
+            ") ranked\n"
+            "WHERE rank = {mark}"
+        ).format(col=column, table=table, grp=group, mark=mark)
+        return sql, [n]
+    raise ValueError("style must be 'max' or 'dense_rank' with partition_by")
@@ -0,0 +1,312 @@
+"""Mergeable one-pass statistics over chunked ``amount`` columns (Q17).
+
+``SELECT AVG(amount), MAX(amount), MIN(amount) FROM order_details`` only
+works on data inside PostgreSQL. :class:`StreamingAggregator` computes the
+same statistics, plus variance and quantiles, optionally per customer, over
+chunks of NumPy arrays: CSV/Parquet extracts read piece by piece, or event
+replays fed batch by batch.
+
+Per group it keeps count, mean and M2 (Welford/Chan), min and max, and
+optionally a merging t-digest for quantiles, so memory is O(groups)
+whatever the number of rows. Two aggregators built on different chunks,
+files or processes :meth:`~StreamingAggregator.merge` into the result of
+one pass over all the data: exactly for count/mean/variance/min/max (up to
+floating-point rounding), within the t-digest's error bound for quantiles.
+
+NaN amounts are skipped, as SQL aggregates skip NULLs; a NULL group key is
+a group of its own, as in ``GROUP BY``.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .missing_values import DEFAULT_CHUNKSIZE, _detect_format, _read_chunks
+
+DEFAULT_COMPRESSION = 200
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class TDigest:
+    """Merging t-digest (k1 scale function), built with vectorized NumPy passes.
+
+    Incoming values and centroids are sorted together and cut wherever the
+    scale function ``k(q) = compression / (2 pi) * asin(2q - 1)`` crosses an
+    integer, which keeps centroids tiny at the tails and about
+    ``compression / 2`` of them in total. Raw values and merged centroids
+    are buffered until ``buffer`` of them are pending, so small updates and
+    merges do not each pay for a compression pass.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION, buffer=None):
+        self.compression = compression
+        self.buffer = buffer or 5 * compression
+        self.min = math.inf
+        self.max = -math.inf
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._pending = []
+        self._pending_count = 0
+
+    @property
+    def means(self):
+        self._flush()
+        return self._means
+
+    @property
+    def weights(self):
+        self._flush()
+        return self._weights
+
+    @property
+    def count(self):
+        return float(self._weights.sum()) + sum(
+            len(values) if weights is None else float(weights.sum()) for values, weights in self._pending)
+
+    def update(self, values):
+        """Add raw values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self._add(values, values.min(), values.max())
+
+    def _add(self, values, low, high, weights=None):
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+        self._pending.append((values, weights))
+        self._pending_count += len(values)
+        if self._pending_count >= self.buffer:
+            self._flush()
+
+    def _flush(self):
+        if self._pending:
+            values = np.concatenate([v for v, _ in self._pending])
+            weights = np.concatenate([np.ones(len(v)) if w is None else w for v, w in self._pending])
+            self._pending = []
+            self._pending_count = 0
+            self._compress(values, weights)
+
+    def merge(self, other):
+        # The other digest's centroids and raw values join the buffer, so a
+        # merge costs at most one compression pass.
+        if len(other._means):
+            self._add(other._means, other.min, other.max, other._weights)
+        for values, weights in other._pending:
+            self._add(values, other.min, other.max, weights)
+        return self
+
+    def _compress(self, means, weights):
+        means = np.concatenate([self._means, means])
+        weights = np.concatenate([self._weights, weights])
+        order = np.argsort(means, kind="stable")
+        means = means[order]
+        weights = weights[order]
+        total = weights.sum()
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q_left - 1, -1.0, 1.0))
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(np.floor(k))) + 1])
+        merged = np.add.reduceat(weights, starts)
+        self._means = np.add.reduceat(means * weights, starts) / merged
+        self._weights = merged
+
+    def quantile(self, q):
+        """Estimated quantile(s) ``q`` in [0, 1]; NaN when empty."""
+        q = np.asarray(q, dtype=np.float64)
+        means, weights = self.means, self.weights
+        if not len(means):
+            return np.full(q.shape, np.nan) if q.ndim else math.nan
+        cumulative = np.cumsum(weights)
+        centers = cumulative - weights / 2
+        total = cumulative[-1]
+        x = np.concatenate([[0.0], centers, [total]])
+        y = np.concatenate([[self.min], means, [self.max]])
+        result = np.interp(q * total, x, y)
+        return result if q.ndim else float(result)
+
+
+class StreamingAggregator:
+    """Count, mean, variance, min, max and quantiles, optionally grouped.
+
+    ``compression`` sizes the per-group t-digests; ``None`` skips quantiles,
+    which makes updates several times cheaper. ``value`` and ``by`` name
+    the columns :meth:`update_frame` and :meth:`from_files` read.
+    """
+
+    def __init__(self, value="amount", by=None, compression=DEFAULT_COMPRESSION,
+                 quantiles=DEFAULT_QUANTILES):
+        self.value = value
+        self.by = by
+        self.compression = compression
+        self.quantiles = tuple(quantiles) if compression else ()
+        self.keys = []
+        self._slots = {}
+        self._count = np.zeros(0, dtype=np.int64)
+        self._mean = np.zeros(0)
+        self._m2 = np.zeros(0)
+        self._min = np.zeros(0)
+        self._max = np.zeros(0)
+        self._digests = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _grow(self, groups):
+        size = len(self._count)
+        if groups <= size:
+            return
+        capacity = max(groups, 2 * size, 16)
+        pad = capacity - size
+        self._count = np.concatenate([self._count, np.zeros(pad, dtype=np.int64)])
+        self._mean = np.concatenate([self._mean, np.zeros(pad)])
+        self._m2 = np.concatenate([self._m2, np.zeros(pad)])
+        self._min = np.concatenate([self._min, np.full(pad, np.inf)])
+        self._max = np.concatenate([self._max, np.full(pad, -np.inf)])
+
+    def _slot_codes(self, keys):
+        """Map group keys to dense slots, registering new groups."""
+        codes, uniques = pd.factorize(keys, use_na_sentinel=False)
+        slots = np.empty(len(uniques), dtype=np.int64)
+        for i, key in enumerate(uniques.tolist() if hasattr(uniques, "tolist") else list(uniques)):
+            if key is None or (isinstance(key, float) and math.isnan(key)) or key is pd.NA:
+                key = None
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = len(self.keys)
+                self.keys.append(key)
+                if self.compression:
+                    self._digests.append(TDigest(self.compression))
+            slots[i] = slot
+        self._grow(len(self.keys))
+        return slots[codes]
+
+    def update(self, values, keys=None):
+        """Fold one chunk in. ``keys`` (same length) gives each value's group."""
+        values = np.asarray(values, dtype=np.float64)
+        if keys is None:
+            if self.by is not None:
+                raise ValueError("this aggregator is grouped by %r; pass keys" % self.by)
+            codes = self._slot_codes(np.array([None], dtype=object))[np.zeros(len(values), dtype=np.int64)]
+        else:
+            if len(keys) != len(values):
+                raise ValueError("keys and values must have the same length")
+            if isinstance(keys, (list, tuple)):
+                keys = np.asarray(keys, dtype=object)
+            codes = self._slot_codes(keys)
+        valid = ~np.isnan(values)
+        if not valid.all():
+            values = values[valid]
+            codes = codes[valid]
+        if not len(values):
+            return self
+        groups = len(self.keys)
+        count = np.bincount(codes, minlength=groups)
+        total = np.bincount(codes, weights=values, minlength=groups)
+        present = np.flatnonzero(count)
+        mean = np.zeros(groups)
+        mean[present] = total[present] / count[present]
+        deviation = values - mean[codes]
+        m2 = np.bincount(codes, weights=deviation * deviation, minlength=groups)
+        low = np.full(groups, np.inf)
+        high = np.full(groups, -np.inf)
+        np.minimum.at(low, codes, values)
+        np.maximum.at(high, codes, values)
+        self._combine(present, count[present], mean[present], m2[present], low[present], high[present])
+        if self.compression:
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            sorted_values = values[order]
+            bounds = np.flatnonzero(np.diff(sorted_codes)) + 1
+            starts = np.concatenate([[0], bounds]).tolist()
+            stops = np.concatenate([bounds, [len(sorted_codes)]]).tolist()
+            digests = self._digests
+            for start, stop, slot in zip(starts, stops, sorted_codes[starts].tolist()):
+                digests[slot]._add(sorted_values[start:stop], low[slot], high[slot])
+        return self
+
+    def _combine(self, slots, count, mean, m2, low, high):
+        # Chan et al.: exact combination of (count, mean, M2) pairs.
+        n_a = self._count[slots].astype(np.float64)
+        n_b = count.astype(np.float64)
+        n = n_a + n_b
+        delta = mean - self._mean[slots]
+        self._mean[slots] += delta * n_b / n
+        self._m2[slots] += m2 + delta * delta * n_a * n_b / n
+        self._count[slots] += count
+        self._min[slots] = np.minimum(self._min[slots], low)
+        self._max[slots] = np.maximum(self._max[slots], high)
+
+    def update_frame(self, frame):
+        """Fold in a DataFrame chunk using the ``value``/``by`` columns."""
+        keys = frame[self.by].to_numpy() if self.by is not None else None
+        return self.update(frame[self.value].to_numpy(dtype=np.float64, na_value=np.nan), keys)
+
+    def merge(self, other):
+        """Fold another aggregator's partial result into this one."""
+        if (self.value, self.by, self.compression) != (other.value, other.by, other.compression):
+            raise ValueError("cannot merge aggregators with different settings")
+        if not other.keys:
+            return self
+        groups = len(other.keys)
+        keys = np.empty(groups, dtype=object)
+        keys[:] = other.keys
+        slots = self._slot_codes(keys)
+        present = np.flatnonzero(other._count[:groups])
+        self._combine(slots[present], other._count[present], other._mean[present], other._m2[present],
+                      other._min[present], other._max[present])
+        if self.compression:
+            for i in present.tolist():
+                self._digests[slots[i]].merge(other._digests[i])
+        return self
+
+    def result(self):
+        """DataFrame of statistics per group (one row, index ``None``, if ungrouped).
+
+        ``var``/``std`` are sample statistics (``ddof=1``), like
+        PostgreSQL's ``variance``/``stddev``.
+        """
+        groups = len(self.keys)
+        count = self._count[:groups]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.where(count > 1, self._m2[:groups] / (count - 1), np.nan)
+        empty = count == 0
+        data = {
+            "count": count,
+            "mean": np.where(empty, np.nan, self._mean[:groups]),
+            "var": var,
+            "std": np.sqrt(var),
+            "min": np.where(empty, np.nan, self._min[:groups]),
+            "max": np.where(empty, np.nan, self._max[:groups]),
+        }
+        if self.quantiles:
+            estimates = np.array([d.quantile(self.quantiles) for d in self._digests[:groups]])
+            for j, q in enumerate(self.quantiles):
+                data["p%g" % (100 * q)] = estimates[:, j] if groups else np.empty(0)
+        index = pd.Index(self.keys, name=self.by)
+        return pd.DataFrame(data, index=index)
+
+    @classmethod
+    def from_files(cls, paths, value="amount", by=None, compression=DEFAULT_COMPRESSION,
+                   quantiles=DEFAULT_QUANTILES, chunksize=DEFAULT_CHUNKSIZE, fmt=None, workers=None):
+        """Aggregate CSV/Parquet files, one file per task on a process pool, and merge."""
+        total = cls(value=value, by=by, compression=compression, quantiles=quantiles)
+        settings = (value, by, compression, total.quantiles)
+        jobs = [(settings, path, fmt or _detect_format(path), chunksize) for path in paths]
+        if not workers or workers <= 1 or len(jobs) <= 1:
+            for partial in map(_aggregate_file, jobs):
+                total.merge(partial)
+            return total
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for partial in pool.map(_aggregate_file, jobs):
+                total.merge(partial)
+        return total
+
+
+def _aggregate_file(job):
+    settings, path, fmt, chunksize = job
+    aggregator = StreamingAggregator(*settings)
+    columns = [aggregator.value] + ([aggregator.by] if aggregator.by is not None else [])
+    for chunk in _read_chunks(path, fmt, chunksize, columns=columns):
+        aggregator.update_frame(chunk)
+    return aggregator
@@ -0,0 +1,249 @@
+"""Trailing zeroes of ``n!`` in any base (Q11), one at a time or in bulk.
+
+The notes version counts factors of 5 for base 10 only. In general the
+number of trailing zeroes of ``n!`` in base ``b = p1**e1 * p2**e2 * ...`` is
+``min(v_p(n!) // e)`` over the prime factors of ``b``, where ``v_p(n!)`` is
+given by Legendre's formula ``sum(n // p**i)``.
+
+Batches with few distinct bases factorize each one once (cached) and run
+Legendre's formula per base with a scalar divisor. Batches with many
+distinct bases factorize them all at once with :func:`factorize_batch`,
+trial division by a shared prime table vectorized over the bases, and run
+the formula over every ``(query, prime)`` pair.
+"""
+
+import math
+from functools import lru_cache
+
+import numpy as np
+
+FACTOR_CACHE_SIZE = 4096
+# Batches use the per-base loop up to this many distinct bases, or while
+# there are at least GROUPED_QUERIES_PER_BASE queries per distinct base.
+GROUPED_BASES_MAX = 256
+GROUPED_QUERIES_PER_BASE = 100
+# factorize_batch tests divisibility in float64, exact below 2**53.
+_FLOAT_EXACT = 1 << 53
+# factorize_batch drops fully factorized bases every this many primes.
+COMPACT_EVERY = 8
+# Primes in at least this many (n, prime) pairs get a scalar-divisor pass.
+SHARED_PRIME_MIN = 64
+
+_PRIMES = np.array([2, 3, 5, 7], dtype=np.int64)
+
+
+@lru_cache(maxsize=FACTOR_CACHE_SIZE)
+def factorize(base):
+    """Return the prime factorization of ``base`` as ``((p, e), ...)``."""
+    base = int(base)
+    if base < 2:
+        raise ValueError("base must be at least 2, got %d" % base)
+    factors = []
+    p = 2
+    while p * p <= base:
+        if base % p == 0:
+            e = 0
+            while base % p == 0:
+                base //= p
+                e += 1
+            factors.append((p, e))
+        p += 1 if p == 2 else 2
+    if base > 1:
+        factors.append((base, 1))
+    return tuple(factors)
+
+
+def _prime_table(limit):
+    """Primes up to at least ``limit`` (sieve of Eratosthenes, grown on demand)."""
+    global _PRIMES
+    if _PRIMES[-1] < limit:
+        size = max(limit, 2 * int(_PRIMES[-1])) + 1
+        sieve = np.ones(size, dtype=bool)
+        sieve[:2] = False
+        for i in range(2, math.isqrt(size - 1) + 1):
+            if sieve[i]:
+                sieve[i * i::i] = False
+        _PRIMES = np.flatnonzero(sieve).astype(np.int64)
+    return _PRIMES
+
+
+def factorize_batch(bases):
+    """Vectorized :func:`factorize` of an array of bases below ``2**53``.
+
+    Returns ``(index, primes, exponents)`` arrays: ``primes[k] ** exponents[k]``
+    exactly divides ``bases[index[k]]``, sorted by index then prime. Every
+    base is trial-divided by the primes up to the square root of the largest
+    one, dropping out once the next prime squared exceeds what is left of
+    it; a cofactor left above 1 is prime.
+    """
+    bases = np.asarray(bases, dtype=np.int64).ravel()
+    empty = np.empty(0, dtype=np.int64)
+    if bases.size == 0:
+        return empty, empty, empty
+    if bases.min() < 2:
+        raise ValueError("base must be at least 2, got %d" % bases.min())
+    if bases.max() >= _FLOAT_EXACT:
+        raise ValueError("factorize_batch needs bases below 2**53")
+    rest = bases.astype(np.float64)
+    active = np.arange(bases.size)
+    cofactor = rest.copy()
+    found = []
+    quotient = np.empty_like(cofactor)
+    floor = np.empty_like(cofactor)
+    for i, p in enumerate(_prime_table(math.isqrt(int(bases.max()))).tolist()):
+        if i % COMPACT_EVERY == 0:
+            # Testing a few primes past the square root is harmless, so the
+            # finished bases are only dropped every COMPACT_EVERY primes.
+            keep = cofactor >= p * p
+            if not keep.all():
+                rest[active[~keep]] = cofactor[~keep]
+                active = active[keep]
+                cofactor = cofactor[keep]
+                if not active.size:
+                    break
+                quotient = quotient[:active.size]
+                floor = floor[:active.size]
+        np.divide(cofactor, p, out=quotient)
+        np.floor(quotient, out=floor)
+        hit = np.flatnonzero(quotient == floor)
+        if not hit.size:
+            continue
+        values = quotient[hit].copy()
+        exponents = np.ones(hit.size, dtype=np.int64)
+        while True:
+            divided = values / p
+            more = divided == np.floor(divided)
+            if not more.any():
+                break
+            values[more] = divided[more]
+            exponents[more] += 1
+        cofactor[hit] = values
+        found.append((active[hit], np.full(hit.size, p, dtype=np.int64), exponents))
+    rest[active] = cofactor
+    prime = np.flatnonzero(rest > 1)
+    found.append((prime, rest[prime].astype(np.int64), np.ones(prime.size, dtype=np.int64)))
+    index, primes, exponents = (np.concatenate(parts) for parts in zip(*found))
+    order = np.lexsort((primes, index))
+    return index[order], primes[order], exponents[order]
+
+
+def legendre_exponent(n, p):
+    """Exponent of the prime ``p`` in ``n!``."""
+    count = 0
+    while n >= p:
+        n //= p
+        count += n
+    return count
+
+
+def count_trailing_zeroes(n, base=10):
+    """Return the number of trailing zeroes of ``n!`` written in ``base``."""
+    if n < 0:
+        raise ValueError("n must be non-negative, got %d" % n)
+    return min(legendre_exponent(n, p) // e for p, e in factorize(base))
+
+
+def _legendre_exponent_array(ns, p):
+    """Vectorized :func:`legendre_exponent` for an int64 array and a scalar prime."""
+    if p == 2 and hasattr(np, "bitwise_count"):
+        # v_2(n!) = n - popcount(n)
+        return ns - np.bitwise_count(ns)
+    totals = np.zeros_like(ns)
+    quotient = ns.copy()
+    largest = int(ns.max())
+    power = p
+    while power <= largest:
+        np.floor_divide(quotient, p, out=quotient)
+        totals += quotient
+        power *= p
+    return totals
+
+
+def _legendre_exponent_pairs(ns, ps):
+    """Vectorized :func:`legendre_exponent` for equal-length arrays of ``n`` and primes.
+
+    Primes shared by at least ``SHARED_PRIME_MIN`` pairs (the small ones,
+    which need the most steps) run with a scalar divisor; the rest divide
+    array by array, dropping pairs as they finish.
+    """
+    totals = np.zeros_like(ns)
+    order = np.argsort(ps, kind="stable")
+    primes, starts, counts = np.unique(ps[order], return_index=True, return_counts=True)
+    shared = counts >= SHARED_PRIME_MIN
+    for p, start, count in zip(primes[shared].tolist(), starts[shared].tolist(), counts[shared].tolist()):
+        idx = order[start:start + count]
+        totals[idx] = _legendre_exponent_array(ns[idx], p)
+    live = order[np.repeat(~shared, counts)]
+    quotient = ns.copy()
+    live = live[quotient[live] >= ps[live]]
+    while live.size:
+        step = quotient[live] // ps[live]
+        totals[live] += step
+        quotient[live] = step
+        live = live[step >= ps[live]]
+    return totals
+
+
+def _count_distinct_bases(ns, unique_bases, inverse):
+    """Trailing zeroes for many distinct bases: one row per ``(query, prime factor)``."""
+    owner, primes, exponents = factorize_batch(unique_bases)
+    per_base = np.bincount(owner, minlength=unique_bases.size)
+    base_start = np.concatenate(([0], np.cumsum(per_base)[:-1]))
+    counts = per_base[inverse]
+    query_start = np.cumsum(counts) - counts
+    query = np.repeat(np.arange(ns.size), counts)
+    entry = np.repeat(base_start[inverse] - query_start, counts) + np.arange(query.size)
+    zeroes = _legendre_exponent_pairs(ns[query], primes[entry]) // exponents[entry]
+    return np.minimum.reduceat(zeroes, query_start)
+
+
+def count_trailing_zeroes_batch(ns, bases=10):
+    """Vectorized :func:`count_trailing_zeroes` over arrays of ``n`` and ``base``.
+
+    ``ns`` and ``bases`` broadcast against each other. With up to
+    ``GROUPED_BASES_MAX`` distinct bases, queries are grouped by base, each
+    base is factorized once (through the LRU cache) and Legendre's formula
+    runs over the whole group with a scalar divisor, so the Python loop is
+    ``log_p(max(n))`` steps per distinct prime factor rather than per query.
+    The same holds while there are ``GROUPED_QUERIES_PER_BASE`` queries per
+    base. Batches of mostly distinct bases (below ``2**53``) are factorized
+    together by :func:`factorize_batch` instead of one Python loop per base.
+    """
+    ns, bases = np.broadcast_arrays(np.asarray(ns, dtype=np.int64), np.asarray(bases, dtype=np.int64))
+    shape = ns.shape
+    ns = ns.ravel()
+    bases = bases.ravel()
+    result = np.empty(ns.size, dtype=np.int64)
+    if ns.size == 0:
+        return result.reshape(shape)
+    if ns.min() < 0:
+        raise ValueError("n must be non-negative")
+
+    first = bases[0]
+    if (bases == first).all():
+        groups = [(int(first), slice(None))]
+    else:
+        order = np.argsort(bases, kind="stable")
+        unique_bases, counts = np.unique(bases[order], return_counts=True)
+        distinct = unique_bases.size
+        if (distinct > GROUPED_BASES_MAX and distinct * GROUPED_QUERIES_PER_BASE > bases.size
+                and 2 <= unique_bases[0] and unique_bases[-1] < _FLOAT_EXACT):
+            inverse = np.empty(bases.size, dtype=np.int64)
+            inverse[order] = np.repeat(np.arange(unique_bases.size), counts)
+            return _count_distinct_bases(ns, unique_bases, inverse).reshape(shape)
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+        groups = [
+            (int(b), order[bounds[i]:bounds[i + 1]])
+            for i, b in enumerate(unique_bases)
+        ]
+
+    for base, idx in groups:
+        group_ns = ns[idx]
+        zeroes = None
+        for p, e in factorize(base):
+            candidate = _legendre_exponent_array(group_ns, p)
+            if e > 1:
+                candidate //= e
+            zeroes = candidate if zeroes is None else np.minimum(zeroes, candidate, out=zeroes)
+        result[idx] = zeroes
+    return result.reshape(shape)
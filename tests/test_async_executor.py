@@ -0,0 +1,112 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from odoo_pysql.async_executor import AsyncQueryExecutor
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "reports.db")
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE invoices (id INTEGER PRIMARY KEY, partner TEXT, amount REAL)")
+    con.executemany("INSERT INTO invoices (partner, amount) VALUES (?, ?)",
+                    [("p%d" % (i % 5), float(i)) for i in range(100)])
+    con.commit()
+    con.close()
+    return path
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_fetch_and_fetch_many(database):
+    async def main():
+        async with AsyncQueryExecutor(database, dialect="sqlite", pool_size=2) as executor:
+            total = await executor.fetch("SELECT SUM(amount) FROM invoices")
+            batch = await executor.fetch_many([
+                ("SELECT COUNT(*) FROM invoices WHERE partner = ?", ["p1"]),
+                ("SELECT MAX(amount) FROM invoices", ()),
+                ("SELECT id FROM invoices WHERE amount > ?", (1000,)),
+            ])
+            assert await executor.fetch_many([]) == []
+            return total, batch, executor.stats
+
+    total, batch, stats = run(main())
+    assert total == [(4950.0,)]
+    assert batch == [[(20,)], [(99.0,)], []]
+    assert stats["queries"] == 4 and stats["connections_opened"] == 1
+
+
+def test_pool_is_bounded_and_connections_are_reused(database):
+    async def main():
+        async with AsyncQueryExecutor(database, dialect="sqlite", pool_size=3) as executor:
+            queries = [("SELECT COUNT(*) FROM invoices WHERE amount >= ?", (i,)) for i in range(40)]
+            results = await executor.gather(queries)
+            again = await executor.gather(queries[:3])
+            return results, again, executor.stats
+
+    results, again, stats = run(main())
+    assert results == [[(100 - i,)] for i in range(40)] and again == results[:3]
+    assert stats["connections_opened"] == 3
+    assert stats["statement_misses"] + stats["statement_hits"] == 43
+
+
+def test_statement_cache_is_lru(database):
+    async def main():
+        async with AsyncQueryExecutor(database, dialect="sqlite", pool_size=1, statement_cache_size=2) as executor:
+            for sql in ("SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3", "SELECT 2"):
+                await executor.fetch(sql)
+            return executor.stats
+
+    stats = run(main())
+    assert (stats["statement_hits"], stats["statement_misses"], stats["statement_evictions"]) == (1, 4, 2)
+
+
+def test_failed_query_rolls_back_and_frees_the_connection(database):
+    async def main():
+        async with AsyncQueryExecutor(database, dialect="sqlite", pool_size=1) as executor:
+            with pytest.raises(sqlite3.OperationalError):
+                await executor.fetch_many([
+                    ("DELETE FROM invoices", ()),
+                    ("SELECT * FROM missing_table", ()),
+                ])
+            # The single pooled connection is usable again and the DELETE was undone.
+            return await executor.fetch("SELECT COUNT(*) FROM invoices")
+
+    assert run(main()) == [(100,)]
+
+
+def test_null_parameters_and_results(database):
+    async def main():
+        async with AsyncQueryExecutor(database, dialect="sqlite") as executor:
+            return await executor.fetch("SELECT ? IS NULL, NULL", (None,))
+
+    assert run(main()) == [(1, None)]
+
+
+def test_closed_executor_and_invalid_arguments(database):
+    async def main():
+        executor = AsyncQueryExecutor(database, dialect="sqlite")
+        await executor.fetch("SELECT 1")
+        await executor.close()
+        with pytest.raises(RuntimeError):
+            await executor.fetch("SELECT 1")
+
+    run(main())
+    with pytest.raises(ValueError):
+        AsyncQueryExecutor(database, dialect="sqlite", pool_size=0)
+    assert AsyncQueryExecutor("dbname=odoo").mark == "%s"
+
+
+def test_open_failure_releases_the_slot(tmp_path):
+    async def main():
+        executor = AsyncQueryExecutor(str(tmp_path / "missing" / "x.db"), dialect="sqlite", pool_size=1)
+        for _ in range(2):
+            with pytest.raises(sqlite3.OperationalError):
+                await asyncio.wait_for(executor.fetch("SELECT 1"), timeout=5)
+        await executor.close()
+
+    run(main())
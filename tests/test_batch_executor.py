@@ -0,0 +1,124 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from odoo_pysql.batch_executor import BatchExecutor, Guard, missing, zero_divisor
+
+
+def divide(x, y):
+    return x / y
+
+
+def per_row(fn, *columns):
+    """The notes' try/except/else over Python scalars."""
+    values, errors = [], []
+    for row, args in enumerate(zip(*(c.tolist() for c in columns))):
+        try:
+            result = fn(*args)
+        except (ArithmeticError, ValueError, TypeError) as exc:
+            values.append(np.nan)
+            errors.append((row, type(exc).__name__, str(exc)))
+        else:
+            values.append(result)
+    return values, errors
+
+
+def errors_of(evaluation):
+    return list(evaluation.errors.itertuples(index=False, name=None))
+
+
+@pytest.mark.parametrize("fn", [lambda x, y: x / y, lambda x, y: x // y, lambda x, y: x % y])
+def test_zero_divisor_message_matches_row_function(fn):
+    x = np.array([7, 8, 9, 10])
+    y = np.array([2, 0, 3, 0])
+    result = BatchExecutor(fn, ("x", "y"), guards=[zero_divisor("y")]).evaluate({"x": x, "y": y})
+    assert errors_of(result) == per_row(fn, x, y)[1]
+    assert result.valid.tolist() == [True, False, True, False]
+
+
+def test_zero_divisor_explicit_message_and_float_columns():
+    frame = pd.DataFrame({"x": [1.0, 2.0], "y": [0.0, 4.0]})
+    derived = BatchExecutor(divide, ("x", "y"), guards=[zero_divisor("y")]).evaluate(frame)
+    assert errors_of(derived) == [(0, "ZeroDivisionError", "float division by zero")]
+    fixed = BatchExecutor(divide, ("x", "y"), guards=[zero_divisor("y", "no divisor")]).evaluate(frame)
+    assert errors_of(fixed) == [(0, "ZeroDivisionError", "no divisor")]
+
+
+def test_guarded_and_unguarded_agree_with_row_loop():
+    rng = np.random.default_rng(0)
+    x = rng.normal(100, 30, 5000)
+    y = rng.uniform(1, 10, 5000)
+    y[rng.random(5000) < 0.05] = 0.0
+    expected, expected_errors = per_row(divide, x, y)
+    for guards in ([zero_divisor("y")], []):
+        executor = BatchExecutor(divide, ("x", "y"), guards=guards)
+        result = executor.evaluate({"x": x, "y": y})
+        np.testing.assert_allclose(result.values, expected)
+        assert errors_of(result) == expected_errors
+    assert executor.stats["residue"] == len(expected_errors)
+
+
+@pytest.mark.parametrize("fn", [lambda x, y: x // y, lambda x, y: x % y])
+def test_unguarded_integer_division_by_zero_is_an_error(fn):
+    rng = np.random.default_rng(1)
+    x = rng.integers(-5, 50, 2000)
+    y = rng.integers(0, 4, 2000)
+    expected, expected_errors = per_row(fn, x, y)
+    assert expected_errors
+    for guards in ([zero_divisor("y")], []):
+        executor = BatchExecutor(fn, ("x", "y"), guards=guards)
+        result = executor.evaluate({"x": x, "y": y})
+        np.testing.assert_array_equal(result.values, expected)
+        assert result.valid.tolist() == [not math.isnan(v) for v in expected]
+        assert errors_of(result) == expected_errors
+    # Only rows with a zero result and a zero input went through row_fn.
+    assert executor.stats["residue"] < len(x) // 2
+
+
+def test_missing_values_and_dataframe_index():
+    frame = pd.DataFrame({"x": [1.0, None, 3.0], "y": [2.0, 2.0, None]}, index=[10, 20, 30])
+    result = BatchExecutor(divide, ("x", "y"), guards=[missing("x", "y")]).evaluate(frame)
+    assert result.values.index.tolist() == [10, 20, 30]
+    assert result.valid.tolist() == [True, False, False]
+    message = "missing value in x, y"
+    assert errors_of(result) == [(20, "ValueError", message), (30, "ValueError", message)]
+
+
+def test_raising_vector_function_is_bisected():
+    def vector_log(x):
+        if (x <= 0).any():
+            raise ValueError("math domain error")
+        return np.log(x)
+
+    x = np.arange(1.0, 1001.0)
+    x[[5, 700]] = -1.0
+    executor = BatchExecutor(vector_log, ("x",), row_fn=math.log, min_vector=16)
+    result = executor.evaluate({"x": x})
+    assert [row for row, _, _ in errors_of(result)] == [5, 700]
+    assert executor.stats["vectorized"] > 900 and executor.stats["residue"] <= 64
+    np.testing.assert_allclose(result.values[result.valid], np.log(x[result.valid]))
+
+
+def test_other_exceptions_propagate():
+    def broken(x):
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError):
+        BatchExecutor(broken, ("x",)).evaluate({"x": np.arange(3.0)})
+
+
+def test_custom_guard_and_empty_chunk():
+    negative = Guard("ValueError", "negative", lambda columns: columns["x"] < 0)
+    executor = BatchExecutor(np.sqrt, ("x",), guards=[negative])
+    assert errors_of(executor.evaluate({"x": np.array([4.0, -1.0])})) == [(1, "ValueError", "negative")]
+    empty = executor.evaluate({"x": np.array([])})
+    assert empty.values.shape == (0,) and empty.errors.empty
+    assert list(empty.errors.columns) == ["row", "error", "message"]
+
+
+def test_evaluate_chunks():
+    chunks = [pd.DataFrame({"x": [1.0, 2.0], "y": [1.0, 0.0]}), pd.DataFrame({"x": [3.0], "y": [3.0]})]
+    results = list(BatchExecutor(divide, ("x", "y"), guards=[zero_divisor("y")]).evaluate_chunks(chunks))
+    assert [r.valid.tolist() for r in results] == [[True, False], [True]]
@@ -0,0 +1,94 @@
+import sqlite3
+
+import pytest
+
+from odoo_pysql.bulk_loader import BulkLoader
+
+SCHEMA = ("CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, customer_name TEXT NOT NULL,"
+          " contact_email TEXT UNIQUE, country TEXT)")
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(":memory:")
+    con.execute(SCHEMA)
+    return con
+
+
+def rows(con):
+    return con.execute("SELECT customer_name, contact_email, country FROM customers ORDER BY contact_email").fetchall()
+
+
+def test_load_batches_and_last_record_wins(con):
+    records = [("a", "a@x", "BE"), ("b", "b@x", "FR"), ("a2", "a@x", "EG"),
+               {"customer_name": "c", "contact_email": "c@x", "country": "NL"}]
+    report = BulkLoader(dialect="sqlite", batch_size=2).load(con, records)
+    assert report.rows_loaded == 4 and len(report.batches) == 2 and not report.rejected
+    assert rows(con) == [("a2", "a@x", "EG"), ("b", "b@x", "FR"), ("c", "c@x", "NL")]
+
+
+def test_bad_rows_are_isolated(con):
+    records = [("a", "a@x", "BE"), (None, "b@x", "FR"), ("c", "c@x", "NL"), ("d", "d@x", "MA")]
+    report = BulkLoader(dialect="sqlite", batch_size=4).load(con, records)
+    assert [record for record, _ in report.rejected] == [(None, "b@x", "FR")]
+    assert len(report.failed_batches) == 1 and report.rows_loaded == 3
+    assert [r[1] for r in rows(con)] == ["a@x", "c@x", "d@x"]
+
+
+def test_without_bisect_failed_batch_is_skipped(con):
+    records = [("a", "a@x", "BE"), (None, "b@x", "FR"), ("c", "c@x", "NL")]
+    report = BulkLoader(dialect="sqlite", batch_size=2, bisect=False).load(con, records)
+    assert report.rows_loaded == 1 and rows(con) == [("c", "c@x", "NL")]
+
+
+def test_malformed_records_are_rejected_not_fatal(con):
+    records = [("a", "a@x", "BE"), ("short", "s@x"), 42, ("c", "c@x", "NL"), ("d", "d@x", "MA", "extra")]
+    report = BulkLoader(dialect="sqlite", batch_size=2).load(con, records)
+    assert [record for record, _ in report.rejected] == [("short", "s@x"), 42, ("d", "d@x", "MA", "extra")]
+    assert all(isinstance(exc, (TypeError, ValueError)) for _, exc in report.rejected)
+    assert report.rows_loaded == 2 and [r[1] for r in rows(con)] == ["a@x", "c@x"]
+
+
+def test_only_malformed_and_empty_input(con):
+    loader = BulkLoader(dialect="sqlite")
+    report = loader.load(con, [("x",)])
+    assert report.batches == [] and len(report.rejected) == 1
+    assert loader.load(con, []).rows_loaded == 0
+
+
+def test_loader_reused_on_new_connection(con):
+    loader = BulkLoader(dialect="sqlite")
+    loader.load(con, [("a", "a@x", "BE")])
+    other = sqlite3.connect(":memory:")
+    other.execute(SCHEMA)
+    assert loader.load(other, [("b", "b@x", "FR")]).rows_loaded == 1
+    assert rows(other) == [("b", "b@x", "FR")]
+
+
+def test_source_errors_propagate(con):
+    def records():
+        yield ("a", "a@x", "BE")
+        raise RuntimeError("source failed")
+
+    with pytest.raises(RuntimeError):
+        BulkLoader(dialect="sqlite").load(con, records())
+
+
+def test_sql():
+    loader = BulkLoader()
+    assert loader.staging_sql().startswith("CREATE TEMP TABLE IF NOT EXISTS customers_staging ON COMMIT DELETE ROWS")
+    assert "ON CONFLICT (contact_email) DO UPDATE SET customer_name = EXCLUDED.customer_name" in loader.merge_sql()
+    assert loader.merge_sql().count("ON CONFLICT") == 1
+    assert "DO NOTHING" in BulkLoader(update=()).merge_sql()
+    assert "ON CONFLICT" not in BulkLoader(conflict=None).merge_sql()
+    with pytest.raises(ValueError):
+        BulkLoader(table="customers; DROP TABLE x")
+    with pytest.raises(ValueError):
+        BulkLoader(batch_size=0)
+
+
+def test_null_conflict_keys_are_all_loaded(con):
+    records = [("a", None, "BE"), ("b", "b@x", "FR"), ("c", None, "NL"), ("d", None, "MA"), ("b2", "b@x", "EG")]
+    report = BulkLoader(dialect="sqlite", batch_size=10).load(con, records)
+    assert report.rows_loaded == 5 and not report.rejected
+    assert sorted(r[0] for r in rows(con)) == ["a", "b2", "c", "d"]
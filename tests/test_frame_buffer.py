@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from odoo_pysql.frame_buffer import FrameBuffer
+
+
+def make_batch(start, n):
+    ids = np.arange(start, start + n)
+    return pd.DataFrame({
+        "id": ids.astype(np.int64),
+        "amount": ids * 0.5,
+        "flag": ids % 2 == 0,
+        "name": pd.Series(["r%d" % i for i in ids], dtype=object),
+        "qty": pd.array([None if i % 7 == 0 else int(i) for i in ids], dtype="Int64"),
+    })
+
+
+def batches(sizes):
+    start = 0
+    for n in sizes:
+        yield make_batch(start, n)
+        start += n
+
+
+def expected(sizes):
+    return pd.concat(list(batches(sizes)), ignore_index=True)
+
+
+SIZES = [3, 0, 50, 1, 200, 17]
+
+
+def test_matches_concat_across_growth():
+    buffer = FrameBuffer(capacity=4).extend(batches(SIZES))
+    assert len(buffer) == sum(SIZES)
+    assert buffer.capacity >= len(buffer)
+    pd.testing.assert_frame_equal(buffer.to_frame(), expected(SIZES))
+
+
+def test_nan_and_missing_values_survive():
+    frame = pd.DataFrame({"x": [1.0, np.nan], "s": pd.Series([None, "a"], dtype=object)})
+    result = FrameBuffer().append(frame).append(frame).to_frame()
+    assert result["x"].isna().tolist() == [False, True, False, True]
+    assert result["s"].isna().tolist() == [True, False, True, False]
+
+
+def test_earlier_frames_are_not_changed_by_appends():
+    buffer = FrameBuffer(capacity=8).append(make_batch(0, 5))
+    first = buffer.to_frame()
+    snapshot = first.copy()
+    buffer.extend(batches([3, 100]))
+    pd.testing.assert_frame_equal(first, snapshot)
+
+
+def test_empty_buffer():
+    buffer = FrameBuffer()
+    assert len(buffer) == 0
+    assert buffer.columns == []
+    assert buffer.to_frame().empty
+
+
+def test_schema_mismatch_leaves_buffer_unchanged():
+    buffer = FrameBuffer().append(make_batch(0, 5))
+    with pytest.raises(ValueError, match="do not match"):
+        buffer.append(make_batch(5, 2)[["amount", "id"]])
+    bad = make_batch(5, 2).astype({"amount": np.float32})
+    with pytest.raises(ValueError, match="dtype"):
+        buffer.append(bad)
+    buffer.append(make_batch(5, 2))
+    pd.testing.assert_frame_equal(buffer.to_frame(), expected([5, 2]))
+
+
+def test_invalid_growth():
+    with pytest.raises(ValueError):
+        FrameBuffer(growth=1)
+
+
+def test_spills_to_memmap_and_cleans_up(tmp_path):
+    with FrameBuffer(capacity=4, memory_budget=2048) as buffer:
+        buffer.extend(batches(SIZES))
+        assert buffer.spilled
+        spill_dir = buffer.spill_dir
+        assert any(isinstance(a, np.memmap) for a in buffer._arrays.values())
+        pd.testing.assert_frame_equal(buffer.to_frame(), expected(SIZES))
+    assert not (tmp_path / spill_dir).exists()
+
+
+def test_explicit_spill_dir_is_kept(tmp_path):
+    with FrameBuffer(capacity=4, memory_budget=0, spill_dir=str(tmp_path)) as buffer:
+        buffer.extend(batches([10, 30]))
+        assert buffer.spilled
+        pd.testing.assert_frame_equal(buffer.to_frame(), expected([10, 30]))
+    assert tmp_path.exists()
+
+
+def test_extension_string_column_keeps_dtype():
+    frame = pd.DataFrame({"s": pd.array(["a", None, "c"], dtype="string")})
+    result = FrameBuffer(capacity=1).append(frame).append(frame).to_frame()
+    assert result["s"].dtype == frame["s"].dtype
+    assert result["s"].isna().tolist() == [False, True, False] * 2
@@ -0,0 +1,135 @@
+import random
+import sqlite3
+
+import pytest
+
+from odoo_pysql.hierarchy import AncestorCache, HierarchyError, HierarchyIndex, parse_path
+
+
+def random_parents(n, seed=0):
+    rng = random.Random(seed)
+    parents = {1: None}
+    for node in range(2, n + 1):
+        parents[node] = rng.randint(1, node - 1) if rng.random() > 0.05 else None
+    return parents
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE employees (employee_id INTEGER PRIMARY KEY, manager_id INTEGER)")
+    con.executemany("INSERT INTO employees VALUES (?, ?)", random_parents(300).items())
+    con.commit()
+    return con
+
+
+def installed(con, cache=True):
+    index = HierarchyIndex(dialect="sqlite", cache=cache)
+    index.install(con)
+    return index
+
+
+def recursive_ancestors(con, index, node):
+    return {r[0] for r in con.execute(index.recursive_ancestors_sql(), (node,))} - {node}
+
+
+def brute_descendants(con, node):
+    parents = dict(con.execute("SELECT employee_id, manager_id FROM employees"))
+    result = set()
+    for candidate in parents:
+        current = parents[candidate]
+        while current is not None:
+            if current == node:
+                result.add(candidate)
+                break
+            current = parents[current]
+    return result
+
+
+def check_consistent(con, index):
+    plain = HierarchyIndex(dialect="sqlite", cache=False)
+    for node in (1, 2, 17, 50, 123, 299):
+        assert set(index.ancestors(con, node)) == recursive_ancestors(con, index, node)
+        assert set(plain.ancestors(con, node)) == recursive_ancestors(con, index, node)
+        assert set(index.descendants(con, node)) == brute_descendants(con, node)
+    assert HierarchyIndex(dialect="sqlite").load(con).paths() == dict(
+        con.execute("SELECT employee_id, parent_path FROM employees"))
+
+
+@pytest.mark.parametrize("cache", [True, False])
+def test_install_matches_recursive_query(con, cache):
+    index = installed(con, cache)
+    assert index.path(con, 1) == "1/"
+    assert parse_path(index.path(con, 123))[-1] == 123
+    assert 123 in index.descendants(con, 123, include_self=True)
+    check_consistent(con, index)
+
+
+@pytest.mark.parametrize("cache", [True, False])
+def test_moves_rewrite_the_subtree(con, cache):
+    index = installed(con, cache)
+    index.move(con, 2, 299 if 2 not in index.ancestors(con, 299) else None)
+    index.move_many(con, [(17, None), (50, 1), (5, 17)])
+    check_consistent(con, index)
+
+
+def test_move_under_own_descendant_is_refused_and_rolled_back(con):
+    index = installed(con)
+    below = index.descendants(con, 1)[-1]
+    before = dict(con.execute("SELECT employee_id, parent_path FROM employees"))
+    with pytest.raises(HierarchyError):
+        index.move(con, 1, 1)
+    with pytest.raises(HierarchyError):
+        index.move_many(con, [(50, None), (1, below)])
+    assert dict(con.execute("SELECT employee_id, parent_path FROM employees")) == before
+    check_consistent(con, index)
+
+
+def test_prefix_does_not_leak_to_sibling_ids(con):
+    index = installed(con)
+    con.execute("INSERT INTO employees (employee_id, manager_id) VALUES (5000, NULL), (50000, NULL), (50001, 50000)")
+    for node in (5000, 50000, 50001):
+        index.attach(con, node)
+    assert index.descendants(con, 5000) == []
+    assert index.descendants(con, 50000) == [50001]
+    assert index.ancestors(con, 50001) == [50000]
+
+
+def test_unknown_nodes(con):
+    index = installed(con)
+    with pytest.raises(HierarchyError):
+        index.ancestors(con, 10_000)
+    with pytest.raises(HierarchyError):
+        index.attach(con, 10_000)
+
+
+def test_ancestor_cache():
+    cache = AncestorCache({1: None, 2: 1, 3: 2, 4: 1})
+    assert cache.chain(3) == (1, 2, 3) and cache.ancestors(3) == (1, 2)
+    assert sorted(cache.descendants(1)) == [2, 3, 4]
+    cache.set_parent(2, 4)
+    assert cache.chain(3) == (1, 4, 2, 3)
+    cache.add(5, 3)
+    assert cache.paths()[5] == "1/4/2/3/5/"
+    with pytest.raises(HierarchyError):
+        cache.remove(2)
+    cache.remove(5)
+    assert 5 not in cache and len(cache) == 4
+    assert AncestorCache().paths() == {}
+
+
+def test_cycles_and_dangling_parents_are_reported():
+    with pytest.raises(HierarchyError, match="cycle"):
+        AncestorCache({1: 2, 2: 1}).chain(1)
+    with pytest.raises(HierarchyError, match="cycle"):
+        AncestorCache({1: 2, 2: 1}).paths()
+    with pytest.raises(HierarchyError, match="unknown"):
+        AncestorCache({1: 7}).paths()
+    with pytest.raises(HierarchyError, match="unknown"):
+        AncestorCache({1: 7}).chain(1)
+
+
+def test_postgresql_uses_like_prefix():
+    index = HierarchyIndex()
+    assert "text_pattern_ops" in index.create_sql()[1]
+    assert index._subtree_predicate("1/5/") == ("parent_path LIKE %s", ["1/5/%"])
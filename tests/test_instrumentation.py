@@ -0,0 +1,136 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from odoo_pysql.instrumentation import LatencyHistogram, MetricsRegistry, Patcher, timed
+from odoo_pysql.join_index import JoinIndex
+
+
+class MyClass:
+    def original_method(self):
+        return "Original behavior"
+
+    @staticmethod
+    def static():
+        return "static"
+
+    @classmethod
+    def build(cls):
+        return cls
+
+
+def test_histogram_exact_below_sub_buckets():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value)
+    assert histogram.count == 100 and histogram.min == 1 and histogram.max == 100
+    assert histogram.quantile(0.5) == 50
+    assert histogram.mean == pytest.approx(50.5)
+
+
+def test_histogram_quantile_error_bound():
+    latencies = np.random.default_rng(0).lognormal(np.log(200_000), 1.2, 100_000).astype(np.int64)
+    histogram = LatencyHistogram()
+    histogram.record_many(latencies)
+    for q in (0.5, 0.9, 0.99):
+        exact = np.quantile(latencies, q)
+        assert abs(histogram.quantile(q) - exact) / exact < 0.01
+
+
+def test_record_many_matches_record_and_merge():
+    values = [0, 5, 255, 256, 1000, 123456789, -3]
+    one, many = LatencyHistogram(), LatencyHistogram()
+    for value in values:
+        one.record(value)
+    many.record_many(values)
+    assert one.counts == many.counts and one.min == many.min == 0
+    merged = LatencyHistogram().merge(one).merge(many)
+    assert merged.count == 2 * len(values)
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    histogram.record_many([])
+    assert histogram.quantile(0.5) is None and histogram.min is None and histogram.mean is None
+    assert histogram.snapshot()["count"] == 0
+
+
+def test_timed_block_and_decorator():
+    registry = MetricsRegistry()
+    with timed("stage", registry):
+        pass
+
+    @timed("decorated", registry)
+    def work(x):
+        return x * 2
+
+    assert work(3) == 6
+    assert registry.histogram("stage").count == 1
+    assert registry.histogram("decorated").count == 1
+
+
+def test_patch_and_restore_real_target():
+    registry = MetricsRegistry()
+    original = JoinIndex.merge
+    index = JoinIndex(pd.DataFrame({"key": [1, 2]}), "key")
+    with Patcher(registry) as patcher:
+        name = patcher.patch("odoo_pysql.join_index.JoinIndex.merge")
+        assert JoinIndex.merge is not original
+        assert len(index.merge(pd.DataFrame({"key": [2, 3]}))) == 1
+        with pytest.raises(ValueError):
+            index.merge(pd.DataFrame({"key": [1]}), how="cross")
+    assert JoinIndex.merge is original
+    stats = registry.calls[name]
+    assert name == "odoo_pysql.join_index.JoinIndex.merge"
+    assert stats.calls == 2 and stats.errors == 1 and stats.histogram.count == 2
+
+
+def test_patch_missing_target():
+    with Patcher(MetricsRegistry()) as patcher:
+        with pytest.raises(AttributeError, match="JoinIndex.join"):
+            patcher.patch("odoo_pysql.join_index.JoinIndex.join")
+        with pytest.raises(ValueError):
+            patcher.patch("no_such_module.function")
+
+
+def test_patch_static_class_and_instance_methods():
+    registry = MetricsRegistry()
+    static, build = vars(MyClass)["static"], vars(MyClass)["build"]
+    obj = MyClass()
+    patcher = Patcher(registry, sample_every=0)
+    patcher.patch((MyClass, "static"))
+    patcher.patch((MyClass, "build"))
+    patcher.patch((obj, "original_method"), name="instance")
+    assert MyClass.static() == "static" and MyClass.build() is MyClass
+    assert obj.original_method() == "Original behavior"
+    assert MyClass().original_method() == "Original behavior"
+    assert registry.calls["instance"].calls == 1
+    with pytest.raises(ValueError):
+        patcher.patch((MyClass, "static"))
+    patcher.restore()
+    assert vars(MyClass)["static"] is static and vars(MyClass)["build"] is build
+    assert "original_method" not in vars(obj) and len(patcher) == 0
+
+
+def test_sampling_counts_every_call():
+    registry = MetricsRegistry()
+    with Patcher(registry, sample_every=10) as patcher:
+        name = patcher.patch((MyClass, "original_method"))
+        obj = MyClass()
+        for _ in range(100):
+            obj.original_method()
+    assert registry.calls[name].calls == 100
+    assert registry.calls[name].histogram.count == 10
+
+
+def test_exports():
+    registry = MetricsRegistry()
+    registry.histogram('say "hi"').record(1000)
+    snapshot = json.loads(registry.to_json())
+    assert snapshot["stages"]['say "hi"']["count"] == 1
+    text = registry.to_prometheus()
+    assert 'odoo_pysql_stage_seconds_count{stage="say \\"hi\\""} 1' in text
+    registry.reset()
+    assert registry.snapshot() == {"stages": {}, "calls": {}}
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from odoo_pysql.join_index import JoinIndex
+
+
+def reference(left, right, how):
+    expected = pd.merge(left, right, on="key", how=how)
+    return expected.sort_values(list(expected.columns)).reset_index(drop=True)
+
+
+def normalized(frame):
+    return frame.sort_values(list(frame.columns)).reset_index(drop=True)
+
+
+@pytest.fixture
+def right():
+    return pd.DataFrame({"key": [3, 1, 2, 3, 5], "name": list("abcde")})
+
+
+@pytest.mark.parametrize("how", ["inner", "left", "outer"])
+def test_merge_matches_pandas(right, how):
+    left = pd.DataFrame({"key": [1, 3, 4, 3, 2], "amount": [10.0, 20.0, 30.0, 40.0, 50.0]})
+    result = JoinIndex(right, "key").merge(left, how=how)
+    pd.testing.assert_frame_equal(normalized(result), reference(left, right, how), check_dtype=False)
+
+
+def test_inner_merge_keeps_left_order(right):
+    left = pd.DataFrame({"key": [5, 1, 3]})
+    result = JoinIndex(right, "key").merge(left)
+    assert result["key"].tolist() == [5, 1, 3, 3]
+    assert result["name"].tolist() == ["e", "b", "a", "d"]
+
+
+def test_string_keys_and_overlapping_columns():
+    right = pd.DataFrame({"key": ["x", "y"], "value": [1, 2]})
+    left = pd.DataFrame({"key": ["y", "z", "x"], "value": [10, 20, 30]})
+    result = JoinIndex(right, "key").merge(left, how="left")
+    assert list(result.columns) == ["key", "value_x", "value_y"]
+    assert result["value_y"].tolist()[0] == 2 and np.isnan(result["value_y"].tolist()[1])
+
+
+def test_missing_keys_never_match():
+    right = pd.DataFrame({"key": [1.0, np.nan], "name": ["a", "b"]})
+    left = pd.DataFrame({"key": [np.nan, 1.0]})
+    result = JoinIndex(right, "key").merge(left)
+    assert result["name"].tolist() == ["a"]
+
+
+def test_empty_inputs(right):
+    index = JoinIndex(right, "key")
+    assert len(index.merge(right.iloc[:0][["key"]])) == 0
+    empty = JoinIndex(right.iloc[:0], "key")
+    assert len(empty) == 0 and empty.n_keys == 0
+    assert len(empty.merge(pd.DataFrame({"key": [1, 2]}), how="left")) == 2
+    assert index.append(right.iloc[:0]) is index and len(index) == len(right)
+
+
+def test_lookup_unknown_keys(right):
+    index = JoinIndex(right, "key")
+    codes = index.lookup(np.array([1, 100, -7]))
+    assert codes[0] >= 0 and codes[1] == -1 and codes[2] == -1
+
+
+def test_append_past_dense_headroom():
+    index = JoinIndex(pd.DataFrame({"key": np.arange(1, 11), "name": list("abcdefghij")}), "key")
+    index.append(pd.DataFrame({"key": [17, 18, 19, 20], "name": list("qrst")}))
+    assert index.n_keys == 14
+    result = index.merge(pd.DataFrame({"key": [20, 1, 17, 15]}))
+    assert result["name"].tolist() == ["t", "a", "q"]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_appends_match_pandas(seed):
+    rng = np.random.default_rng(seed)
+    right = pd.DataFrame({"key": rng.integers(0, 20, 10), "value": rng.random(10)})
+    index = JoinIndex(right, "key")
+    for _ in range(rng.integers(1, 6)):
+        high = int(rng.integers(5, 200))
+        rows = pd.DataFrame({"key": rng.integers(-5, high, rng.integers(0, 8)), "value": rng.random(1)[0]})
+        index.append(rows)
+        right = pd.concat([right, rows], ignore_index=True)
+    left = pd.DataFrame({"key": rng.integers(-10, 210, 50)})
+    for how in ("inner", "left", "outer"):
+        pd.testing.assert_frame_equal(normalized(index.merge(left, how=how)), reference(left, right, how),
+                                      check_dtype=False)
+
+
+def test_invalid_how(right):
+    with pytest.raises(ValueError):
+        JoinIndex(right, "key").merge(right, how="cross")
@@ -0,0 +1,136 @@
+import json
+import math
+import sqlite3
+
+import numpy as np
+import pytest
+
+from odoo_pysql.jsonb import JsonbColumn, JsonRecordDecoder, KeyProfile
+
+DOCS = [
+    {"name": "Ann", "age": 31, "vip": True, "city": "Cairo"},
+    {"name": "Bob", "age": 42, "vip": False},
+    {"name": "Eve", "age": "unknown", "vip": True, "note": "x"},
+    {"name": "Sam", "age": 19.5, "vip": None},
+]
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE person_table (id INTEGER PRIMARY KEY, data TEXT)")
+    con.executemany("INSERT INTO person_table (data) VALUES (?)",
+                    [(json.dumps(doc),) for doc in DOCS] + [("[1, 2]",), (None,)])
+    con.commit()
+    return con
+
+
+def test_profile_counts_keys_and_types(con):
+    profile = {p.key: p for p in JsonbColumn(dialect="sqlite").profile(con)}
+    assert profile["name"] == KeyProfile("name", "string", 4, 4 / 6, {"string": 4})
+    assert profile["age"].json_type == "number" and profile["age"].types == {"number": 3, "string": 1}
+    assert profile["vip"].json_type == "boolean" and profile["vip"].types["null"] == 1
+    assert profile["city"].rows == 1
+    assert JsonbColumn.hot_keys(profile.values()) == ["age", "name", "vip"]
+
+
+def test_profile_of_empty_table():
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE person_table (data TEXT)")
+    assert JsonbColumn(dialect="sqlite").profile(con) == []
+    assert JsonbColumn(dialect="sqlite").profile(con, sample=50) == []
+
+
+def test_promote_and_select_on_sqlite(con):
+    column = JsonbColumn(dialect="sqlite")
+    assert column.promote(con, keys=["name", "age"]) == {"name": "data_name", "age": "data_age"}
+    assert column.promote(con, keys=["name"]) == {}
+    indexes = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"person_table_data_name_idx", "person_table_data_age_idx"} <= indexes
+    sql, params = column.select_query(["name", "age", "city"], {"age": 42, "vip": True})
+    assert "data_age = ?" in sql and "json_extract(data, '$.vip') = ?" in sql
+    assert con.execute(sql, params).fetchall() == []
+    sql, params = column.select_query(["name", "age"], {"name": "Eve"}, limit=1)
+    # The guarded number column is NULL where "age" is not a JSON number.
+    assert con.execute(sql, params).fetchall() == [("Eve", None)]
+    assert JsonbColumn(dialect="sqlite", promoted=["name"]).select_query(["name"])[0] == \
+        "SELECT data_name AS name FROM person_table"
+
+
+def test_postgresql_sql():
+    column = JsonbColumn(promoted=["name"])
+    alter, index = column.promote_sql("age", "number")
+    assert "GENERATED ALWAYS AS (CASE WHEN jsonb_typeof(data->'age') = 'number'" in alter
+    assert alter.endswith("STORED") and "data_age" in index
+    assert "(data->>'code')::varchar(8)" in column.promote_sql("code", "string", "varchar(8)")[0]
+    sql, params = column.select_query(["name", "age"], {"name": "Ann", "age": 31, "vip": True})
+    assert "data_name = %s" in sql and "data @> %s::jsonb" in sql
+    assert params == ["Ann", json.dumps({"age": 31, "vip": True})]
+    assert "jsonb_path_ops" in column.gin_index_sql()
+    assert "TABLESAMPLE SYSTEM (10.0)" in column.profile_sql(sample=10)
+
+
+def test_rejects_unsafe_keys_and_types():
+    column = JsonbColumn()
+    with pytest.raises(ValueError):
+        column.promote_sql("age'; DROP TABLE x; --")
+    with pytest.raises(ValueError):
+        column.promote_sql("age", sql_type="int; DROP TABLE x")
+    with pytest.raises(ValueError):
+        column.promote_sql("tags", "array")
+    with pytest.raises(ValueError):
+        JsonbColumn(dialect="sqlite").gin_index_sql()
+
+
+SCHEMA = {"name": str, "age": int, "score": float, "vip": bool}
+
+
+def test_decoder_arrays_and_records():
+    docs = [
+        '{"name": "Ann", "age": 31, "score": 1.5, "vip": true}',
+        b'{"name": "Bob", "age": "42", "score": "2", "vip": "false"}',
+        {"name": 7, "age": 3.0, "score": None, "vip": 1},
+    ]
+    decoder = JsonRecordDecoder(SCHEMA)
+    arrays = decoder.arrays(docs)
+    assert arrays["name"].tolist() == ["Ann", "Bob", "7"]
+    assert arrays["age"].dtype == np.int64 and arrays["age"].tolist() == [31, 42, 3]
+    assert arrays["score"].tolist()[:2] == [1.5, 2.0] and math.isnan(arrays["score"][2])
+    assert arrays["vip"].dtype == bool and arrays["vip"].tolist() == [True, False, True]
+    records = decoder.records(docs)
+    assert records[1] == decoder.record_type("Bob", 42, 2.0, False)
+    assert not hasattr(records[0], "__dict__")
+
+
+def test_decoder_missing_malformed_and_overflow():
+    decoder = JsonRecordDecoder(SCHEMA)
+    docs = ['{"age": "n/a", "vip": null}', None, "null", "[1, 2]", {"age": 2 ** 70, "score": "abc"}]
+    arrays = decoder.arrays(docs)
+    assert arrays["age"].dtype == np.float64
+    assert np.isnan(arrays["age"][:4]).all() and arrays["age"][4] == float(2 ** 70)
+    assert np.isnan(arrays["score"]).all()
+    assert arrays["vip"].dtype == object and arrays["vip"].tolist() == [None] * 5
+    assert decoder.records(docs)[2] == decoder.record_type()
+    assert JsonRecordDecoder({"big": int}).arrays(['{"big": %d}' % 2 ** 70])["big"].tolist() == [2.0 ** 70]
+    with pytest.raises(json.JSONDecodeError):
+        decoder.arrays(["{not json"])
+    with pytest.raises(ValueError):
+        JsonRecordDecoder({"tags": list})
+
+
+def test_decoder_bool_strings():
+    decoder = JsonRecordDecoder({"vip": bool})
+    docs = [{"vip": v} for v in ("true", "T", "1", "false", "F", "0", "yes", "garbage", "")]
+    assert decoder.arrays(docs)["vip"].tolist() == [True] * 3 + [False] * 3 + [None] * 3
+    assert [r.vip for r in decoder.records(docs)] == [True] * 3 + [False] * 3 + [None] * 3
+    assert decoder.arrays(docs[:6])["vip"].dtype == bool
+
+
+def test_decoder_rows_and_empty_input():
+    decoder = JsonRecordDecoder(SCHEMA)
+    arrays = decoder.rows_to_arrays([("Ann", 31, 1.0, True), ("Bob", None, None, False)])
+    assert arrays["age"].dtype == np.float64 and math.isnan(arrays["age"][1])
+    empty = decoder.rows_to_arrays([])
+    assert all(len(array) == 0 for array in empty.values())
+    assert all(len(array) == 0 for array in decoder.arrays([]).values())
+    assert decoder.records([]) == []
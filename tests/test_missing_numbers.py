@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from odoo_pysql.missing_numbers import (
+    MissingNumberAccumulator,
+    find_missing_bitmap,
+    find_missing_number,
+    find_missing_numbers,
+    parallel_find_missing_numbers,
+)
+
+
+def shuffled_without(n, missing, seed=0):
+    values = np.setdiff1d(np.arange(1, n + 1), missing)
+    np.random.default_rng(seed).shuffle(values)
+    return values
+
+
+def test_single_missing_number():
+    assert find_missing_number([3, 7, 1, 2, 8, 4, 5]) == 6
+    assert find_missing_number(iter(shuffled_without(10_000, [1])), chunk_size=333) == 1
+    assert find_missing_number(shuffled_without(10_000, [10_000])) == 10_000
+    assert find_missing_number([]) == 1
+    with pytest.raises(ValueError):
+        find_missing_number([1, 2], n=5)
+
+
+@pytest.mark.parametrize("missing", [[1, 2], [5, 999, 1000], [17, 400, 401, 402, 999]])
+def test_k_missing_numbers(missing):
+    values = shuffled_without(1000, missing)
+    assert find_missing_numbers(values, 1000, len(missing), chunk_size=64) == missing
+    assert find_missing_numbers(values.tolist(), 1000, len(missing)) == missing
+
+
+def test_large_n_does_not_overflow():
+    # x**4 is far past int64 for x near n: the power sums must stay modular.
+    n = 200_000
+    missing = [1, 2, 100_000, n]
+    assert find_missing_numbers(shuffled_without(n, missing), n, 4) == missing
+
+
+def test_accumulators_merge():
+    values = shuffled_without(500, [7, 250])
+    left = MissingNumberAccumulator(500, 2).update(values[:100])
+    right = MissingNumberAccumulator(500, 2).update(values[100:])
+    assert left.merge(right).result() == [7, 250]
+    with pytest.raises(ValueError):
+        left.merge(MissingNumberAccumulator(500, 3))
+
+
+def test_invalid_inputs():
+    with pytest.raises(ValueError):
+        MissingNumberAccumulator(10, 0)
+    with pytest.raises(ValueError):
+        MissingNumberAccumulator(1, 2)
+    with pytest.raises(ValueError):
+        find_missing_numbers([1, 2, 3], 10, 2)
+    # Right count, but a duplicate instead of a gap.
+    with pytest.raises(ValueError):
+        find_missing_numbers([1, 1, 2, 3], 6, 2)
+
+
+def test_bitmap_ignores_duplicates_and_out_of_range():
+    values = [1, 2, 2, 5, 0, -3, 99, 8]
+    assert find_missing_bitmap(values, 8).tolist() == [3, 4, 6, 7]
+    assert find_missing_bitmap([], 3).tolist() == [1, 2, 3]
+
+
+def test_parallel_on_npy_file(tmp_path):
+    path = tmp_path / "values.npy"
+    np.save(path, shuffled_without(20_000, [3, 12_345]))
+    assert parallel_find_missing_numbers(str(path), 20_000, k=2, workers=2) == [3, 12_345]
+    raw = tmp_path / "values.bin"
+    shuffled_without(1000, [500]).astype(np.int32).tofile(raw)
+    assert parallel_find_missing_numbers(str(raw), 1000, dtype=np.int32, workers=2) == [500]
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from odoo_pysql.missing_values import MissingValuePipeline
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 1000
+    frame = pd.DataFrame({
+        "amount": rng.normal(100, 20, n),
+        "price": rng.uniform(1, 50, n),
+        "qty": rng.integers(1, 10, n).astype(float),
+        "name": rng.choice(["a", "b", "c"], n).astype(object),
+    })
+    for column, rate in (("amount", 0.1), ("price", 0.3), ("qty", 0.05), ("name", 0.02)):
+        frame.loc[rng.random(n) < rate, column] = np.nan
+    # A long gap crossing several chunk boundaries, and leading/trailing NaNs.
+    frame.loc[95:340, "price"] = np.nan
+    frame.loc[:3, "price"] = np.nan
+    frame.loc[990:, "price"] = np.nan
+    return frame
+
+
+@pytest.fixture
+def csv_path(tmp_path, frame):
+    path = tmp_path / "orders.csv"
+    frame.to_csv(path, index=False)
+    return path
+
+
+def expected_clean(frame, dropna=("name",)):
+    expected = frame.copy()
+    expected["price"] = expected["price"].interpolate()
+    expected["amount"] = expected["amount"].fillna(frame["amount"].mean())
+    expected["qty"] = expected["qty"].fillna(0.0)
+    return expected.dropna(subset=list(dropna)).reset_index(drop=True)
+
+
+def run(path, **kwargs):
+    pipeline = MissingValuePipeline(path, chunksize=64, impute_mean=["amount"], interpolate=["price"],
+                                    fill={"qty": 0.0}, dropna=["name"], **kwargs)
+    return pipeline, pd.concat(list(pipeline.transform()), ignore_index=True)
+
+
+def test_matches_in_memory_pandas(csv_path, frame):
+    pipeline, result = run(csv_path)
+    pd.testing.assert_frame_equal(result, expected_clean(frame))
+    profile = pipeline.null_profile()
+    assert profile.loc["price", "nulls"] == frame["price"].isna().sum()
+    assert profile.loc["amount", "mean"] == pytest.approx(frame["amount"].mean())
+    assert (profile["rows"] == len(frame)).all()
+
+
+def test_process_pool_gives_same_result(csv_path, frame):
+    _, result = run(csv_path, workers=2)
+    pd.testing.assert_frame_equal(result, expected_clean(frame))
+
+
+def test_to_csv_and_parquet_round_trip(csv_path, frame, tmp_path):
+    pipeline, _ = run(csv_path)
+    out = tmp_path / "clean.csv"
+    pipeline.to_csv(out)
+    pd.testing.assert_frame_equal(pd.read_csv(out), expected_clean(frame))
+    pytest.importorskip("pyarrow")
+    parquet = tmp_path / "orders.parquet"
+    frame.to_parquet(parquet, index=False)
+    pipeline, result = run(parquet)
+    pd.testing.assert_frame_equal(result, expected_clean(frame))
+
+
+def test_all_missing_column_and_dropna_everything(tmp_path):
+    path = tmp_path / "empty_column.csv"
+    pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [np.nan] * 3}).to_csv(path, index=False)
+    pipeline = MissingValuePipeline(path, chunksize=2, impute_mean=["b"], interpolate=["b"], dropna=True)
+    assert pd.concat(list(pipeline.transform())).empty
+    assert pipeline.null_profile().loc["b", "null_fraction"] == 1.0
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "header_only.csv"
+    path.write_text("a,b\n")
+    pipeline = MissingValuePipeline(path, interpolate=["a"])
+    profile = pipeline.fit()
+    assert list(profile.index) == ["a", "b"]
+    assert (profile["rows"] == 0).all() and (profile["nulls"] == 0).all()
+    chunks = list(pipeline.transform())
+    assert all(chunk.empty for chunk in chunks)
+    out = tmp_path / "clean.csv"
+    pipeline.to_csv(out)
+    assert list(pd.read_csv(out).columns) == ["a", "b"]
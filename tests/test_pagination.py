@@ -0,0 +1,111 @@
+import sqlite3
+
+import pytest
+
+from odoo_pysql.pagination import InvalidCursor, KeysetPaginator
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE orders (order_id INTEGER PRIMARY KEY, customer_id INTEGER, amount REAL NOT NULL)")
+    con.executemany("INSERT INTO orders VALUES (?, ?, ?)", [(i, i % 7, float(i % 13)) for i in range(1, 201)])
+    return con
+
+
+def all_pages(paginator, con, **kwargs):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = paginator.fetch_page(con, cursor, **kwargs)
+        pages.append(rows)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("order_by", [(("amount", "desc"), ("order_id", "desc")),
+                                      (("amount", "asc"), ("order_id", "asc")),
+                                      (("amount", "desc"), ("order_id", "asc"))])
+def test_pages_match_offset_paging(con, order_by):
+    paginator = KeysetPaginator("orders", order_by=order_by, columns=("order_id", "amount"),
+                                page_size=30, paramstyle="qmark")
+    order = ", ".join("%s %s" % pair for pair in order_by)
+    expected = con.execute("SELECT order_id, amount FROM orders ORDER BY %s" % order).fetchall()
+    pages = all_pages(paginator, con)
+    assert [len(page) for page in pages] == [30] * 6 + [20]
+    assert [row for page in pages for row in page] == expected
+
+
+def test_where_filter_and_empty_result(con):
+    paginator = KeysetPaginator("orders", page_size=10, paramstyle="qmark")
+    pages = all_pages(paginator, con, where="customer_id = ?", where_params=(3,))
+    rows = [row for page in pages for row in page]
+    assert len(rows) == 29 and all(row[1] == 3 for row in rows)
+    assert paginator.fetch_page(con, where="customer_id = ?", where_params=(99,)) == ([], None)
+
+
+def test_page_query_sql():
+    sql, params = KeysetPaginator("orders", page_size=5).page_query(
+        KeysetPaginator("orders").encode_cursor([9.5, 17]))
+    assert sql == ("SELECT * FROM orders WHERE (amount, order_id) < (%s, %s) "
+                   "ORDER BY amount DESC, order_id DESC LIMIT %s")
+    assert params == [9.5, 17, 5]
+
+
+def test_signed_cursors():
+    paginator = KeysetPaginator("orders", secret="s3cret")
+    token = paginator.encode_cursor([1.0, 2])
+    assert paginator.decode_cursor(token) == [1.0, 2]
+    with pytest.raises(InvalidCursor):
+        paginator.decode_cursor(KeysetPaginator("orders").encode_cursor([1.0, 2]))
+    with pytest.raises(InvalidCursor):
+        KeysetPaginator("orders").decode_cursor("not-base64!")
+    with pytest.raises(InvalidCursor):
+        KeysetPaginator("orders").decode_cursor(KeysetPaginator("orders").encode_cursor([1]))
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        KeysetPaginator("orders", order_by=[("amount", "sideways")])
+    with pytest.raises(ValueError):
+        KeysetPaginator("orders", order_by=[])
+    with pytest.raises(ValueError):
+        KeysetPaginator("orders; drop table orders")
+
+
+class FakeConnection:
+    def __init__(self, autocommit):
+        self.autocommit = autocommit
+        self.executed = []
+        self.commits = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.executed.append(sql)
+
+    def close(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_ensure_index(con):
+    paginator = KeysetPaginator("orders", paramstyle="qmark")
+    paginator.ensure_index(con)
+    paginator.ensure_index(con)
+    names = [r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+    assert paginator.index_name() in names
+
+
+def test_ensure_index_concurrently_needs_autocommit():
+    paginator = KeysetPaginator("orders")
+    in_transaction = FakeConnection(autocommit=False)
+    with pytest.raises(ValueError, match="autocommit"):
+        paginator.ensure_index(in_transaction, concurrently=True)
+    assert in_transaction.executed == []
+    autocommit = FakeConnection(autocommit=True)
+    paginator.ensure_index(autocommit, concurrently=True)
+    assert autocommit.executed == [paginator.index_sql(concurrently=True)] and autocommit.commits == 0
+    assert autocommit.executed[0].startswith("CREATE INDEX CONCURRENTLY IF NOT EXISTS orders_amount_order_id")
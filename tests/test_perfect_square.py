@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+import pytest
+
+from odoo_pysql.perfect_square import is_perfect_square, is_perfect_square_batch
+
+
+def reference(n):
+    return n >= 0 and math.isqrt(n) ** 2 == n
+
+
+@pytest.mark.parametrize("num, expected", [
+    (0, True), (1, True), (16, True), (14, False), (-4, False),
+    (16.0, True), (4.5, False), (-4.0, False), (float("inf"), False), (float("nan"), False),
+    (np.float64(2.25), False), (np.int64(49), True), (True, True), (False, True),
+    ((2 ** 53 + 1) ** 2, True), ((2 ** 53 + 1) ** 2 + 1, False), (10 ** 40, True),
+])
+def test_single_values(num, expected):
+    assert is_perfect_square(num) is expected
+
+
+def test_batch_matches_exact_check():
+    rng = np.random.default_rng(0)
+    roots = rng.integers(0, 3_037_000_499, 10_000)
+    values = np.concatenate((roots * roots, roots * roots + 1, roots * roots - 1,
+                             rng.integers(-1000, 1000, 1000), [np.iinfo(np.int64).max, 0]))
+    mask = is_perfect_square_batch(values)
+    assert mask.tolist() == [reference(int(v)) for v in values]
+
+
+def test_batch_shapes_and_sources():
+    assert is_perfect_square_batch(np.array([[4, 5], [9, -9]])).tolist() == [[True, False], [True, False]]
+    assert is_perfect_square_batch(iter([1, 2, 3, 4])).tolist() == [True, False, False, True]
+    assert is_perfect_square_batch([]).shape == (0,)
+    assert is_perfect_square_batch(np.array([], dtype=np.int64)).shape == (0,)
+
+
+def test_batch_big_values():
+    big = (2 ** 40 + 3) ** 2
+    assert is_perfect_square_batch([big, big + 1, 4]).tolist() == [True, False, True]
+    unsigned = np.array([2 ** 64 - 1, (2 ** 32 - 1) ** 2, 25], dtype=np.uint64)
+    assert is_perfect_square_batch(unsigned).tolist() == [False, True, True]
+
+
+def test_batch_big_ints_mixed_with_negatives():
+    # NumPy infers float64 for these; they must still be checked exactly.
+    assert is_perfect_square_batch([2 ** 63, -1, 4]).tolist() == [False, False, True]
+    assert is_perfect_square_batch([(2 ** 40 + 1) ** 2, -4, np.int64(9)]).tolist() == [True, False, True]
+    with pytest.raises(TypeError):
+        is_perfect_square_batch([4.0, -1])
+
+
+def test_batch_bools_are_zero_and_one():
+    assert is_perfect_square_batch(np.array([False, True])).tolist() == [True, True]
+
+
+def test_batch_rejects_floats():
+    with pytest.raises(TypeError):
+        is_perfect_square_batch(np.array([4.0, 4.5]))
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from odoo_pysql.pipeline import Pipeline
+
+
+def is_even(x):
+    return x % 2 == 0
+
+
+def square(x):
+    return x ** 2
+
+
+def test_fused_stages_match_comprehension():
+    expected = [x ** 2 for x in range(1000) if x % 2 == 0]
+    assert Pipeline(range(1000)).filter(is_even).map(square).to_list() == expected
+    assert Pipeline(range(1000), vectorize=True, chunksize=64).filter(is_even).map(square).to_list() == expected
+    assert Pipeline(iter(range(1000)), chunksize=7).filter(is_even).map(square).to_tuple() == tuple(expected)
+
+
+def test_default_keeps_python_integers():
+    result = Pipeline(range(3_000_000)).map(lambda x: x ** 3).to_list()
+    assert result[-1] == 2_999_999 ** 3
+    assert all(type(x) is int for x in result[:10])
+
+
+def test_default_division_by_zero_raises():
+    with pytest.raises(ZeroDivisionError):
+        Pipeline([1.0, 0.0]).map(lambda x: 1 / x).to_list()
+
+
+def test_vectorized_results_are_python_scalars():
+    result = Pipeline(np.arange(10), vectorize=True).map(square).to_list()
+    assert result == [x ** 2 for x in range(10)] and type(result[0]) is int
+    assert list(Pipeline(pd.Series([1.5, 2.5]), vectorize=True).map(square)) == [2.25, 6.25]
+
+
+def test_stages_run_once_per_item():
+    calls = []
+
+    def counted(x):
+        calls.append(x)
+        return x + 1
+
+    assert Pipeline(range(100), vectorize=True).map(counted).to_list() == list(range(1, 101))
+    assert len(calls) == 1
+    calls.clear()
+    assert Pipeline(range(100)).map(counted).to_list() == list(range(1, 101))
+    assert len(calls) == 100
+
+
+def test_non_vectorizable_stage_falls_back_per_item():
+    calls = []
+
+    def label(x):
+        calls.append(x)
+        return "n%d" % x
+
+    result = Pipeline(range(200), vectorize=True, chunksize=50).map(label).to_list()
+    assert result == ["n%d" % x for x in range(200)]
+    # One failed array call on the first chunk, then one call per item.
+    assert len(calls) == 201
+
+
+def test_to_dict_sinks():
+    pairs = Pipeline(range(5)).map(lambda x: (x, x * 10)).to_dict()
+    assert pairs == {x: x * 10 for x in range(5)}
+    keyed = Pipeline(range(5), vectorize=True).filter(is_even).to_dict(key=square)
+    assert keyed == {0: 0, 4: 2, 16: 4}
+    assert Pipeline(range(5)).to_dict(key=str, value=square) == {str(x): x * x for x in range(5)}
+    with pytest.raises(ValueError):
+        Pipeline(range(5)).to_dict(value=square)
+
+
+def test_to_array_and_empty_sources():
+    assert Pipeline(range(5), vectorize=True).map(square).to_array().tolist() == [0, 1, 4, 9, 16]
+    assert Pipeline([]).to_array().shape == (0,)
+    assert Pipeline([]).map(square).to_list() == []
+    assert Pipeline(range(0), vectorize=True).map(square).to_list() == []
+    assert list(Pipeline(np.array([]), vectorize=True)) == []
+
+
+def test_vectorize_rejects_non_numeric_source():
+    with pytest.raises(ValueError):
+        Pipeline(["a", "b"], vectorize=True).to_list()
+
+
+def test_lazy_iteration():
+    consumed = []
+
+    def source():
+        for x in range(10):
+            consumed.append(x)
+            yield x
+
+    iterator = iter(Pipeline(source()).filter(is_even).map(square))
+    assert next(iterator) == 0 and next(iterator) == 4
+    assert consumed == [0, 1, 2]
+
+
+def test_vectorized_generator_source():
+    expected = [square(x) for x in range(100) if is_even(x)]
+    assert list(Pipeline((x for x in range(100)), vectorize=True).filter(is_even).map(square)) == expected
+    assert Pipeline((x for x in range(100)), vectorize=True, chunksize=16).filter(is_even).map(square).to_list() \
+        == expected
+    assert Pipeline(iter([]), vectorize=True).to_list() == []
+    with pytest.raises(ValueError):
+        Pipeline(iter(["a"]), vectorize=True).to_list()
+
+
+def test_vectorized_generator_is_read_chunk_by_chunk():
+    consumed = []
+
+    def source():
+        for x in range(100):
+            consumed.append(x)
+            yield x
+
+    iterator = iter(Pipeline(source(), vectorize=True, chunksize=10).map(square))
+    assert next(iterator) == 0
+    assert len(consumed) == 10
+
+
+def test_workers(tmp_path):
+    expected = [x ** 2 for x in range(1000)]
+    assert Pipeline(range(1000), chunksize=100).map(square).to_list(workers=2) == expected
+    assert Pipeline(range(1000), vectorize=True, chunksize=100).map(square).to_list(workers=2) == expected
@@ -0,0 +1,120 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from odoo_pysql.records import PersonTable, RecordTable, record_class
+
+
+def test_record_class_has_slots_and_patchable_methods():
+    Person = record_class("Person", [("name", str), ("age", int)])
+    person = Person("ann", 32)
+    assert not hasattr(person, "__dict__")
+    with pytest.raises(AttributeError):
+        person.nickname = "a"
+    Person.greet = lambda self: "hi " + self.name
+    assert person.greet() == "hi ann"
+    Frozen = record_class("Frozen", ["value"], frozen=True)
+    with pytest.raises(Exception):
+        Frozen(1).value = 2
+
+
+def test_append_and_row_views():
+    table = PersonTable(capacity=1)
+    for i in range(10):
+        table.append("person %d" % i, 20 + i)
+    table.append(name="named", age=70)
+    assert len(table) == 11 and table.capacity >= 11
+    row = table[-1]
+    assert (row.name, row.age) == ("named", 70) and type(row.age) is int
+    row.name = "renamed"
+    row.age = 71
+    assert tuple(table[10]) == ("renamed", 71)
+    assert table[0] == table[0] and table[0] != table[1]
+    with pytest.raises(IndexError):
+        table[11]
+
+
+def test_numeric_fields_accept_floats_and_numpy_scalars():
+    table = PersonTable()
+    row = table.append("a", 32.0)
+    assert row.age == 32
+    table.append("b", np.int64(33))
+    table.append("c", np.float32(34))
+    row.age = np.int8(40)
+    assert table.column("age").tolist() == [40, 33, 34]
+    scores = RecordTable({"score": float, "flag": bool})
+    scores.append(np.int64(3), np.bool_(True))
+    assert tuple(scores[0]) == (3.0, True)
+
+
+@pytest.mark.parametrize("age, error", [(32.5, ValueError), (40_000, OverflowError), (float("nan"), ValueError),
+                                        ("x", ValueError), (None, TypeError)])
+def test_invalid_numeric_values_are_rejected(age, error):
+    table = PersonTable()
+    table.append("ok", 1)
+    with pytest.raises(error):
+        table.append("bad", age)
+    with pytest.raises(error):
+        table[0].age = age
+    assert len(table) == 1 and tuple(table[0]) == ("ok", 1)
+
+
+def test_bulk_loads_agree():
+    rows = [("ann", 32), (None, 40), ("zoë", 18)]
+    from_rows = PersonTable.from_rows(rows)
+    frame = pd.DataFrame(rows, columns=["name", "age"])
+    from_frame = PersonTable.from_frame(frame)
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE employees (age INTEGER, name TEXT)")
+    con.executemany("INSERT INTO employees VALUES (?, ?)", [(age, name) for name, age in rows])
+    from_cursor = PersonTable.from_cursor(con.execute("SELECT age, name FROM employees"), arraysize=2)
+    for table in (from_rows, from_frame, from_cursor):
+        assert list(table.itertuples(chunksize=2)) == rows
+        assert table.column("age").dtype == np.int16
+    pd.testing.assert_frame_equal(from_rows.to_frame(), frame.astype({"age": np.int16}))
+    assert [(r.name, r.age) for r in from_rows.records()] == rows
+
+
+@pytest.mark.parametrize("age", [30.7, float("nan"), float("inf")])
+def test_bulk_loads_reject_non_integral_values(age):
+    with pytest.raises(ValueError):
+        PersonTable.from_rows([("a", 30), ("b", age)])
+    with pytest.raises(ValueError):
+        PersonTable.from_frame(pd.DataFrame({"name": ["a", "b"], "age": [30.0, age]}))
+    table = PersonTable.from_rows([("ok", 1)])
+    with pytest.raises(ValueError):
+        table.extend([("new", 2), ("bad", age)])
+    assert list(table.itertuples()) == [("ok", 1)]
+    assert list(PersonTable.from_rows([("a", 30.0)]).itertuples()) == [("a", 30)]
+
+
+def test_bulk_overflow_and_shape_errors():
+    with pytest.raises(OverflowError):
+        PersonTable.from_rows([("a", 40_000)])
+    table = PersonTable()
+    with pytest.raises(ValueError):
+        table.extend_columns({"name": ["a"], "age": [1, 2]})
+    with pytest.raises(TypeError):
+        table.append("a")
+    with pytest.raises(ValueError):
+        PersonTable.from_cursor(sqlite3.connect(":memory:").execute("SELECT 1 AS age"))
+    with pytest.raises(ValueError):
+        RecordTable({})
+
+
+def test_empty_table():
+    table = PersonTable()
+    assert len(table) == 0 and list(table) == [] and list(table.itertuples()) == []
+    assert table.column("name").shape == (0,) and len(table.to_frame()) == 0
+    table.extend([])
+    assert len(PersonTable.from_rows([])) == 0
+
+
+def test_compact_drops_rewritten_strings():
+    table = PersonTable.from_rows([("a" * 10, 1), ("b", 2)])
+    table[0].name = "short"
+    assert table._columns[0].garbage == 10
+    table.compact()
+    assert table._columns[0].garbage == 0 and list(table.itertuples()) == [("short", 1), ("b", 2)]
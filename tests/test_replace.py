@@ -0,0 +1,105 @@
+import pickle
+import random
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from odoo_pysql.replace import BULK_MAX_RULES, ReplacementRules
+
+
+def reference(rules, text):
+    """Leftmost-longest, simultaneous replacement via one regex alternation."""
+    pattern = re.compile("|".join(re.escape(p) for p in sorted(rules, key=len, reverse=True)))
+    return pattern.sub(lambda m: rules[m.group()], text)
+
+
+def random_rules(rng, count):
+    rules = {}
+    while len(rules) < count:
+        pattern = "".join(rng.choice("abcd") for _ in range(rng.randint(1, 4)))
+        rules[pattern] = "".join(rng.choice("abxyz") for _ in range(rng.randint(0, 3)))
+    return rules
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_matches_reference_on_random_rules(seed):
+    rng = random.Random(seed)
+    rules = random_rules(rng, rng.randint(1, 12))
+    compiled = ReplacementRules(rules)
+    texts = ["".join(rng.choice("abcde ") for _ in range(rng.randint(0, 40))) for _ in range(50)]
+    expected = [reference(rules, t) for t in texts]
+    assert [compiled.apply(t) for t in texts] == expected
+    assert compiled.apply_many(texts) == expected
+
+
+def test_longest_match_wins_and_output_is_not_rescanned():
+    rules = ReplacementRules({"Co.": "Company", "C": "K", " ": "-", "K": "C"})
+    assert rules.apply("Acme Co. C K") == "Acme-Company-K-C"
+
+
+def test_bulk_path_selection():
+    assert ReplacementRules({"ab": "x", "cd": "y", "e": "f"}).bulk
+    # "abc" ends with "bc" ... "bcd" starts with it: partial overlap.
+    assert not ReplacementRules({"abc": "1", "bcd": "2"}).bulk
+    many = {"p%03d" % i: str(i) for i in range(BULK_MAX_RULES + 1)}
+    assert not ReplacementRules(many).bulk
+    assert not ReplacementRules({"ab": "\uE000"}).bulk
+
+
+def test_placeholder_characters_in_text_are_kept():
+    rules = ReplacementRules({"ab": "x", "cd": "y"})
+    texts = ["\uE000ab\uE001cd", "ab\uFDD0cd", "plain ab"]
+    assert rules.apply_many(texts) == [reference(rules.rules, t) for t in texts]
+
+
+def test_empty_rules_and_empty_input():
+    assert ReplacementRules({}).apply("unchanged") == "unchanged"
+    rules = ReplacementRules({"ab": "x"})
+    assert rules.apply("") == ""
+    assert rules.apply_many([]) == []
+    with pytest.raises(ValueError):
+        ReplacementRules({"": "x"})
+
+
+def test_non_strings_pass_through():
+    rules = ReplacementRules({"ab": "x", " ": "_"})
+    records = ["a b", None, np.nan, 3, "abab"]
+    result = rules.apply_many(records)
+    assert result[0] == "a_b" and result[4] == "xx"
+    assert result[1] is None and result[2] is records[2] and result[3] == 3
+
+
+def test_apply_series_keeps_index_name_and_missing_values():
+    series = pd.Series(["ab cd", None, "cdab"], index=[10, 20, 30], name="ref", dtype=object)
+    result = ReplacementRules({"ab": "x", "cd": "y"}).apply_series(series)
+    assert result.tolist() == ["x y", None, "yx"]
+    assert result.index.tolist() == [10, 20, 30] and result.name == "ref"
+
+
+def test_workers_and_pickling():
+    rules = ReplacementRules({"abc": "1", "bcd": "2", "a": "A"})
+    clone = pickle.loads(pickle.dumps(rules))
+    assert clone.apply("abcd") == rules.apply("abcd")
+    records = ["abcd %d" % i for i in range(300)]
+    assert rules.apply_many(records, workers=2, chunksize=64) == rules.apply_many(records)
+
+
+@pytest.mark.parametrize("workers", [None, 3])
+def test_apply_file(tmp_path, workers):
+    rules = ReplacementRules({"Co.": "Company", "é": "e", "\t": " "})
+    lines = ["Acme Co.\tcafé %d\n" % i for i in range(500)] + ["last Co. line without newline"]
+    src = tmp_path / "in.txt"
+    src.write_text("".join(lines), encoding="utf-8")
+    dst = tmp_path / "out.txt"
+    rules.apply_file(src, dst, workers=workers)
+    assert dst.read_text(encoding="utf-8") == "".join(reference(rules.rules, line) for line in lines)
+
+
+def test_apply_empty_file(tmp_path):
+    src = tmp_path / "empty.txt"
+    src.write_text("")
+    dst = tmp_path / "out.txt"
+    ReplacementRules({"a": "b"}).apply_file(src, dst, workers=2)
+    assert dst.read_text() == ""
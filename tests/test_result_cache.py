@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+
+from odoo_pysql.result_cache import ResultCache, normalize_sql, notify_trigger_sql, referenced_tables
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(":memory:")
+    con.executescript("""
+        CREATE TABLE customers (customer_id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE orders (order_id INTEGER PRIMARY KEY, customer_id INTEGER, amount REAL);
+        INSERT INTO customers VALUES (1, 'ann'), (2, 'bob');
+        INSERT INTO orders VALUES (10, 1, 5.0), (11, 1, 7.5), (12, 2, 1.0);
+    """)
+    return con
+
+
+JOIN = ("SELECT o.order_id, c.name FROM orders o JOIN customers c ON c.customer_id = o.customer_id"
+        " WHERE c.customer_id = ?")
+
+
+def test_normalize_sql():
+    sql = "SELECT  *\n FROM Orders -- all\n WHERE name = 'Ann';"
+    assert normalize_sql(sql) == "select * from orders where name = 'Ann'"
+    assert normalize_sql('select "Mixed" from t') == 'select "Mixed" from t'
+
+
+def test_referenced_tables():
+    assert referenced_tables(JOIN) == {"orders", "customers"}
+    assert referenced_tables("WITH big AS (SELECT * FROM orders) SELECT * FROM big, customers") == \
+        {"orders", "customers"}
+    assert referenced_tables("SELECT * FROM public.orders WHERE note = 'from secret'") == {"orders"}
+    assert referenced_tables("SELECT (SELECT max(amount) FROM orders) FROM customers") == {"orders", "customers"}
+
+
+def test_hits_misses_and_invalidation(con):
+    cache = ResultCache()
+    first = cache.fetch(con, JOIN, (1,))
+    assert first == ((10, "ann"), (11, "ann"))
+    assert cache.fetch(con, JOIN.lower(), (1,)) == first and cache.stats["hits"] == 1
+    assert cache.fetch(con, JOIN, (2,)) == ((12, "bob"),)
+    assert cache.execute_write(con, "UPDATE customers SET name = 'anne' WHERE customer_id = 1") == 1
+    assert len(cache) == 0 and cache.stats["invalidations"] == 2
+    assert cache.fetch(con, JOIN, (1,)) == ((10, "anne"), (11, "anne"))
+    with pytest.raises(ValueError):
+        cache.execute_write(con, "SELECT 1")
+
+
+def test_cached_rows_cannot_be_mutated(con):
+    cache = ResultCache()
+    rows = cache.fetch(con, "SELECT order_id FROM orders ORDER BY order_id")
+    assert isinstance(rows, tuple)
+    with pytest.raises(AttributeError):
+        rows.append((99,))
+    cache.put("SELECT 1", (), [(1,)], tables=())
+    assert cache.get("SELECT 1") == ((1,),)
+
+
+def test_empty_result_is_cached(con):
+    cache = ResultCache()
+    assert cache.fetch(con, "SELECT * FROM orders WHERE amount < 0") == ()
+    assert cache.get("SELECT * FROM orders WHERE amount < 0") == ()
+    assert cache.stats["hits"] == 1
+
+
+def test_stale_result_is_not_stored():
+    cache = ResultCache()
+    versions = cache.versions({"orders"})
+    cache.invalidate("orders")
+    assert not cache.put("SELECT * FROM orders", (), [(1,)], versions=versions)
+    assert cache.stats["stale_skipped"] == 1 and len(cache) == 0
+
+
+def test_bounds_evict_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    for i in range(3):
+        cache.put("SELECT %d FROM t" % i, (), [(i,)])
+    assert ("select 0 from t", ()) not in cache and len(cache) == 2 and cache.stats["evictions"] == 1
+    small = ResultCache(max_bytes=200)
+    assert not small.put("SELECT * FROM t", (), [("x" * 500,)])
+    assert small.stats["too_large"] == 1
+
+
+def test_sqlite_triggers_invalidate(con):
+    cache = ResultCache()
+    cache.attach_sqlite(con, ["orders"])
+    cache.fetch(con, "SELECT sum(amount) FROM orders")
+    con.execute("INSERT INTO orders VALUES (13, 2, 2.0)")
+    assert len(cache) == 0
+    assert cache.fetch(con, "SELECT sum(amount) FROM orders") == ((15.5,),)
+
+
+def test_notify_trigger_sql():
+    statements = notify_trigger_sql("orders")
+    assert "FOR EACH STATEMENT EXECUTE FUNCTION result_cache_notify('result_cache')" in statements[-1]
+    with pytest.raises(ValueError):
+        notify_trigger_sql("orders; drop table x")
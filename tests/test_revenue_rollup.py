@@ -0,0 +1,128 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from odoo_pysql.revenue_rollup import MonthlyRevenueRollup, month_bounds, revenue_range_query
+
+SCHEMA = "CREATE TABLE invoices (id INTEGER PRIMARY KEY, invoice_date DATE, amount NUMERIC)"
+
+INVOICES = [
+    ("2023-01-05", 100.0), ("2023-01-31", 50.0), ("2023-02-01", 25.0),
+    ("2023-12-31", 10.0), ("2024-01-01", 7.0), ("2023-03-15", None),
+]
+
+
+@pytest.fixture
+def con():
+    con = sqlite3.connect(":memory:")
+    con.execute(SCHEMA)
+    con.executemany("INSERT INTO invoices (invoice_date, amount) VALUES (?, ?)", INVOICES)
+    con.commit()
+    return con
+
+
+def rollup_rows(con):
+    return con.execute("SELECT year, month, revenue, invoice_count FROM monthly_revenue "
+                       "WHERE invoice_count != 0 ORDER BY 1, 2").fetchall()
+
+
+def test_month_bounds():
+    assert month_bounds(2023) == (datetime.date(2023, 1, 1), datetime.date(2024, 1, 1))
+    assert month_bounds(2023, 12) == (datetime.date(2023, 12, 1), datetime.date(2024, 1, 1))
+    assert month_bounds(2024, 2) == (datetime.date(2024, 2, 1), datetime.date(2024, 3, 1))
+
+
+def test_range_query_is_sargable(con):
+    sql, params = revenue_range_query(*month_bounds(2023), dialect="sqlite")
+    assert "WHERE invoice_date >= ? AND invoice_date < ?" in sql
+    assert con.execute(sql, params).fetchall() == [(2023, 1, 150), (2023, 2, 25), (2023, 3, None), (2023, 12, 10)]
+    pg_sql, _ = revenue_range_query(*month_bounds(2023))
+    assert "%s" in pg_sql and "EXTRACT(YEAR FROM invoice_date)" in pg_sql
+
+
+def test_install_backfills_and_triggers_keep_it_current(con):
+    rollup = MonthlyRevenueRollup(dialect="sqlite")
+    rollup.install(con)
+    assert rollup_rows(con) == [(2023, 1, 150, 2), (2023, 2, 25, 1), (2023, 3, 0, 1), (2023, 12, 10, 1),
+                                (2024, 1, 7, 1)]
+    con.execute("INSERT INTO invoices (invoice_date, amount) VALUES ('2023-02-10', 5)")
+    con.execute("UPDATE invoices SET invoice_date = '2023-02-20' WHERE invoice_date = '2023-01-31'")
+    con.execute("DELETE FROM invoices WHERE invoice_date = '2024-01-01'")
+    con.commit()
+    assert rollup_rows(con) == [(2023, 1, 100, 1), (2023, 2, 80, 3), (2023, 3, 0, 1), (2023, 12, 10, 1)]
+    assert rollup.monthly_revenue(con, 2023)[:2] == [(1, 100), (2, 80)]
+    assert rollup.verify(con) == []
+
+
+def test_invoices_without_date_are_ignored(con):
+    rollup = MonthlyRevenueRollup(dialect="sqlite")
+    con.execute("INSERT INTO invoices (invoice_date, amount) VALUES (NULL, 999)")
+    rollup.install(con)
+    con.execute("INSERT INTO invoices (invoice_date, amount) VALUES (NULL, 1)")
+    con.execute("UPDATE invoices SET invoice_date = '2023-01-10' WHERE amount = 999")
+    con.execute("UPDATE invoices SET invoice_date = NULL WHERE invoice_date = '2023-12-31'")
+    con.commit()
+    assert (2023, 1, 1149, 3) in rollup_rows(con)
+    assert (2023, 12, 10, 1) not in rollup_rows(con)
+    assert rollup.verify(con) == []
+    rollup.apply_changes(con, [("insert", None, {"invoice_date": None, "amount": 5})])
+    assert rollup.verify(con) == []
+
+
+def test_apply_changes_batches_deltas(con):
+    rollup = MonthlyRevenueRollup(dialect="sqlite")
+    rollup.install(con, triggers=False)
+    events = [
+        ("insert", None, {"invoice_date": datetime.date(2023, 5, 1), "amount": 40}),
+        ("insert", None, {"invoice_date": "2023-05-20", "amount": None}),
+        ("update", {"invoice_date": "2023-01-05", "amount": 100},
+         {"invoice_date": datetime.datetime(2023, 5, 2, 10, 0), "amount": 60}),
+        ("delete", {"invoice_date": "2023-05-01", "amount": 40}, None),
+        ("insert", None, {"invoice_date": "2023-05-01", "amount": 40}),
+    ]
+    assert rollup.apply_changes(con, events) == 2
+    months = {(y, m): (revenue, count) for y, m, revenue, count in rollup_rows(con)}
+    assert months[2023, 1] == (50, 1) and months[2023, 5] == (100, 3)
+    assert rollup.apply_changes(con, []) == 0
+    with pytest.raises(ValueError):
+        rollup.apply_changes(con, [("merge", None, None)])
+
+
+def test_backfill_range_and_verify_repair(con):
+    rollup = MonthlyRevenueRollup(dialect="sqlite")
+    rollup.install(con, triggers=False)
+    con.execute("INSERT INTO invoices (invoice_date, amount) VALUES ('2023-02-15', 1000)")
+    con.execute("INSERT INTO invoices (invoice_date, amount) VALUES ('2023-12-02', 1)")
+    con.commit()
+    drift = rollup.verify(con)
+    assert [(y, m) for y, m, *_ in drift] == [(2023, 2), (2023, 12)]
+    rollup.backfill(con, start="2023-02-10", end="2023-02-11")
+    assert [(y, m) for y, m, *_ in rollup.verify(con)] == [(2023, 12)]
+    assert rollup.verify(con, repair=True)
+    assert rollup.verify(con) == []
+
+
+def test_schema_qualified_tables_on_sqlite(con):
+    rollup = MonthlyRevenueRollup(invoices="main.invoices", dialect="sqlite")
+    assert all("main.invoices_" not in s.split(" ON ")[0] for s in rollup.trigger_sql())
+    rollup.install(con)
+    con.execute("INSERT INTO invoices (invoice_date, amount) VALUES ('2023-02-10', 5)")
+    con.commit()
+    assert (2023, 2, 30, 2) in rollup_rows(con)
+    assert rollup.verify(con) == []
+
+
+def test_rejects_unsafe_identifiers():
+    with pytest.raises(ValueError):
+        MonthlyRevenueRollup(invoices="invoices; DROP TABLE x")
+    with pytest.raises(ValueError):
+        MonthlyRevenueRollup(dialect="oracle")
+
+
+def test_postgresql_triggers_are_statement_level():
+    statements = MonthlyRevenueRollup().trigger_sql()
+    assert "LANGUAGE plpgsql" in statements[0]
+    creates = [s for s in statements if s.startswith("CREATE TRIGGER")]
+    assert len(creates) == 3 and all("FOR EACH STATEMENT" in s for s in creates)
+    assert "OLD TABLE AS old_rows NEW TABLE AS new_rows" in creates[1]
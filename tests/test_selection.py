@@ -0,0 +1,124 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from odoo_pysql.selection import (MAX_NESTED, MAX_PASSES, index_sql, nth_highest_sql, nth_largest_distinct,
+                                  nth_largest_distinct_by, top_k)
+
+
+def reference_nth(values, n):
+    distinct = sorted({v for v in values if v is not None and v == v}, reverse=True)
+    return distinct[n - 1] if len(distinct) >= n else None
+
+
+@pytest.mark.parametrize("n", [1, 2, MAX_PASSES, MAX_PASSES + 1, 50, 400])
+def test_nth_largest_distinct_matches_sort(n):
+    rng = np.random.default_rng(n)
+    ints = rng.integers(0, 300, 5000)
+    floats = ints / 3.0
+    floats[rng.random(len(floats)) < 0.1] = np.nan
+    for values in (ints, floats, pd.Series(floats), list(floats), ints.tolist()):
+        assert nth_largest_distinct(values, n) == reference_nth(list(values), n)
+
+
+def test_nth_largest_distinct_missing_and_edge_cases():
+    assert nth_largest_distinct(np.array([]), 2) is None
+    assert nth_largest_distinct([], 1) is None
+    assert nth_largest_distinct(np.array([np.nan, np.nan]), 1) is None
+    assert nth_largest_distinct(np.array([5, 5, 5]), 2) is None
+    assert nth_largest_distinct(np.array([5, 5, 5]), 10) is None
+    assert nth_largest_distinct([3, None, 1, pd.NA, 3, float("nan")], 2) == 1
+    assert nth_largest_distinct(pd.Series([3, None, 1], dtype="Int64"), 2) == 1.0
+    assert nth_largest_distinct(np.array([3, None, 7], dtype=object), 1) == 7.0
+    assert isinstance(nth_largest_distinct(np.array([1, 2, 3]), 2), int)
+    with pytest.raises(ValueError):
+        nth_largest_distinct([1], 0)
+
+
+@pytest.mark.parametrize("n", [1, 2, MAX_PASSES + 1, 30])
+def test_nth_largest_distinct_by_matches_pandas(n):
+    rng = np.random.default_rng(n)
+    size = 40_000
+    frame = pd.DataFrame({
+        "department": rng.choice(np.array(["hr", "it", "ops", "tiny", None], dtype=object), size,
+                                 p=[0.3, 0.3, 0.3, 0.0005, 0.0995]),
+        "salary": rng.integers(1000, 1400, size).astype(float),
+    })
+    frame.loc[rng.random(size) < 0.05, "salary"] = np.nan
+    result = nth_largest_distinct_by(frame["salary"], frame["department"], n)
+    for department, group in frame.dropna(subset=["department"]).groupby("department"):
+        expected = reference_nth(group["salary"].tolist(), n)
+        assert (np.isnan(result[department]) if expected is None else result[department] == expected)
+    assert None not in result.index.tolist() and result.index.name == "department"
+    with pytest.raises(ValueError):
+        nth_largest_distinct_by([1.0], ["a"], 0)
+
+
+def test_nth_largest_distinct_by_empty():
+    assert nth_largest_distinct_by([], [], 2).empty
+
+
+@pytest.mark.parametrize("values", [np.arange(20) % 7, np.linspace(0, 1, 20), list(np.arange(20) % 7)])
+def test_top_k(values):
+    expected = sorted(values, reverse=True)[:5]
+    assert list(top_k(values, 5)) == expected
+    assert [values[i] for i in top_k(values, 5, positions=True)] == expected
+    assert len(top_k(values, 100)) == len(values)
+    assert len(top_k(values, 0)) == 0
+
+
+def test_top_k_skips_missing_values():
+    values = np.array([1.0, np.nan, 3.0, 2.0, np.nan])
+    assert top_k(values, 2).tolist() == [3.0, 2.0]
+    assert top_k(values, 2, positions=True).tolist() == [2, 3]
+    assert top_k(values, 10).tolist() == [3.0, 2.0, 1.0]
+    assert top_k(pd.Series([1, None, 4], dtype="Int64"), 1).tolist() == [4.0]
+    assert top_k([1, None, 3, float("nan"), pd.NA], 2) == [3, 1]
+    assert top_k([1, None, 3], 2, positions=True) == [2, 0]
+    assert top_k(np.array([np.nan]), 1).tolist() == []
+
+
+@pytest.fixture
+def con():
+    rng = np.random.default_rng(0)
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE employees (id INTEGER PRIMARY KEY, department TEXT, salary INTEGER)")
+    rows = [(str(d), int(s)) for d, s in zip(rng.choice(["hr", "it", "ops"], 500), rng.integers(0, 40, 500))]
+    rows += [("hr", None), ("empty", None)]
+    con.executemany("INSERT INTO employees (department, salary) VALUES (?, ?)", rows)
+    con.execute(index_sql(partition_by="department"))
+    return con
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 5, 45])
+def test_sql_matches_reference(con, n):
+    rows = con.execute("SELECT department, salary FROM employees").fetchall()
+    # Nested MAX() probes are only generated by default up to MAX_NESTED.
+    nested = ["max"] if n <= MAX_NESTED else []
+    for style in [None, "skip"] + nested:
+        sql, params = nth_highest_sql(n=n, style=style, dialect="sqlite")
+        result = con.execute(sql, params).fetchall()
+        assert (result[0][0] if result else None) == reference_nth([s for _, s in rows], n)
+    for style in [None, "dense_rank"] + nested:
+        sql, params = nth_highest_sql(n=n, partition_by="department", style=style, dialect="sqlite")
+        found = {d: s for d, s in con.execute(sql, params).fetchall() if s is not None}
+        for department in ("hr", "it", "ops", "empty"):
+            assert found.get(department) == reference_nth([s for d, s in rows if d == department], n)
+
+
+def test_sql_validation():
+    assert nth_highest_sql(n=5)[1] == [5, 5]
+    assert "DENSE_RANK()" in nth_highest_sql(n=MAX_NESTED + 1, partition_by="department")[0]
+    assert "DENSE_RANK()" not in nth_highest_sql(n=MAX_NESTED, partition_by="department")[0]
+    assert "%s" in nth_highest_sql(n=5)[0]
+    assert index_sql() == "CREATE INDEX IF NOT EXISTS employees_salary_idx ON employees (salary DESC)"
+    with pytest.raises(ValueError):
+        nth_highest_sql(n=0)
+    with pytest.raises(ValueError):
+        nth_highest_sql(style="dense_rank")
+    with pytest.raises(ValueError):
+        nth_highest_sql(partition_by="department", style="skip")
+    with pytest.raises(ValueError):
+        nth_highest_sql(table="employees; DROP TABLE x")
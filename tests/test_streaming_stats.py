@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from odoo_pysql.streaming_stats import StreamingAggregator, TDigest
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    frame = pd.DataFrame({
+        "customer_id": rng.choice(np.array(["a", "b", "c", None], dtype=object), n),
+        "amount": rng.lognormal(3, 1, n),
+    })
+    frame.loc[rng.random(n) < 0.05, "amount"] = np.nan
+    return frame
+
+
+def expected(frame, by):
+    grouped = frame.groupby(by, dropna=False)["amount"] if by else frame["amount"]
+    return grouped.agg(["count", "mean", "var", "std", "min", "max"])
+
+
+def chunks(frame, size=777):
+    return [frame.iloc[i:i + size] for i in range(0, len(frame), size)]
+
+
+def test_ungrouped_matches_pandas(frame):
+    agg = StreamingAggregator()
+    for chunk in chunks(frame):
+        agg.update(chunk["amount"].to_numpy())
+    result = agg.result().iloc[0]
+    reference = expected(frame, None)
+    for stat in ("count", "mean", "var", "std", "min", "max"):
+        assert result[stat] == pytest.approx(reference[stat], rel=1e-9)
+    for q in (0.5, 0.9, 0.99):
+        assert result["p%g" % (100 * q)] == pytest.approx(frame["amount"].quantile(q), rel=0.02)
+
+
+def test_grouped_matches_pandas_and_null_key_is_a_group(frame):
+    agg = StreamingAggregator(by="customer_id", compression=None)
+    for chunk in chunks(frame):
+        agg.update_frame(chunk)
+    result = agg.result()
+    assert "p50" not in result.columns
+    reference = expected(frame, "customer_id")
+    assert sorted(result.index, key=str) == sorted(reference.index.tolist(), key=str)
+    for key in reference.index:
+        row = result.loc[None] if pd.isna(key) else result.loc[key]
+        for stat in ("count", "mean", "var", "min", "max"):
+            assert row[stat] == pytest.approx(reference.loc[key, stat], rel=1e-9)
+
+
+def test_merge_equals_single_pass(frame):
+    single = StreamingAggregator(by="customer_id")
+    single.update_frame(frame)
+    parts = [StreamingAggregator(by="customer_id").update_frame(chunk) for chunk in chunks(frame, 5000)]
+    merged = StreamingAggregator(by="customer_id")
+    for part in parts:
+        merged.merge(part)
+    merged.merge(StreamingAggregator(by="customer_id"))
+    left = single.result().sort_index(key=lambda index: index.map(str))
+    right = merged.result().sort_index(key=lambda index: index.map(str))
+    pd.testing.assert_frame_equal(left[["count", "min", "max"]], right[["count", "min", "max"]])
+    np.testing.assert_allclose(left[["mean", "var"]], right[["mean", "var"]], rtol=1e-9)
+    np.testing.assert_allclose(left["p50"], right["p50"], rtol=0.02)
+
+
+def test_empty_and_all_nan_input():
+    assert StreamingAggregator().result().empty
+    agg = StreamingAggregator().update([]).update([np.nan, np.nan])
+    row = agg.result().iloc[0]
+    assert row["count"] == 0 and np.isnan(row[["mean", "var", "min", "max", "p50"]].astype(float)).all()
+    single = StreamingAggregator().update([5.0]).result().iloc[0]
+    assert single["mean"] == 5.0 and np.isnan(single["var"]) and single["p99"] == 5.0
+    grouped = StreamingAggregator(by="k").update([np.nan, 1.0], keys=["x", "y"]).result()
+    assert grouped.loc["x", "count"] == 0 and grouped.loc["y", "mean"] == 1.0
+
+
+def test_invalid_use():
+    with pytest.raises(ValueError, match="pass keys"):
+        StreamingAggregator(by="customer_id").update([1.0])
+    with pytest.raises(ValueError, match="same length"):
+        StreamingAggregator(by="k").update([1.0, 2.0], keys=["a"])
+    with pytest.raises(ValueError, match="different settings"):
+        StreamingAggregator().merge(StreamingAggregator(by="k"))
+
+
+def test_tdigest_accuracy_and_merge():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=50_000)
+    digest = TDigest(100)
+    for part in np.array_split(values, 37):
+        digest.update(part)
+    other = TDigest(100)
+    other.update(values[:10])
+    digest.merge(other)
+    everything = np.concatenate([values, values[:10]])
+    assert digest.count == len(everything)
+    assert len(digest.means) <= 100
+    qs = np.array([0.001, 0.1, 0.5, 0.9, 0.999])
+    # Accuracy is measured in rank: the estimate's position among the data.
+    ranks = np.searchsorted(np.sort(everything), digest.quantile(qs)) / len(everything)
+    np.testing.assert_allclose(ranks, qs, atol=0.005)
+    assert digest.quantile(0.0) == everything.min() and digest.quantile(1.0) == everything.max()
+    assert np.isnan(TDigest().quantile(0.5))
+    assert np.isnan(TDigest().quantile([0.5, 0.9])).all()
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_from_files(tmp_path, frame, workers):
+    paths = []
+    for i, chunk in enumerate(chunks(frame, 7000)):
+        path = tmp_path / ("orders_%d.csv" % i)
+        chunk.to_csv(path, index=False)
+        paths.append(str(path))
+    agg = StreamingAggregator.from_files(paths, by="customer_id", chunksize=1000, workers=workers)
+    result = agg.result()
+    reference = expected(frame, "customer_id")
+    assert result["count"].sum() == reference["count"].sum()
+    assert result.loc["a", "mean"] == pytest.approx(reference.loc["a", "mean"], rel=1e-9)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from odoo_pysql import trailing_zeroes
+from odoo_pysql.trailing_zeroes import (
+    count_trailing_zeroes,
+    count_trailing_zeroes_batch,
+    factorize,
+    factorize_batch,
+    legendre_exponent,
+)
+
+
+def brute_force(n, base):
+    factorial = 1
+    for i in range(2, n + 1):
+        factorial *= i
+    zeroes = 0
+    while factorial % base == 0:
+        factorial //= base
+        zeroes += 1
+    return zeroes
+
+
+@pytest.mark.parametrize("n, base", [(0, 10), (5, 10), (25, 10), (100, 10), (100, 16), (50, 12),
+                                     (30, 7), (40, 36), (3, 97), (60, 2), (44, 1024)])
+def test_matches_brute_force(n, base):
+    assert count_trailing_zeroes(n, base) == brute_force(n, base)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        count_trailing_zeroes(-1)
+    with pytest.raises(ValueError):
+        factorize(1)
+    with pytest.raises(ValueError):
+        count_trailing_zeroes_batch([-1, 5])
+    with pytest.raises(ValueError):
+        factorize_batch([10, 1])
+
+
+def test_factorize_and_legendre():
+    assert factorize(360) == ((2, 3), (3, 2), (5, 1))
+    assert factorize(999_999_937) == ((999_999_937, 1),)
+    assert legendre_exponent(100, 5) == 24 and legendre_exponent(4, 5) == 0
+
+
+def test_factorize_batch_matches_factorize():
+    bases = np.concatenate((np.arange(2, 3000), np.random.default_rng(0).integers(2, 10 ** 10, 200),
+                            [2 ** 40, 999_999_937, 999_999_937 * 2]))
+    index, primes, exponents = factorize_batch(bases)
+    for i, base in enumerate(bases.tolist()):
+        mine = index == i
+        assert tuple(zip(primes[mine].tolist(), exponents[mine].tolist())) == factorize(base)
+    assert all(part.size == 0 for part in factorize_batch([]))
+    with pytest.raises(ValueError):
+        factorize_batch([2 ** 53])
+
+
+def test_batch_single_base_and_broadcasting():
+    ns = np.arange(0, 200)
+    assert count_trailing_zeroes_batch(ns).tolist() == [count_trailing_zeroes(n) for n in range(200)]
+    grid = count_trailing_zeroes_batch(np.array([[10], [100]]), np.array([2, 10, 12]))
+    assert grid.tolist() == [[count_trailing_zeroes(n, b) for b in (2, 10, 12)] for n in (10, 100)]
+    assert count_trailing_zeroes_batch([], 10).shape == (0,)
+
+
+@pytest.mark.parametrize("high", [50, 10 ** 6, 10 ** 9])
+def test_batch_repeated_and_distinct_bases(high):
+    rng = np.random.default_rng(high)
+    ns = rng.integers(0, 10 ** 9, 5000)
+    bases = rng.integers(2, high, 5000)
+    result = count_trailing_zeroes_batch(ns, bases)
+    assert result.tolist() == [count_trailing_zeroes(n, b) for n, b in zip(ns.tolist(), bases.tolist())]
+
+
+def test_distinct_path_with_small_n_and_shared_primes(monkeypatch):
+    monkeypatch.setattr(trailing_zeroes, "GROUPED_BASES_MAX", 0)
+    monkeypatch.setattr(trailing_zeroes, "SHARED_PRIME_MIN", 2)
+    rng = np.random.default_rng(1)
+    ns = rng.integers(0, 60, 2000)
+    bases = rng.integers(2, 5000, 2000)
+    expected = [count_trailing_zeroes(n, b) for n, b in zip(ns.tolist(), bases.tolist())]
+    assert count_trailing_zeroes_batch(ns, bases).tolist() == expected
+    assert expected[:200] == [brute_force(n, b) for n, b in zip(ns.tolist()[:200], bases.tolist()[:200])]